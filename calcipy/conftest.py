@@ -1,11 +1,38 @@
 """Custom Pytest Configuration.
 
-To use the custom markers, create a file `tests/conftest.py` and add this import:
+To use the custom markers and the opt-in plugins, create a file `tests/conftest.py` and add these imports:
 
 ```py
+from calcipy.conftest import pytest_addoption  # noqa: F401
 from calcipy.conftest import pytest_configure  # noqa: F401
 ```
 
+The fixtures also need to be imported to be available:
+
+- `benchmark_timer`: time a function over warmed-up rounds (mark the test with `BENCHMARK`)
+- `disk_cache`: memoize expensive, deterministic fixture results to disk across test sessions
+- `clone_project`: cheaply clone a template project directory for a test with reflinks or hardlinks
+- `shared_data`: create large, read-only data once and share it between pytest-xdist workers with `mmap`
+
+```py
+from calcipy.conftest import benchmark_timer  # noqa: F401
+from calcipy.conftest import clone_project  # noqa: F401
+from calcipy.conftest import disk_cache  # noqa: F401
+from calcipy.conftest import shared_data  # noqa: F401
+```
+
+The opt-in plugins are activated from the command line:
+
+- `--profile-resources`: record the wall time, user/system CPU time, and peak RSS delta of each test
+- `--leak-check=N`: compare `tracemalloc` snapshots every N tests and report the tests after which memory grows
+- `--profile-fixtures`: time the setup and teardown of every fixture and flag expensive function-scoped fixtures
+- `--profile-tests`: profile the call of each test with cProfile and export speedscope and collapsed-stack files
+- `--test-budget=MARKER=SECONDS`: dump all thread stacks, then fail the test (or abort the session) when a test exceeds
+  the time budget for its markers. Use `default` for all other tests. Example: `--test-budget=default=60
+  --test-budget=SLOW=600 --test-budget-action=abort`
+
+Reports are written to `--report-dir` (default: `releases/tests`, which matches `TestingConfig.path_out`)
+
 For HTML Reports, see: https://pypi.org/project/pytest-html/.
 
 ```py
@@ -18,12 +45,53 @@ from calcipy.conftest import pytest_runtest_makereport  # noqa: F401
 
 """
 
+import cProfile
+import errno
+import faulthandler
+import gc
+import hashlib
+import inspect
+import io
+import json
+import mmap
+import os
+import pickle  # noqa: S403
+import platform
+import pstats
+import re
+import shutil
+import signal
+import statistics
+import sys
+import time
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, suppress
 from datetime import datetime
-from typing import Any
+from fnmatch import fnmatch
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 
+import attr
+import pluggy
 import pytest  # FIXME: This will fail if pytest is not installed...
 from py.xml import html
 
+try:
+    import fcntl
+    import resource
+except ImportError:
+    fcntl = None  # Not available on Windows
+    resource = None
+
+_DEF_REPORT_DIR = Path('releases/tests')
+"""Default report directory relative to the pytest rootdir. Matches the default `TestingConfig.path_out`."""
+
+_PATH_STATM = Path('/proc/self/statm')
+"""Linux-only file with the current memory usage of the process (in pages)."""
+
 
 @pytest.mark.optionalhook
 def pytest_html_results_table_header(cells: Any) -> None:
@@ -75,8 +143,1479 @@ def pytest_runtest_makereport(item: Any, call: Any) -> None:
         pass  # The test suite likely failed
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Shared Utilities
+
+
+def _get_report_dir(config: Any) -> Path:
+    """Resolve the report directory from the pytest configuration and ensure that it exists.
+
+    Args:
+        config: pytest configuration object
+
+    Returns:
+        Path: absolute path to the report directory
+
+    """
+    report_dir = Path(config.getoption('report_dir', default=None) or _DEF_REPORT_DIR)
+    if not report_dir.is_absolute():
+        report_dir = Path(config.rootpath) / report_dir
+    report_dir.mkdir(exist_ok=True, parents=True)
+    return report_dir
+
+
+def _is_xdist_controller(config: Any) -> bool:
+    """Check if this process is the pytest-xdist controller, which distributes the tests and runs none of them.
+
+    Args:
+        config: pytest configuration object
+
+    Returns:
+        bool: True for the controller process when tests run in parallel
+
+    """
+    return not hasattr(config, 'workerinput') and config.getoption('dist', default='no') != 'no'
+
+
+def _get_report_path(config: Any, report_name: str) -> Path:
+    """Return the path to a report in the report directory that is unique to each pytest-xdist worker.
+
+    Args:
+        config: pytest configuration object
+        report_name: file name of the report, such as `test_resources.json`
+
+    Returns:
+        Path: report path with the worker ID appended to the stem (`test_resources-gw0.json`) when run by a worker
+
+    """
+    path_report = _get_report_dir(config) / report_name
+    worker_id = os.environ.get('PYTEST_XDIST_WORKER')
+    return path_report.with_name(f'{path_report.stem}-{worker_id}{path_report.suffix}') if worker_id else path_report
+
+
+def _safe_name(name: str) -> str:
+    """Replace characters that are not safe for file names.
+
+    Args:
+        name: raw name, such as a pytest node ID
+
+    Returns:
+        str: file-system safe name
+
+    """
+    return re.sub(r'[^\w.-]+', '_', name)
+
+
+@contextmanager
+def _file_lock(path_lock: Path) -> Iterator[None]:
+    """Hold an exclusive lock that is shared across processes, such as pytest-xdist workers.
+
+    Note: the lock is a no-op where `fcntl` is not available (Windows)
+
+    Args:
+        path_lock: Path to the lock file
+
+    Yields:
+        None: while the lock is held
+
+    """
+    with path_lock.open('a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _get_cache_dir(config: Any, name: str) -> Path:
+    """Return a directory in the pytest cache, which is shared by xdist workers and cleared with `--cache-clear`.
+
+    Args:
+        config: pytest configuration object
+        name: sub-directory name
+
+    Returns:
+        Path: directory in the pytest cache or in the report directory if the cacheprovider plugin is disabled
+
+    """
+    cache = getattr(config, 'cache', None)
+    if cache is not None:
+        return Path(cache.mkdir(name))
+    path_dir = _get_report_dir(config) / name
+    path_dir.mkdir(exist_ok=True)
+    return path_dir
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Per-Test Resource Profiling
+
+
+def _read_rusage() -> Tuple[float, float, int]:
+    """Read the user and system CPU time and the peak RSS of the current process.
+
+    Returns:
+        Tuple[float, float, int]: user time (s), system time (s), and peak RSS (KiB). Zeros if `resource` is missing
+
+    """
+    if resource is None:
+        return 0.0, 0.0, 0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is reported in bytes on macOS and in KiB on Linux
+    peak_rss = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    return usage.ru_utime, usage.ru_stime, peak_rss
+
+
+def _read_current_rss() -> Optional[int]:
+    """Read the current RSS of the process from `/proc`.
+
+    Returns:
+        Optional[int]: current RSS in KiB or None if `/proc` is not available
+
+    """
+    try:
+        rss_pages = int(_PATH_STATM.read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return rss_pages * resource.getpagesize() // 1024 if resource else None
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class _ResourceUsage:  # noqa: H601
+    """Resources used by a single test."""
+
+    nodeid: str
+    wall_time: float
+    user_time: float
+    system_time: float
+    peak_rss_delta: int
+    """Increase in the high-water mark of the RSS (KiB)."""
+
+    rss_delta: Optional[int]
+    """Change in the current RSS (KiB). None if `/proc` is not available."""
+
+
+class _ResourceProfiler:  # noqa: H601
+    """Plugin to record the wall time, CPU time, and memory of each test (`--profile-resources`)."""
+
+    report_name: str = 'test_resources.json'
+
+    summary_count: int = 10
+
+    def __init__(self, path_report: Path) -> None:
+        """Initialize the plugin.
+
+        Args:
+            path_report: Path to the JSON report file
+
+        """
+        self.path_report = path_report
+        self.usages: List[_ResourceUsage] = []
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Any, nextitem: Any) -> None:
+        """Measure the resources used by the setup, call, and teardown of each test.
+
+        Args:
+            item: pytest test item
+            nextitem: next pytest test item
+
+        Yields:
+            None: required by pytest
+
+        """
+        rss_start = _read_current_rss()
+        user_start, system_start, peak_start = _read_rusage()
+        wall_start = time.perf_counter()
+        yield
+        wall_time = time.perf_counter() - wall_start
+        user_end, system_end, peak_end = _read_rusage()
+        rss_end = _read_current_rss()
+        self.usages.append(_ResourceUsage(
+            nodeid=item.nodeid, wall_time=wall_time, user_time=user_end - user_start,
+            system_time=system_end - system_start, peak_rss_delta=peak_end - peak_start,
+            rss_delta=None if rss_start is None or rss_end is None else rss_end - rss_start,
+        ))
+
+    def _sorted_usages(self) -> List[_ResourceUsage]:
+        """Sort the tests by their impact on peak memory then by wall time.
+
+        Returns:
+            List[_ResourceUsage]: sorted resource usage
+
+        """
+        return sorted(self.usages, key=lambda usage: (usage.peak_rss_delta, usage.wall_time), reverse=True)
+
+    def pytest_sessionfinish(self, session: Any) -> None:
+        """Write the JSON report.
+
+        Args:
+            session: pytest session
+
+        """
+        usages = [attr.asdict(usage) for usage in self._sorted_usages()]
+        self.path_report.write_text(json.dumps({'tests': usages}, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        """Summarize the most expensive tests.
+
+        Args:
+            terminalreporter: pytest terminal reporter
+
+        """
+        terminalreporter.section('resource usage (peak RSS delta)')
+        for usage in self._sorted_usages()[:self.summary_count]:
+            terminalreporter.write_line(
+                f'{usage.peak_rss_delta:>10} KiB {usage.wall_time:>8.2f}s wall'
+                f' {usage.user_time:>8.2f}s user {usage.system_time:>8.2f}s sys  {usage.nodeid}',
+            )
+        terminalreporter.write_line(f'Full report: {self.path_report}')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Memory Leak Detection
+
+
+_TRACEMALLOC_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    tracemalloc.Filter(False, '<unknown>'),
+    # pytest retains the reports for each test, which would otherwise look like a leak
+    tracemalloc.Filter(False, f'{Path(pytest.__file__).parent.parent}/_pytest/*'),
+    tracemalloc.Filter(False, f'{Path(pluggy.__file__).parent}/*'),
+]
+"""Exclude allocations from tracemalloc, the import machinery, and pytest."""
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class _MemoryGrowth:  # noqa: H601
+    """Retained memory growth over an interval of tests."""
+
+    nodeids: List[str]
+    """Tests run since the previous snapshot."""
+
+    growth_kib: float
+    """Net change in the traced memory (KiB)."""
+
+    sites: List[Dict[str, Any]]
+    """Top allocation sites by file and line."""
+
+
+class _LeakDetector:  # noqa: H601
+    """Plugin to compare tracemalloc snapshots across tests (`--leak-check=N`)."""
+
+    report_name: str = 'test_leaks.json'
+
+    def __init__(self, path_report: Path, interval: int, threshold_kib: float, top_count: int = 10) -> None:
+        """Initialize the plugin.
+
+        Args:
+            path_report: Path to the JSON report file
+            interval: number of tests between snapshots
+            threshold_kib: minimum growth in KiB to flag an interval
+            top_count: number of allocation sites to report for each flagged interval. Default is 10
+
+        """
+        self.path_report = path_report
+        self.interval = interval
+        self.threshold_kib = threshold_kib
+        self.top_count = top_count
+        self.growths: List[_MemoryGrowth] = []
+        self._pending: List[str] = []
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started = False
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        """Collect garbage, then take a filtered snapshot so that only retained memory is compared.
+
+        Returns:
+            tracemalloc.Snapshot: filtered snapshot
+
+        """
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+
+    def _compare(self) -> None:
+        """Compare against the previous snapshot and record the pending tests if memory grew."""
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, 'lineno')
+        growth_kib = sum(stat.size_diff for stat in stats) / 1024
+        if growth_kib >= self.threshold_kib:
+            sites = [
+                {
+                    'file': stat.traceback[0].filename, 'line': stat.traceback[0].lineno,
+                    'size_diff_kib': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff,
+                }
+                for stat in stats[:self.top_count] if stat.size_diff > 0
+            ]
+            self.growths.append(_MemoryGrowth(nodeids=self._pending, growth_kib=round(growth_kib, 1), sites=sites))
+        self._snapshot = snapshot
+        self._pending = []
+
+    def pytest_sessionstart(self, session: Any) -> None:
+        """Start tracing and take the initial snapshot.
+
+        Args:
+            session: pytest session
+
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        self._snapshot = self._take_snapshot()
+
+    def pytest_runtest_logfinish(self, nodeid: str, location: Any) -> None:
+        """Take a snapshot after every `interval` tests.
+
+        Args:
+            nodeid: pytest node ID
+            location: test location
+
+        """
+        self._pending.append(nodeid)
+        if len(self._pending) >= self.interval:
+            self._compare()
+
+    def pytest_sessionfinish(self, session: Any) -> None:
+        """Compare any remaining tests, then write the JSON report.
+
+        Args:
+            session: pytest session
+
+        """
+        if self._pending and self._snapshot is not None:
+            self._compare()
+        if self._started:
+            tracemalloc.stop()
+        growths = [attr.asdict(growth) for growth in self.growths]
+        self.path_report.write_text(json.dumps({'interval': self.interval, 'growths': growths}, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        """Summarize the intervals with retained memory growth.
+
+        Args:
+            terminalreporter: pytest terminal reporter
+
+        """
+        terminalreporter.section('tracemalloc retained memory growth')
+        for growth in sorted(self.growths, key=lambda grw: grw.growth_kib, reverse=True):
+            terminalreporter.write_line(f'{growth.growth_kib:>10} KiB after: {", ".join(growth.nodeids)}')
+            for site in growth.sites[:3]:
+                terminalreporter.write_line(f'{site["size_diff_kib"]:>14} KiB  {site["file"]}:{site["line"]}')
+        if not self.growths:
+            terminalreporter.write_line(f'No growth above {self.threshold_kib} KiB')
+        terminalreporter.write_line(f'Full report: {self.path_report}')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Fixture Setup Cost Profiling
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class _FixtureCost:  # noqa: H601
+    """Aggregated cost of a fixture across the session."""
+
+    name: str
+    scope: str
+    location: str
+    setup_count: int = 0
+    setup_time: float = 0.0
+    """Total setup time (s) excluding the setup time of any requested fixtures."""
+
+    teardown_time: float = 0.0
+
+    @property
+    def total_time(self) -> float:
+        """Total setup and teardown time (s).
+
+        Returns:
+            float: total time
+
+        """
+        return self.setup_time + self.teardown_time
+
+
+class _FixtureProfiler:  # noqa: H601
+    """Plugin to time fixture setup and teardown (`--profile-fixtures`)."""
+
+    report_name: str = 'fixture_costs.json'
+
+    summary_count: int = 10
+
+    def __init__(self, path_report: Path, threshold: float) -> None:
+        """Initialize the plugin.
+
+        Args:
+            path_report: Path to the JSON report file
+            threshold: minimum total cost (s) of a rebuilt function-scoped fixture before recommending a wider scope
+
+        """
+        self.path_report = path_report
+        self.threshold = threshold
+        self.costs: Dict[Tuple[str, str], _FixtureCost] = {}
+        self._child_times: List[float] = []
+        self._teardown_starts: Dict[int, float] = {}
+        self._session_start = time.perf_counter()
+
+    def _get_cost(self, fixturedef: Any) -> _FixtureCost:
+        """Return the aggregated cost for the fixture definition.
+
+        Args:
+            fixturedef: pytest fixture definition
+
+        Returns:
+            _FixtureCost: mutable aggregate
+
+        """
+        func = fixturedef.func
+        location = f'{getattr(func, "__module__", "?")}:{getattr(func, "__qualname__", fixturedef.argname)}'
+        key = (fixturedef.argname, location)
+        if key not in self.costs:
+            self.costs[key] = _FixtureCost(name=fixturedef.argname, scope=str(fixturedef.scope), location=location)
+        return self.costs[key]
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef: Any, request: Any) -> None:
+        """Time the fixture setup without the time spent on nested fixtures.
+
+        Args:
+            fixturedef: pytest fixture definition
+            request: pytest fixture request
+
+        Yields:
+            None: required by pytest
+
+        """
+        self._child_times.append(0.0)
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        child_time = self._child_times.pop()
+        if self._child_times:
+            self._child_times[-1] += elapsed
+        cost = self._get_cost(fixturedef)
+        cost.setup_count += 1
+        cost.setup_time += elapsed - child_time
+        # Finalizers run last-in-first-out, so this runs before the fixture's own teardown code
+        fixturedef.addfinalizer(lambda: self._teardown_starts.__setitem__(id(fixturedef), time.perf_counter()))
+
+    def pytest_fixture_post_finalizer(self, fixturedef: Any, request: Any) -> None:
+        """Record the teardown time once the fixture has been finalized.
+
+        Args:
+            fixturedef: pytest fixture definition
+            request: pytest fixture request
+
+        """
+        start = self._teardown_starts.pop(id(fixturedef), None)
+        if start is not None:
+            self._get_cost(fixturedef).teardown_time += time.perf_counter() - start
+
+    def _is_widening_candidate(self, cost: _FixtureCost) -> bool:
+        """Check if a fixture is an expensive, rebuilt, function-scoped fixture.
+
+        Args:
+            cost: aggregated fixture cost
+
+        Returns:
+            bool: True if the scope may be worth widening
+
+        """
+        return cost.scope == 'function' and cost.setup_count > 1 and cost.total_time >= self.threshold
+
+    def _sorted_costs(self) -> List[_FixtureCost]:
+        """Sort the fixtures by total cost.
+
+        Returns:
+            List[_FixtureCost]: sorted fixture costs
+
+        """
+        return sorted(self.costs.values(), key=lambda cost: cost.total_time, reverse=True)
+
+    def pytest_sessionfinish(self, session: Any) -> None:
+        """Write the JSON report.
+
+        Args:
+            session: pytest session
+
+        """
+        fixtures = [
+            {**attr.asdict(cost), 'total_time': cost.total_time, 'widen_scope': self._is_widening_candidate(cost)}
+            for cost in self._sorted_costs()
+        ]
+        report = {
+            'session_time': time.perf_counter() - self._session_start,
+            'fixture_time': sum(cost.total_time for cost in self.costs.values()),
+            'fixtures': fixtures,
+        }
+        self.path_report.write_text(json.dumps(report, indent=2))
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        """Summarize the most expensive fixtures and the recommended scope changes.
+
+        Args:
+            terminalreporter: pytest terminal reporter
+
+        """
+        session_time = time.perf_counter() - self._session_start
+        fixture_time = sum(cost.total_time for cost in self.costs.values())
+        terminalreporter.section('fixture setup and teardown cost')
+        terminalreporter.write_line(f'Fixtures: {fixture_time:.2f}s of {session_time:.2f}s in the session')
+        for cost in self._sorted_costs()[:self.summary_count]:
+            terminalreporter.write_line(
+                f'{cost.total_time:>8.2f}s {cost.setup_count:>5}x {cost.scope:>8}  {cost.name} ({cost.location})',
+            )
+        for cost in filter(self._is_widening_candidate, self._sorted_costs()):
+            terminalreporter.write_line(
+                f'Consider widening the scope of "{cost.name}" (rebuilt {cost.setup_count} times for'
+                f' {cost.total_time:.2f}s). Use "module" or "session" if the value is not mutated by tests',
+            )
+        terminalreporter.write_line(f'Full report: {self.path_report}')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Benchmarks
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class _BenchmarkStats:  # noqa: H601
+    """Timing statistics (s) for a benchmark."""
+
+    rounds: int
+    median: float
+    mean: float
+    minimum: float
+    stdev: float
+
+    @classmethod
+    def from_times(cls, times: List[float]) -> '_BenchmarkStats':
+        """Summarize the measured times.
+
+        Args:
+            times: measured time (s) of each round
+
+        Returns:
+            _BenchmarkStats: summary statistics
+
+        """
+        stdev = statistics.stdev(times) if len(times) > 1 else 0.0
+        return cls(
+            rounds=len(times), median=statistics.median(times), mean=statistics.mean(times),
+            minimum=min(times), stdev=stdev,
+        )
+
+
+def _get_machine_id() -> str:
+    """Identify the machine and interpreter so that baselines are only compared on equivalent hardware.
+
+    Returns:
+        str: file-system safe identifier
+
+    """
+    version = ''.join(map(str, sys.version_info[:2]))
+    return _safe_name(f'{platform.node()}-{platform.machine()}-{platform.python_implementation()}{version}')
+
+
+def _get_baseline_path(config: Any, nodeid: str) -> Path:
+    """Locate the baseline file for the test on this machine.
+
+    Args:
+        config: pytest configuration object
+        nodeid: pytest node ID
+
+    Returns:
+        Path: path to the JSON baseline file
+
+    """
+    path_dir = _get_report_dir(config) / 'benchmarks' / _get_machine_id()
+    path_dir.mkdir(exist_ok=True, parents=True)
+    return path_dir / f'{_safe_name(nodeid)}.json'
+
+
+@pytest.fixture()
+def benchmark_timer(request: Any) -> Callable[..., _BenchmarkStats]:
+    """Time a function over warmed-up rounds and compare the median with the baseline stored for this machine.
+
+    ```py
+    @pytest.mark.BENCHMARK()
+    def test_parse(benchmark_timer):
+        benchmark_timer(parse, 'text')
+    ```
+
+    The first run stores the baseline. Later runs fail when the median regresses by more than
+    `--benchmark-threshold`. Use `--benchmark-update` to overwrite the stored baseline
+
+    Args:
+        request: pytest fixture request
+
+    Returns:
+        Callable[..., _BenchmarkStats]: function that accepts the function to time and its arguments
+
+    """
+    config = request.config
+
+    def run_benchmark(func: Callable[..., Any], *args: Any, **kwargs: Any) -> _BenchmarkStats:
+        for _idx in range(config.getoption('benchmark_warmup', default=2)):
+            func(*args, **kwargs)
+        times = []
+        for _idx in range(config.getoption('benchmark_rounds', default=10)):
+            start = time.perf_counter()
+            func(*args, **kwargs)
+            times.append(time.perf_counter() - start)
+        stats = _BenchmarkStats.from_times(times)
+
+        path_baseline = _get_baseline_path(config, request.node.nodeid)
+        if config.getoption('benchmark_update', default=False) or not path_baseline.is_file():
+            path_baseline.write_text(json.dumps(attr.asdict(stats), indent=2))
+            return stats
+        baseline = _BenchmarkStats(**json.loads(path_baseline.read_text()))
+        threshold = config.getoption('benchmark_threshold', default=0.2)
+        if stats.median > baseline.median * (1 + threshold):
+            pytest.fail(
+                f'Benchmark median regressed from {baseline.median:.6f}s to {stats.median:.6f}s'
+                f' (threshold: {threshold:.0%}). Baseline: {path_baseline}',
+            )
+        return stats
+
+    return run_benchmark
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Per-Test cProfile Capture
+
+_ProfileFunc = Tuple[str, int, str]
+"""cProfile function key: (file name, line number, function name)."""
+
+_Stack = Tuple[_ProfileFunc, ...]
+"""Call stack from the root to the leaf function."""
+
+
+def _build_stacks(raw_stats: Dict[_ProfileFunc, Any], min_weight: float = 1e-6) -> List[Tuple[_Stack, float]]:
+    """Reconstruct weighted call stacks from the caller/callee graph recorded by cProfile.
+
+    cProfile only records the time for each caller-callee edge, so the self time of a function is split between its
+    stacks in proportion to the cumulative time of the edge that led to it
+
+    Args:
+        raw_stats: `pstats.Stats.stats` dictionary
+        min_weight: stacks with less self time (s) than this are dropped. Default is 1e-6
+
+    Returns:
+        List[Tuple[_Stack, float]]: stacks and their self time in seconds
+
+    """
+    callees: Dict[_ProfileFunc, Dict[_ProfileFunc, float]] = defaultdict(dict)
+    for func, (*_vals, callers) in raw_stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+    # Iterate rather than recurse because call stacks can be deeper than the recursion limit
+    pending: List[Tuple[_Stack, float]] = [((func, ), vals[3]) for func, vals in raw_stats.items() if not vals[4]]
+    stacks = []
+    while pending:
+        stack, time_context = pending.pop()
+        func = stack[-1]
+        _cc, _nc, self_time, cumulative_time, _callers = raw_stats[func]
+        ratio = min(time_context / cumulative_time, 1.0) if cumulative_time else 0.0
+        if self_time * ratio >= min_weight:
+            stacks.append((stack, self_time * ratio))
+        for callee, edge_time in callees[func].items():
+            if callee not in stack and edge_time * ratio >= min_weight:
+                pending.append(((*stack, callee), edge_time * ratio))
+    return stacks
+
+
+def _format_func(func: _ProfileFunc) -> str:
+    """Format the cProfile function key as a readable frame name.
+
+    Args:
+        func: cProfile function key
+
+    Returns:
+        str: frame name
+
+    """
+    file_name, lineno, func_name = func
+    if file_name == '~':  # Built-in functions
+        return func_name
+    return f'{func_name} ({Path(file_name).name}:{lineno})'
+
+
+def _write_collapsed(path_out: Path, stacks: List[Tuple[_Stack, float]]) -> None:
+    """Write the stacks in the collapsed format used by `flamegraph.pl`, with weights in microseconds.
+
+    Args:
+        path_out: Path to the output text file
+        stacks: weighted stacks
+
+    """
+    lines = [
+        ';'.join(_format_func(func).replace(';', ':') for func in stack) + f' {round(weight * 1e6)}'
+        for stack, weight in stacks
+    ]
+    path_out.write_text('\n'.join(lines) + '\n')
+
+
+def _write_speedscope(path_out: Path, name: str, stacks: List[Tuple[_Stack, float]]) -> None:
+    """Write the stacks as a sampled speedscope profile. See: https://www.speedscope.app/file-format-schema.json.
+
+    Args:
+        path_out: Path to the output JSON file
+        name: profile name
+        stacks: weighted stacks
+
+    """
+    frame_indices: Dict[_ProfileFunc, int] = {}
+    frames: List[Dict[str, Union[str, int]]] = []
+    samples = []
+    for stack, _weight in stacks:
+        for func in stack:
+            if func not in frame_indices:
+                frame_indices[func] = len(frames)
+                frames.append({'name': _format_func(func), 'file': func[0], 'line': func[1]})
+        samples.append([frame_indices[func] for func in stack])
+    weights = [weight for _stack, weight in stacks]
+    speedscope = {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'exporter': 'calcipy',
+        'name': name,
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled', 'name': name, 'unit': 'seconds',
+            'startValue': 0, 'endValue': sum(weights), 'samples': samples, 'weights': weights,
+        }],
+    }
+    path_out.write_text(json.dumps(speedscope))
+
+
+class _TestProfiler:  # noqa: H601
+    """Plugin to profile the call of each test with cProfile (`--profile-tests`)."""
+
+    hot_count: int = 30
+
+    report_name: str = 'profiles/hot_functions.txt'
+
+    def __init__(self, path_report: Path) -> None:
+        """Initialize the plugin.
+
+        Args:
+            path_report: path to the hot function table. The profile files are written to the same directory
+
+        """
+        self.path_report = path_report
+        self.path_profiles = path_report.parent
+        self.aggregate: Optional[pstats.Stats] = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: Any) -> None:
+        """Profile the test call and export the profile.
+
+        Args:
+            item: pytest test item
+
+        Yields:
+            None: required by pytest
+
+        """
+        profile = cProfile.Profile()
+        profile.enable()
+        yield
+        profile.disable()
+
+        stats = pstats.Stats(profile)
+        stacks = _build_stacks(stats.stats)
+        file_stem = _safe_name(item.nodeid)
+        self.path_profiles.mkdir(exist_ok=True, parents=True)
+        _write_speedscope(self.path_profiles / f'{file_stem}.speedscope.json', item.nodeid, stacks)
+        _write_collapsed(self.path_profiles / f'{file_stem}.collapsed.txt', stacks)
+        if self.aggregate is None:
+            self.aggregate = stats
+        else:
+            self.aggregate.add(stats)
+
+    def _format_hot_functions(self) -> str:
+        """Format the table of functions with the most self time across all profiled tests.
+
+        Returns:
+            str: pstats table
+
+        """
+        stream = io.StringIO()
+        if self.aggregate:
+            self.aggregate.stream = stream
+            self.aggregate.sort_stats(pstats.SortKey.TIME).print_stats(self.hot_count)
+        return stream.getvalue()
+
+    def pytest_sessionfinish(self, session: Any) -> None:
+        """Write the aggregated hot function table.
+
+        Args:
+            session: pytest session
+
+        """
+        if self.aggregate:
+            self.path_profiles.mkdir(exist_ok=True, parents=True)
+            self.path_report.write_text(self._format_hot_functions())
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        """Show the location of the profiles.
+
+        Args:
+            terminalreporter: pytest terminal reporter
+
+        """
+        terminalreporter.section('cProfile')
+        terminalreporter.write_line(
+            f'Profiles (open *.speedscope.json with https://www.speedscope.app): {self.path_profiles}',
+        )
+        terminalreporter.write_line(f'Hot functions across all tests: {self.path_report}')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# On-Disk Fixture Cache
+
+_CachedValue = TypeVar('_CachedValue')
+"""Value returned by the cached factory."""
+
+
+def _hash_source(factory: Callable[..., Any]) -> str:
+    """Hash the qualified name and source code of the factory.
+
+    Args:
+        factory: function that creates the cached value
+
+    Returns:
+        str: hex digest
+
+    """
+    name = f'{getattr(factory, "__module__", "")}.{getattr(factory, "__qualname__", repr(factory))}'
+    try:
+        source = inspect.getsource(factory)
+    except (OSError, TypeError):
+        source = ''
+    return hashlib.sha256(f'{name}\n{source}'.encode()).hexdigest()
+
+
+def _hash_inputs(input_paths: Sequence[Path], chunk_size: int = 2 ** 20) -> str:
+    """Hash the paths and contents of the input files.
+
+    Args:
+        input_paths: files that the factory reads
+        chunk_size: bytes to read at a time so that large files are not loaded into memory. Default is 1 MiB
+
+    Returns:
+        str: hex digest
+
+    """
+    digest = hashlib.sha256()
+    for path_input in input_paths:
+        digest.update(Path(path_input).as_posix().encode())
+        with Path(path_input).open('rb') as input_file:
+            for chunk in iter(partial(input_file.read, chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _DiskCache:  # noqa: H601
+    """Size-bounded, least-recently-used, on-disk cache of pickled values."""
+
+    def __init__(self, path_cache: Path, max_bytes: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            path_cache: directory for the cached files
+            max_bytes: maximum total size of the cached files before the least recently used are evicted
+
+        """
+        self.path_cache = path_cache
+        self.max_bytes = max_bytes
+
+    def get(
+        self, factory: Callable[[], _CachedValue], *, input_paths: Sequence[Path] = (), key: str = '',
+    ) -> _CachedValue:
+        """Return the cached value or call the factory and cache the result.
+
+        The entry is keyed by the factory source code, the contents of the input files, and the optional key.
+        Concurrent workers that request the same entry wait for the first one to finish creating it
+
+        Args:
+            factory: deterministic function without arguments that creates the value
+            input_paths: files read by the factory. Default is none
+            key: optional extra key, such as a version or parameter. Default is empty
+
+        Returns:
+            _CachedValue: value returned by the factory
+
+        """
+        digest = hashlib.sha256(f'{_hash_source(factory)}:{_hash_inputs(input_paths)}:{key}'.encode()).hexdigest()
+        path_entry = self.path_cache / f'{digest}.pkl'
+        with _file_lock(self.path_cache / f'{digest}.lock'):
+            with suppress(FileNotFoundError):  # Only possible without fcntl, when eviction is not locked
+                if path_entry.is_file():
+                    path_entry.touch()  # The modified time tracks the last use
+                    return pickle.loads(path_entry.read_bytes())  # noqa: S301
+            value = factory()
+            path_tmp = path_entry.with_suffix(f'.{os.getpid()}.tmp')
+            path_tmp.write_bytes(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            path_tmp.replace(path_entry)
+        self._evict(keep=path_entry)
+        return value
+
+    def _evict(self, keep: Path) -> None:
+        """Remove the least recently used entries until the cache is within the size limit.
+
+        Args:
+            keep: the entry that was just written, which is never evicted
+
+        """
+        with _file_lock(self.path_cache / 'evict.lock'):
+            entries = sorted(self.path_cache.glob('*.pkl'), key=lambda pth: pth.stat().st_mtime)
+            total_bytes = sum(pth.stat().st_size for pth in entries)
+            for path_entry in entries:
+                if total_bytes <= self.max_bytes:
+                    break
+                if path_entry != keep:
+                    # Hold the entry lock so that a concurrent get() never reads a partially removed entry. The lock
+                    #   file is kept because removing it could let two workers lock separate files for the same entry
+                    with _file_lock(path_entry.with_suffix('.lock')), suppress(FileNotFoundError):
+                        total_bytes -= path_entry.stat().st_size
+                        path_entry.unlink()
+
+
+@pytest.fixture(scope='session')
+def disk_cache(request: Any) -> _DiskCache:
+    """Memoize expensive, deterministic fixture results to disk across test sessions.
+
+    ```py
+    @pytest.fixture(scope='session')
+    def corpus(disk_cache):
+        return disk_cache.get(_parse_corpus, input_paths=[TEST_DATA_DIR / 'corpus.txt'])
+    ```
+
+    Entries are stored in the pytest cache, so they are cleared with `--cache-clear`. The least recently used entries
+    are evicted beyond `--fixture-cache-size`
+
+    Args:
+        request: pytest fixture request
+
+    Returns:
+        _DiskCache: cache with a `get(factory, *, input_paths=(), key='')` method
+
+    """
+    config = request.config
+    max_bytes = int(config.getoption('fixture_cache_size', default=2048) * 2 ** 20)
+    return _DiskCache(_get_cache_dir(config, 'calcipy_fixtures'), max_bytes)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Copy-on-Write Project Cloning
+
+_FICLONE = 0x40049409
+"""Linux ioctl request code to share the data blocks of one file with another (btrfs, XFS, etc.)."""
+
+_REFLINK_SUPPORT: Dict[Tuple[int, int], bool] = {}
+"""Cache of reflink support keyed by the source and destination device IDs."""
+
+
+def _reflink(path_src: Path, path_dst: Path) -> bool:
+    """Attempt to clone a file with a reflink, which is a copy-on-write copy that is safe to modify.
+
+    Args:
+        path_src: source file
+        path_dst: destination file, which is removed if the reflink fails
+
+    Returns:
+        bool: True if the reflink was created
+
+    """
+    if fcntl is None:
+        return False
+    try:
+        with path_src.open('rb') as src_file, path_dst.open('wb') as dst_file:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+    except OSError:
+        # The destination is not created if the source could not be opened
+        with suppress(FileNotFoundError):
+            path_dst.unlink()
+        return False
+    shutil.copystat(path_src, path_dst)
+    return True
+
+
+def _clone_file(path_src: Path, path_dst: Path, *, writable: bool) -> None:
+    """Clone a single file with the cheapest method available.
+
+    Reflinks are tried first and the result is cached per pair of devices. Otherwise, read-only files are hardlinked
+    and the writable files (or files on another device) are copied
+
+    Args:
+        path_src: source file
+        path_dst: destination file
+        writable: if True, the file must not be hardlinked because the test may modify it
+
+    """
+    devices = (path_src.stat().st_dev, path_dst.parent.stat().st_dev)
+    if _REFLINK_SUPPORT.get(devices, True):
+        _REFLINK_SUPPORT[devices] = _reflink(path_src, path_dst)
+        if _REFLINK_SUPPORT[devices]:
+            return
+    if not writable:
+        try:
+            os.link(path_src, path_dst)
+        except OSError as err:
+            if err.errno not in {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP}:
+                raise
+        else:
+            return
+    shutil.copy2(path_src, path_dst)
+
+
+def _clone_tree(path_template: Path, path_dst: Path, writable: Sequence[str]) -> Path:
+    """Clone a directory tree file-by-file.
+
+    Args:
+        path_template: template directory
+        path_dst: destination directory, which must not exist
+        writable: glob patterns for paths (relative to the template) that the test may modify
+
+    Returns:
+        Path: the destination directory
+
+    """
+    for dir_name, _dirs, file_names in os.walk(path_template):
+        path_dir = Path(dir_name)
+        path_out = path_dst / path_dir.relative_to(path_template)
+        path_out.mkdir(parents=True)
+        for file_name in file_names:
+            rel_path = (path_dir / file_name).relative_to(path_template).as_posix()
+            is_writable = any(fnmatch(rel_path, pattern) for pattern in writable)
+            _clone_file(path_dir / file_name, path_out / file_name, writable=is_writable)
+    return path_dst
+
+
+@pytest.fixture()
+def clone_project(tmp_path: Path) -> Callable[..., Path]:
+    """Clone template project directories into the test's temporary directory.
+
+    ```py
+    def test_lint(clone_project):
+        path_project = clone_project(PATH_TEST_PROJECT, writable=['*.toml', 'releases/*'])
+    ```
+
+    Files are reflinked where the filesystem supports it. Otherwise, files are hardlinked, except for the files that
+    match a `writable` glob pattern (or are on another device), which are copied. Hardlinked files share data with the
+    template and must not be modified
+
+    Args:
+        tmp_path: pytest temporary directory for the test
+
+    Returns:
+        Callable[..., Path]: function that accepts the template directory and optional writable patterns and returns
+            the path to the clone
+
+    """
+    def clone(path_template: Path, writable: Sequence[str] = ()) -> Path:
+        return _clone_tree(Path(path_template), tmp_path / Path(path_template).name, writable)
+
+    return clone
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Shared Read-Only Data
+
+
+class _SharedData:  # noqa: H601
+    """Memory-mapped, read-only data that is written once and shared by all workers of a test run."""
+
+    def __init__(self, path_shared: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            path_shared: directory that is shared by all workers of the current test run
+
+        """
+        self.path_shared = path_shared
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    def get(self, name: str, factory: Callable[[], bytes]) -> memoryview:
+        """Return a zero-copy view of the data, which is only created by the first worker that requests it.
+
+        Args:
+            name: unique name for the data
+            factory: function that returns the data as bytes (such as `array.tobytes()`)
+
+        Returns:
+            memoryview: read-only view of the memory-mapped file
+
+        """
+        if name not in self._maps:
+            path_data = self.path_shared / f'{_safe_name(name)}.bin'
+            with _file_lock(path_data.with_suffix('.lock')):
+                if not path_data.is_file():
+                    path_tmp = path_data.with_suffix(f'.{os.getpid()}.tmp')
+                    path_tmp.write_bytes(factory())
+                    path_tmp.replace(path_data)
+            if not path_data.stat().st_size:
+                return memoryview(b'')  # Empty files cannot be memory-mapped
+            with path_data.open('rb') as data_file:
+                self._maps[name] = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._maps[name])
+
+    def close(self) -> None:
+        """Close the memory maps that are no longer referenced by a view."""
+        for data_map in self._maps.values():
+            with suppress(BufferError):
+                data_map.close()
+        self._maps = {}
+
+
+@pytest.fixture(scope='session')
+def shared_data(tmp_path_factory: Any) -> Iterator[_SharedData]:
+    """Create large, read-only reference data once per test run and share it between pytest-xdist workers.
+
+    ```py
+    @pytest.fixture(scope='session')
+    def reference(shared_data):
+        view = shared_data.get('reference', lambda: _load_reference().tobytes())
+        return np.frombuffer(view, dtype=np.float64)
+    ```
+
+    The data is written to a file in the base temporary directory that is shared by all workers and each worker maps
+    the same file, so the operating system keeps a single copy in the page cache regardless of the worker count
+
+    Args:
+        tmp_path_factory: pytest session temporary directory factory
+
+    Yields:
+        _SharedData: store with a `get(name, factory)` method that returns a read-only `memoryview`
+
+    """
+    path_base = tmp_path_factory.getbasetemp()
+    # With pytest-xdist, each worker has a sub-directory of the shared base temporary directory
+    path_shared = (path_base.parent if os.environ.get('PYTEST_XDIST_WORKER') else path_base) / 'calcipy_shared'
+    path_shared.mkdir(exist_ok=True)
+    store = _SharedData(path_shared)
+    yield store
+    store.close()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Hang Watchdog
+
+
+def _parse_budgets(raw_budgets: List[str]) -> Dict[str, float]:
+    """Parse the `MARKER=SECONDS` budgets from the command line.
+
+    Args:
+        raw_budgets: list of strings, such as `['default=60', 'SLOW=600']`
+
+    Returns:
+        Dict[str, float]: time budget in seconds by marker name
+
+    Raises:
+        UsageError: if any budget is malformed
+
+    """
+    budgets = {}
+    for raw in raw_budgets:
+        marker, _sep, seconds = raw.rpartition('=')
+        try:
+            budgets[marker] = float(seconds)
+        except ValueError:
+            marker = ''
+        if not marker or budgets[marker] <= 0:
+            raise pytest.UsageError(f'Expected --test-budget=MARKER=SECONDS with SECONDS > 0. Received: "{raw}"')
+    return budgets
+
+
+class _HangWatchdog:  # noqa: H601
+    """Plugin to enforce per-marker time budgets and dump thread stacks on hangs (`--test-budget`)."""
+
+    def __init__(self, config: Any, budgets: Dict[str, float], action: str) -> None:
+        """Initialize the plugin.
+
+        Args:
+            config: pytest configuration object
+            budgets: time budget in seconds by marker name. The `default` key applies to tests without a budget marker
+            action: `fail` to fail only the test or `abort` to exit the session
+
+        """
+        self.config = config
+        self.budgets = budgets
+        # SIGALRM is required to interrupt the test. Otherwise, abort the session
+        can_signal = hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
+        self.action = action if can_signal else 'abort'
+        self._deadline: Optional[float] = None
+        self._budget = 0.0
+
+    def _get_budget(self, item: Any) -> Optional[float]:
+        """Return the largest budget from the markers of the test or the default budget.
+
+        Args:
+            item: pytest test item
+
+        Returns:
+            Optional[float]: budget in seconds. None if the test is not budgeted
+
+        """
+        marked = [self.budgets[mark.name] for mark in item.iter_markers() if mark.name in self.budgets]
+        return max(marked) if marked else self.budgets.get('default')
+
+    def _dump_stacks(self, item: Any) -> str:
+        """Dump the stack of every thread to a file in the report directory.
+
+        Args:
+            item: pytest test item
+
+        Returns:
+            str: message with the stacks
+
+        """
+        path_dumps = _get_report_dir(self.config) / 'hang_dumps'
+        path_dumps.mkdir(exist_ok=True)
+        path_dump = path_dumps / f'{_safe_name(item.nodeid)}.txt'
+        with path_dump.open('w') as dump_file:
+            faulthandler.dump_traceback(file=dump_file, all_threads=True)
+        return (
+            f'{item.nodeid} exceeded the time budget of {self._budget}s. Stacks from all threads ({path_dump}):'
+            f'\n\n{path_dump.read_text()}'
+        )
+
+    def _fail(self, item: Any) -> None:
+        """Dump the stacks, then fail the test. Called from the SIGALRM handler in the main thread.
+
+        Args:
+            item: pytest test item
+
+        Raises:
+            Failed: always
+
+        """
+        pytest.fail(self._dump_stacks(item))
+
+    def _abort(self, item: Any) -> None:
+        """Dump the stacks to the real stderr, then exit the session. Called from the watchdog thread.
+
+        Args:
+            item: pytest test item
+
+        """
+        message = self._dump_stacks(item)
+        capman = self.config.pluginmanager.getplugin('capturemanager')
+        if capman:
+            capman.suspend_global_capture(in_=True)
+        sys.stderr.write(f'\n{"+" * 30} Aborting the test session {"+" * 30}\n{message}\n')
+        sys.stderr.flush()
+        os._exit(1)  # The main thread may be blocked, so the session cannot exit normally
+
+    @contextmanager
+    def _guard(self, item: Any) -> Iterator[None]:
+        """Arm the watchdog with the time remaining in the budget for the current phase of the test.
+
+        Args:
+            item: pytest test item
+
+        Yields:
+            None: while the watchdog is armed
+
+        """
+        if self._deadline is None:
+            yield
+            return
+        remaining = max(self._deadline - time.perf_counter(), 0.001)
+        if self.action == 'abort':
+            timer = threading.Timer(remaining, self._abort, args=(item,))
+            timer.daemon = True
+            timer.start()
+        else:
+            # Save any outer timer, such as the budget of a test that runs pytest in-process with pytester
+            previous = signal.signal(signal.SIGALRM, lambda _signum, _frame: self._fail(item))
+            previous_delay, previous_interval = signal.getitimer(signal.ITIMER_REAL)
+            armed_at = time.perf_counter()
+            signal.setitimer(signal.ITIMER_REAL, remaining)
+        try:
+            yield
+        finally:
+            if self.action == 'abort':
+                timer.cancel()
+            else:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+                if previous_delay > 0:
+                    # An outer timer that expired in the meantime fires immediately
+                    delay = max(previous_delay - (time.perf_counter() - armed_at), 0.001)
+                    signal.setitimer(signal.ITIMER_REAL, delay, previous_interval)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Any, nextitem: Any) -> None:
+        """Start the budget for the test, which is shared by the setup, call, and teardown phases.
+
+        Args:
+            item: pytest test item
+            nextitem: next pytest test item
+
+        Yields:
+            None: required by pytest
+
+        """
+        budget = self._get_budget(item)
+        self._budget = budget or 0.0
+        self._deadline = None if budget is None else time.perf_counter() + budget
+        yield
+        self._deadline = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item: Any) -> None:
+        """Guard the test setup.
+
+        Args:
+            item: pytest test item
+
+        Yields:
+            None: required by pytest
+
+        """
+        with self._guard(item):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: Any) -> None:
+        """Guard the test call.
+
+        Args:
+            item: pytest test item
+
+        Yields:
+            None: required by pytest
+
+        """
+        with self._guard(item):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item: Any, nextitem: Any) -> None:
+        """Guard the test teardown.
+
+        Args:
+            item: pytest test item
+            nextitem: next pytest test item
+
+        Yields:
+            None: required by pytest
+
+        """
+        with self._guard(item):
+            yield
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Configuration
+
+
+def pytest_addoption(parser: Any) -> None:
+    """Register the command line options for the opt-in calcipy plugins.
+
+    Args:
+        parser: pytest argument parser
+
+    """
+    group = parser.getgroup('calcipy')
+    group.addoption(
+        '--report-dir', dest='report_dir', default=None,
+        help=f'Directory for the calcipy plugin reports. Relative to the rootdir. Default is "{_DEF_REPORT_DIR}"',
+    )
+    group.addoption(
+        '--profile-resources', action='store_true', dest='profile_resources',
+        help='Record the wall time, CPU time, and peak RSS delta of each test',
+    )
+    group.addoption(
+        '--leak-check', type=int, default=0, dest='leak_check', metavar='N',
+        help='Compare tracemalloc snapshots every N tests to find tests after which retained memory grows',
+    )
+    group.addoption(
+        '--leak-threshold', type=float, default=1024, dest='leak_threshold', metavar='KiB',
+        help='Minimum retained memory growth to report with --leak-check. Default is 1024 KiB',
+    )
+    group.addoption(
+        '--profile-fixtures', action='store_true', dest='profile_fixtures',
+        help='Time the setup and teardown of every fixture and recommend scope changes',
+    )
+    group.addoption(
+        '--fixture-threshold', type=float, default=1.0, dest='fixture_threshold', metavar='SECONDS',
+        help='Minimum total cost of a rebuilt function-scoped fixture to recommend a wider scope. Default is 1.0s',
+    )
+    group.addoption(
+        '--benchmark-rounds', type=int, default=10, dest='benchmark_rounds',
+        help='Number of measured rounds for each benchmark. Default is 10',
+    )
+    group.addoption(
+        '--benchmark-warmup', type=int, default=2, dest='benchmark_warmup',
+        help='Number of unmeasured warm-up rounds for each benchmark. Default is 2',
+    )
+    group.addoption(
+        '--benchmark-threshold', type=float, default=0.2, dest='benchmark_threshold', metavar='FRACTION',
+        help='Fail a benchmark when the median regresses by more than this fraction of the baseline. Default is 0.2',
+    )
+    group.addoption(
+        '--benchmark-update', action='store_true', dest='benchmark_update',
+        help='Overwrite the stored benchmark baselines for this machine',
+    )
+    group.addoption(
+        '--fixture-cache-size', type=float, default=2048, dest='fixture_cache_size', metavar='MiB',
+        help='Maximum size of the disk_cache fixture before the least recently used entries are evicted',
+    )
+    group.addoption(
+        '--profile-tests', action='store_true', dest='profile_tests',
+        help='Profile the call of each test with cProfile and export speedscope and collapsed-stack files',
+    )
+    group.addoption(
+        '--test-budget', action='append', default=[], dest='test_budget', metavar='MARKER=SECONDS',
+        help=(
+            'Time budget for tests with the marker. Use "default" for all other tests. The largest budget of the'
+            ' markers applies. Stacks are dumped when a test exceeds the budget. May be repeated'
+        ),
+    )
+    group.addoption(
+        '--test-budget-action', choices=['fail', 'abort'], default='fail', dest='test_budget_action',
+        help='Fail only the test or abort the session when a test exceeds the time budget. Default is "fail"',
+    )
+
+
+def _register_plugins(config: Any) -> None:
+    """Register the opt-in plugins that were activated from the command line.
+
+    Note: the options are only available when `pytest_addoption` is also imported
+
+    Args:
+        config: pytest configuration object
+
+    """
+    if _is_xdist_controller(config):
+        # The workers run the tests and write their own reports. The controller would overwrite them with empty reports
+        return
+    if config.getoption('profile_resources', default=False):
+        path_report = _get_report_path(config, _ResourceProfiler.report_name)
+        config.pluginmanager.register(_ResourceProfiler(path_report), 'calcipy-resources')
+    leak_interval = config.getoption('leak_check', default=0)
+    if leak_interval > 0:
+        path_report = _get_report_path(config, _LeakDetector.report_name)
+        detector = _LeakDetector(path_report, leak_interval, config.getoption('leak_threshold'))
+        config.pluginmanager.register(detector, 'calcipy-leaks')
+    if config.getoption('profile_fixtures', default=False):
+        path_report = _get_report_path(config, _FixtureProfiler.report_name)
+        profiler = _FixtureProfiler(path_report, config.getoption('fixture_threshold'))
+        config.pluginmanager.register(profiler, 'calcipy-fixtures')
+    if config.getoption('profile_tests', default=False):
+        profiler = _TestProfiler(_get_report_path(config, _TestProfiler.report_name))
+        config.pluginmanager.register(profiler, 'calcipy-cprofile')
+    budgets = _parse_budgets(config.getoption('test_budget', default=[]))
+    if budgets:
+        watchdog = _HangWatchdog(config, budgets, config.getoption('test_budget_action'))
+        config.pluginmanager.register(watchdog, 'calcipy-watchdog')
+
+
 def pytest_configure(config: Any) -> None:
-    """Configure pytest with custom markers (SLOW, CHROME, and CURRENT).
+    """Configure pytest with custom markers (SLOW, CHROME, CURRENT, and BENCHMARK) and register the opt-in plugins.
 
     Args:
         config: pytest configuration object
@@ -94,3 +1633,9 @@ def pytest_configure(config: Any) -> None:
         'markers',
         'CURRENT: tests that are currently being developed. Useful for TDD with ptw `poetry run ptw -- -m CURRENT`',
     )
+    config.addinivalue_line(
+        'markers',
+        'BENCHMARK: tests that use the `benchmark_timer` fixture. Run only benchmarks with `-m BENCHMARK`',
+    )
+
+    _register_plugins(config)
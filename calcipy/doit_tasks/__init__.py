@@ -13,11 +13,14 @@ Register all defaults doit tasks in a dodo.py file with the below snippet:
 __all__ = [  # noqa: F405
     'DOIT_CONFIG_RECOMMENDED',
     # from .doc
+    'task_check_links',
     'task_cl_bump',
     'task_cl_write',
     'task_deploy',
     'task_document',
+    'task_document_fast',
     'task_open_docs',
+    'task_optimize_site',
     'task_serve_fast',
     'task_tag_create',
     'task_tag_remove',
@@ -31,12 +34,15 @@ __all__ = [  # noqa: F405
     'task_create_tag_file',
     # from .test
     'task_coverage',
+    'task_coverage_fast',
     'task_open_test_docs',
+    'task_profile_tests',
     'task_ptw_current',
     'task_ptw_ff',
     'task_ptw_marker',
     'task_ptw_not_chrome',
     'task_test_all',
+    'task_test_benchmark',
     'task_test_keyword',
     'task_test_marker',
     'task_test',
@@ -55,6 +61,7 @@ DOIT_CONFIG_RECOMMENDED = {
         'coverage',
         'auto_format',
         'document',
+        'check_links',
         'pre_commit_hooks',
         'lint_critical_only',
         # 'type_checking',  # Not yet implemented
@@ -1,9 +1,10 @@
 """General doit Utilities and Requirements."""
 
 import shutil
+import sys
 import webbrowser
 from pathlib import Path
-from typing import Any, List, Sequence
+from typing import Any, Callable, List, Sequence
 
 from loguru import logger
 
@@ -94,6 +95,56 @@ def debug_task(actions: Sequence[Any], verbosity: int = 2) -> DoItTask:
     return task
 
 
+def defer_task(task_creator: Callable[[], DoItTask]) -> Callable[[], DoItTask]:
+    """Delay calling the task creator until doit selects the task to run, so that `doit list` stays instant.
+
+    The task name and docstring are registered immediately. The delayed loader is only attached when doit is already
+    imported, which is always the case when doit loads the tasks, so importing `calcipy.doit_tasks` stays fast
+
+    Args:
+        task_creator: `task_*` function with expensive actions, such as enumerating the project files
+
+    Returns:
+        Callable[[], DoItTask]: the same task creator
+
+    """
+    doit_loader = sys.modules.get('doit.loader')
+    if doit_loader:
+        task_name = task_creator.__name__[len('task_'):]
+        task_creator.doit_create_after = doit_loader.DelayedLoader(task_creator, creates=[task_name])
+    return task_creator
+
+
+def cmd_action(action: Any) -> Any:
+    """Wrap an action with doit's `CmdAction`, which is imported lazily to keep `calcipy.doit_tasks` fast to import.
+
+    Args:
+        action: command string or callable that returns a command string
+
+    Returns:
+        Any: `doit.action.CmdAction` action
+
+    """
+    from doit.action import CmdAction
+
+    return CmdAction(action)
+
+
+def long_running(action: Any) -> Any:
+    """Wrap an action with doit's `LongRunning`, which is imported lazily to keep `calcipy.doit_tasks` fast to import.
+
+    Args:
+        action: command string or callable that returns a command string
+
+    Returns:
+        Any: `doit.tools.LongRunning` action
+
+    """
+    from doit.tools import LongRunning
+
+    return LongRunning(action)
+
+
 def echo(msg: str) -> None:
     """Wrap the system print command.
 
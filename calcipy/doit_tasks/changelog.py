@@ -0,0 +1,237 @@
+"""Incrementally write a Changelog from conventional commits by streaming the git log."""
+
+import hashlib
+import json
+import re
+import subprocess  # noqa: S404
+from collections import defaultdict
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import attr
+from loguru import logger
+
+try:
+    import toml
+except ImportError:
+    toml = None
+
+_DEF_CHANGE_TYPE_ORDER = ['BREAKING CHANGE', 'Feat', 'Fix', 'Refactor', 'Perf']
+"""Default order of the change type sections, which matches commitizen."""
+
+_CONVENTIONAL_TYPES = {'feat': 'Feat', 'fix': 'Fix', 'refactor': 'Refactor', 'perf': 'Perf'}
+"""Map of the conventional commit types to the change type section titles."""
+
+_COMMIT_PATTERN = re.compile(r'^(?P<kind>\w+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s+(?P<message>.+)$')
+"""Match the first line of a conventional commit message, such as `fix(lint): message`."""
+
+_RECORD_SEP = '\x1e'
+"""ASCII record separator between commits in the git log output."""
+
+_FIELD_SEP = '\x00'
+"""Separator between fields of a commit in the git log output."""
+
+_GIT_FORMAT = '%H%x00%D%x00%ad%x00%B%x1e'
+"""git log format for the hash, ref names, date, and raw body with the field and record separators."""
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class _Commit:  # noqa: H601
+    """Parsed git commit."""
+
+    sha: str
+    tags: List[str]
+    date: str
+    message: str
+
+
+def _read_cz_config(path_toml: Path) -> Tuple[List[str], Dict[str, str]]:
+    """Read the change type order and legacy type map from the commitizen configuration.
+
+    Args:
+        path_toml: Path to the `pyproject.toml` file
+
+    Returns:
+        Tuple[List[str], Dict[str, str]]: change type order and the map of legacy commit types to section titles
+
+    """
+    if toml is None or not path_toml.is_file():
+        return _DEF_CHANGE_TYPE_ORDER, {}
+    cz_config = toml.loads(path_toml.read_text()).get('tool', {}).get('commitizen', {})
+    return cz_config.get('change_type_order', _DEF_CHANGE_TYPE_ORDER), cz_config.get('cz_legacy_map', {})
+
+
+def _stream_commits(path_project: Path, rev_range: Optional[str]) -> Iterator[_Commit]:
+    """Stream the commits from git log without loading the full history into memory.
+
+    Args:
+        path_project: Path to the git repository
+        rev_range: optional revision range, such as `0.1.0..HEAD`. Default is the full history
+
+    Yields:
+        _Commit: commits from newest to oldest
+
+    Raises:
+        CalledProcessError: if git fails, such as outside of a repository or for an unknown revision
+
+    """
+    cmd = ['git', 'log', f'--format={_GIT_FORMAT}', '--date=short', *([rev_range] if rev_range else [])]
+    with subprocess.Popen(  # noqa: S603
+        cmd, cwd=path_project, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8',
+        errors='replace',
+    ) as proc:
+        buffer = ''
+        for chunk in iter(partial(proc.stdout.read, 2 ** 16), ''):
+            buffer += chunk
+            *records, buffer = buffer.split(_RECORD_SEP)
+            for record in records:
+                sha, refs, date, message = record.lstrip('\n').split(_FIELD_SEP, 3)
+                tags = [ref[len('tag: '):] for ref in refs.split(', ') if ref.startswith('tag: ')]
+                yield _Commit(sha=sha, tags=tags, date=date, message=message.strip())
+        stderr = proc.stderr.read()
+        if proc.wait():
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+
+def _classify(message: str, legacy_map: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """Determine the change type section and the formatted entry for a commit message.
+
+    Args:
+        message: full commit message
+        legacy_map: map of legacy commit types (`Chg`, `New`, etc.) to section titles
+
+    Returns:
+        Optional[Tuple[str, str]]: section title and entry or None if the commit is not a recognized type
+
+    """
+    match = _COMMIT_PATTERN.match(message.split('\n', 1)[0])
+    if not match:
+        return None
+    kind = match['kind']
+    if match['breaking'] or 'BREAKING CHANGE:' in message:
+        change_type = 'BREAKING CHANGE'
+    elif kind in legacy_map:
+        change_type = legacy_map[kind]
+    elif kind.lower() in _CONVENTIONAL_TYPES:
+        change_type = _CONVENTIONAL_TYPES[kind.lower()]
+    else:
+        return None
+    scope = f'**{match["scope"]}**: ' if match['scope'] else ''
+    return change_type, f'- {scope}{match["message"].strip()}'
+
+
+def _render_section(title: str, entries: Dict[str, List[str]], change_type_order: List[str]) -> str:
+    """Render a release section in the commitizen Markdown format.
+
+    Args:
+        title: section title, such as `0.1.0 (2020-12-19)` or `Unreleased`
+        entries: entries by change type
+        change_type_order: order of the change type sections
+
+    Returns:
+        str: Markdown text
+
+    """
+    lines = [f'## {title}']
+    for change_type in [*change_type_order, *sorted(set(entries) - set(change_type_order))]:
+        if entries.get(change_type):
+            lines.extend(['', f'### {change_type}', '', *entries[change_type]])
+    return '\n'.join(lines)
+
+
+def _render_sections(
+    commits: Iterator[_Commit], change_type_order: List[str], legacy_map: Dict[str, str],
+) -> Iterator[Dict[str, Any]]:
+    """Group the commits into release sections by tag and render each one.
+
+    Args:
+        commits: commits from newest to oldest
+        change_type_order: order of the change type sections
+        legacy_map: map of legacy commit types to section titles
+
+    Yields:
+        Dict[str, Any]: `tag` (None if unreleased), `sha` of the tagged commit, and rendered `text` (empty if there
+            are no recognized commits)
+
+    """
+    def finish() -> Dict[str, Any]:
+        text = _render_section(section['title'], entries, change_type_order) if entries else ''
+        return {'tag': section['tag'], 'sha': section['sha'], 'text': text}
+
+    section: Dict[str, Any] = {'tag': None, 'sha': None, 'title': 'Unreleased'}
+    entries: Dict[str, List[str]] = defaultdict(list)
+    for commit in commits:
+        if commit.tags:
+            if entries or section['tag']:
+                yield finish()
+            section = {'tag': commit.tags[0], 'sha': commit.sha, 'title': f'{commit.tags[0]} ({commit.date})'}
+            entries = defaultdict(list)
+        classified = _classify(commit.message, legacy_map)
+        if classified:
+            entries[classified[0]].append(classified[1])
+    if entries or section['tag']:
+        yield finish()
+
+
+def _rev_parse(path_project: Path, tag: str) -> Optional[str]:
+    """Return the commit hash of a tag.
+
+    Args:
+        path_project: Path to the git repository
+        tag: tag name
+
+    Returns:
+        Optional[str]: commit hash or None if the tag does not exist
+
+    """
+    result = subprocess.run(  # noqa: S603, S607
+        ['git', 'rev-parse', '--verify', '--quiet', f'{tag}^{{commit}}'],
+        cwd=path_project, capture_output=True, text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def write_changelog(path_project: Path, path_cache: Path, path_changelog: Optional[Path] = None) -> None:
+    """Write the Changelog and only parse the commits since the last cached release tag.
+
+    Released sections are rendered once and cached by tag. The cache is discarded if the commitizen configuration
+    changed or a cached tag was moved
+
+    Args:
+        path_project: Path to the git repository with a `pyproject.toml`
+        path_cache: Path to the JSON cache of rendered release sections
+        path_changelog: optional Path to the Changelog. Default is `CHANGELOG.md` in the project directory
+
+    Raises:
+        RuntimeError: if no sections were found, so that an existing Changelog is not replaced with an empty file
+
+    """
+    path_changelog = path_changelog or path_project / 'CHANGELOG.md'
+    change_type_order, legacy_map = _read_cz_config(path_project / 'pyproject.toml')
+    config_hash = hashlib.sha256(json.dumps([change_type_order, legacy_map]).encode()).hexdigest()
+
+    cached: List[Dict[str, Any]] = []
+    try:
+        cache = json.loads(path_cache.read_text())
+        if cache.get('config_hash') == config_hash and cache['sections']:
+            latest = cache['sections'][0]
+            if _rev_parse(path_project, latest['tag']) == latest['sha']:
+                cached = cache['sections']
+    except (AttributeError, KeyError, OSError, TypeError, ValueError) as exc:
+        logger.debug(f'Ignoring the changelog cache: {exc!r}')
+        cached = []
+    rev_range = f'{cached[0]["sha"]}..HEAD' if cached else None
+    logger.info(f'Reading commits from: {rev_range or "the full history"}')
+
+    new_sections = list(_render_sections(_stream_commits(path_project, rev_range), change_type_order, legacy_map))
+    if not new_sections and not cached:
+        raise RuntimeError(f'No Changelog sections were found in the git history of {path_project}')
+    released = [sec for sec in new_sections if sec['tag']] + cached
+    path_cache.parent.mkdir(exist_ok=True, parents=True)
+    path_cache.write_text(json.dumps({'config_hash': config_hash, 'sections': released}))
+
+    unreleased = [sec for sec in new_sections if not sec['tag']]
+    text = '\n\n'.join(sec['text'] for sec in unreleased + released if sec['text']) + '\n'
+    if not path_changelog.is_file() or path_changelog.read_text() != text:
+        path_changelog.write_text(text)
@@ -0,0 +1,296 @@
+"""Cache pytest collection to select test files by keyword or marker without collecting the full test suite."""
+
+import hashlib
+import json
+import subprocess  # noqa: S404
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from loguru import logger
+
+_TEST_FILE_PATTERNS = ['test_*.py', '*_test.py']
+"""Default pytest `python_files` patterns."""
+
+_CONFIG_FILE_NAMES = ['conftest.py', 'pyproject.toml', 'pytest.ini', 'setup.cfg', 'tox.ini']
+"""Files in the project directory that can change collection. Any change invalidates the full cache."""
+
+
+def _hash_file(path_file: Path) -> str:
+    """Hash the contents of a file.
+
+    Args:
+        path_file: Path to the file
+
+    Returns:
+        str: hex digest
+
+    """
+    return hashlib.sha256(path_file.read_bytes()).hexdigest()
+
+
+def _find_test_files(path_tests: Path) -> List[Path]:
+    """Find the test files that pytest would collect by default.
+
+    Args:
+        path_tests: Path to the tests directory
+
+    Returns:
+        List[Path]: sorted list of test files
+
+    """
+    return sorted({pth for pattern in _TEST_FILE_PATTERNS for pth in path_tests.rglob(pattern)})
+
+
+def _hash_config(path_tests: Path) -> str:
+    """Hash all conftest files and the pytest configuration files.
+
+    Args:
+        path_tests: Path to the tests directory
+
+    Returns:
+        str: hex digest
+
+    """
+    paths = {*path_tests.rglob('conftest.py'), *[path_tests.parent / name for name in _CONFIG_FILE_NAMES]}
+    digest = hashlib.sha256()
+    for path_config in sorted(pth for pth in paths if pth.is_file()):
+        digest.update(path_config.as_posix().encode())
+        digest.update(path_config.read_bytes())
+    return digest.hexdigest()
+
+
+class _CollectionRecorder:  # noqa: H601
+    """pytest plugin to record the node IDs, keywords, and markers of the collected items."""
+
+    def __init__(self, path_output: Path) -> None:
+        """Initialize the plugin.
+
+        Args:
+            path_output: Path to the JSON file written when the session finishes
+
+        """
+        self.path_output = path_output
+        self.items: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.errors: Set[str] = set()
+        self._rootpath = Path()
+
+    def pytest_sessionstart(self, session: Any) -> None:
+        """Store the rootdir to resolve the node IDs of collection errors.
+
+        Args:
+            session: pytest session
+
+        """
+        self._rootpath = Path(session.config.rootpath)
+
+    def pytest_collectreport(self, report: Any) -> None:
+        """Record files that could not be collected.
+
+        Args:
+            report: pytest collection report
+
+        """
+        if report.failed:
+            self.errors.add((self._rootpath / report.nodeid.split('::')[0]).resolve().as_posix())
+
+    def pytest_collection_finish(self, session: Any) -> None:
+        """Record the collected items by file.
+
+        Args:
+            session: pytest session
+
+        """
+        for item in session.items:
+            self.items[Path(str(item.fspath)).resolve().as_posix()].append({
+                'nodeid': item.nodeid,
+                'keywords': sorted(str(key) for key in item.keywords),
+                'markers': sorted({mark.name for mark in item.iter_markers()}),
+            })
+
+    def pytest_sessionfinish(self, session: Any) -> None:
+        """Write the recorded items and errors, which is also reached when collection fails.
+
+        Args:
+            session: pytest session
+
+        """
+        self.path_output.write_text(json.dumps({'items': self.items, 'errors': sorted(self.errors)}))
+
+
+def pytest_addoption(parser: Any) -> None:
+    """Register the output option when this module is loaded as a plugin with `-p`.
+
+    Args:
+        parser: pytest option parser
+
+    """
+    parser.addoption('--collection-output', help='Path to write the collected items as JSON')
+
+
+def pytest_configure(config: Any) -> None:
+    """Register the recorder when an output path was specified.
+
+    Args:
+        config: pytest config
+
+    """
+    path_output = config.getoption('--collection-output')
+    if path_output:
+        config.pluginmanager.register(_CollectionRecorder(Path(path_output)), 'calcipy_collection_recorder')
+
+
+def _collect(paths: List[Path], python_argv: Sequence[str]) -> Tuple[Dict[Path, List[Dict[str, Any]]], Set[Path]]:
+    """Collect (but do not run) the tests in the specified files in a separate pytest process.
+
+    Args:
+        paths: test files to collect
+        python_argv: command to start the Python interpreter that has pytest and calcipy installed
+
+    Returns:
+        Tuple[Dict[Path, List[Dict[str, Any]]], Set[Path]]: items by file and the files that could not be collected
+
+    Raises:
+        RuntimeError: if the pytest process did not write the collected items
+
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path_output = Path(tmp_dir) / 'collection.json'
+        cmd = [
+            *python_argv, '-m', 'pytest', '--collect-only', '-qq', '-p', 'no:cacheprovider',
+            '-p', __name__, f'--collection-output={path_output}', *map(str, paths),
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)  # noqa: S603
+        if not path_output.is_file():
+            raise RuntimeError(f'pytest collection failed ({result.returncode}): {result.stderr.strip()}')
+        collected = json.loads(path_output.read_text())
+    items = {Path(pth): entries for pth, entries in collected['items'].items()}
+    return items, {Path(pth) for pth in collected['errors']}
+
+
+class _NameMatcher:  # noqa: H601
+    """Match identifiers from a `-k` or `-m` expression like pytest."""
+
+    def __init__(self, names: List[str], *, substring: bool) -> None:
+        """Initialize the matcher.
+
+        Args:
+            names: keywords or marker names of a test item
+            substring: if True, match case-insensitive substrings like `-k`. Otherwise, exact names like `-m`
+
+        """
+        self.names = [name.lower() for name in names] if substring else names
+        self.substring = substring
+
+    def __call__(self, name: str, **kwargs: Any) -> bool:
+        """Check if the identifier matches. Marker keyword arguments are ignored, so the selection is a superset.
+
+        Args:
+            name: identifier from the expression
+            **kwargs: optional marker keyword arguments
+
+        Returns:
+            bool: True if matched
+
+        """
+        if self.substring:
+            return any(name.lower() in known for known in self.names)
+        return name in self.names
+
+
+def _item_matches(item: Dict[str, Any], keyword_expr: Optional[Any], marker_expr: Optional[Any]) -> bool:
+    """Evaluate the `-k` and `-m` expressions against a cached item.
+
+    Args:
+        item: cached item with keywords and markers
+        keyword_expr: compiled pytest `-k` expression or None
+        marker_expr: compiled pytest `-m` expression or None
+
+    Returns:
+        bool: True if the item would be selected
+
+    """
+    if keyword_expr and not keyword_expr.evaluate(_NameMatcher(item['keywords'], substring=True)):
+        return False
+    return not marker_expr or marker_expr.evaluate(_NameMatcher(item['markers'], substring=False))
+
+
+def _load_cache(path_cache: Path, config_hash: str) -> Dict[str, Any]:
+    """Load the collection cache if the configuration has not changed.
+
+    Args:
+        path_cache: Path to the JSON cache file
+        config_hash: current hash of the conftest and configuration files
+
+    Returns:
+        Dict[str, Any]: cache with a `files` dictionary keyed by relative path
+
+    """
+    if path_cache.is_file():
+        try:
+            cache = json.loads(path_cache.read_text())
+        except json.JSONDecodeError as err:
+            logger.warning(f'Ignoring invalid cache: {path_cache}', err=err)
+        else:
+            if cache.get('config_hash') == config_hash:
+                return cache
+    return {'config_hash': config_hash, 'files': {}}
+
+
+def select_test_paths(
+    path_tests: Path, path_cache: Path, keyword: str = '', marker: str = '',
+    python_argv: Optional[Sequence[str]] = None,
+) -> List[Path]:
+    """Return only the test files with tests that match the keyword and marker expressions.
+
+    Files are only collected when their content hash (or the hash of any conftest) changed since the last call
+
+    Args:
+        path_tests: Path to the tests directory
+        path_cache: Path to the JSON cache file
+        keyword: pytest `-k` expression. Default is empty
+        marker: pytest `-m` expression. Default is empty
+        python_argv: command to start the Python interpreter for collection. Default is the current interpreter
+
+    Returns:
+        List[Path]: matching test files, an empty list if no test matches, or `[path_tests]` if all files need to be
+            collected or the collection failed
+
+    """
+    if not (keyword or marker):
+        return [path_tests]
+
+    cache = _load_cache(path_cache, _hash_config(path_tests))
+    test_files = {pth.resolve(): pth.relative_to(path_tests).as_posix() for pth in _find_test_files(path_tests)}
+    hashes = {pth: _hash_file(pth) for pth in test_files}
+    stale = [pth for pth, rel in test_files.items() if cache['files'].get(rel, {}).get('hash') != hashes[pth]]
+    errors: Set[Path] = set()
+    if stale:
+        logger.info(f'Collecting {len(stale)} of {len(test_files)} test files', stale=stale)
+        try:
+            items, errors = _collect(stale, python_argv or [sys.executable])
+        except (OSError, RuntimeError, ValueError) as err:
+            logger.warning('Could not collect the tests. Falling back to the full test directory', err=err)
+            return [path_tests]
+        for pth in stale:
+            if pth not in errors:
+                cache['files'][test_files[pth]] = {'hash': hashes[pth], 'items': items.get(pth, [])}
+    cache['files'] = {rel: entry for rel, entry in cache['files'].items() if rel in test_files.values()}
+    path_cache.parent.mkdir(exist_ok=True, parents=True)
+    path_cache.write_text(json.dumps(cache))
+
+    try:
+        from _pytest.mark.expression import Expression  # Private, but shared with `-k` and `-m`
+        keyword_expr = Expression.compile(keyword) if keyword else None
+        marker_expr = Expression.compile(marker) if marker else None
+    except (ImportError, SyntaxError) as err:
+        logger.warning('Could not compile the expressions. Falling back to the full test directory', err=err)
+        return [path_tests]
+    selected = [
+        pth for pth, rel in test_files.items()
+        if pth in errors or any(_item_matches(item, keyword_expr, marker_expr) for item in cache['files'][rel]['items'])
+    ]
+    logger.info(f'Selected {len(selected)} of {len(test_files)} test files', selected=selected)
+    return selected
@@ -1,17 +1,21 @@
 """doit Documentation Utilities."""
 
+import hashlib
 import json
 import re
+import threading
+import time
 import webbrowser
+from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Pattern
+from typing import Any, Dict, Iterable, Iterator, List, Match, Optional, Set, Tuple, Type
 
-from doit.tools import LongRunning  # FIXME: This will fail if doit is not installed...
 from loguru import logger
-from transitions import Machine
 
-from .base import debug_task, open_in_browser, read_lines
+from .base import cmd_action, debug_task, long_running, open_in_browser
 from .doit_globals import DIG, DoItTask
+from .runner import defer_cmd
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Manage Tags
@@ -87,6 +91,13 @@ def _write_pkg_init() -> None:
 # Manage Changelog
 
 
+def _write_changelog() -> None:
+    """Write the Changelog with the incremental engine, which is imported only when the task runs."""
+    from .changelog import write_changelog
+
+    write_changelog(DIG.meta.path_project, DIG.doc.path_changelog_cache)
+
+
 def task_cl_write() -> DoItTask:
     """Write a Changelog file with the raw Git history.
 
@@ -98,11 +109,13 @@ def task_cl_write() -> DoItTask:
     - https://chris.beams.io/posts/git-commit/
     - https://semver.org/
 
+    Only the commits since the last release tag are parsed. The earlier release sections are cached
+
     Returns:
         DoItTask: doit task
 
     """
-    return debug_task(['poetry run cz changelog'])
+    return debug_task([(_write_changelog, ())])
 
 
 def task_cl_bump() -> DoItTask:
@@ -112,121 +125,403 @@ def task_cl_bump() -> DoItTask:
         DoItTask: doit task
 
     """
-    return debug_task(['poetry run cz bump --changelog'])
+    return debug_task([cmd_action(defer_cmd('cz', 'bump --changelog'))])
 
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Manage README Updates
 
 
-class _ReadMeMachine:  # noqa: H601
-    """State machine to replace commented sections of readme with new text."""
+_SECTION_PATTERN = re.compile(
+    r'^(?P<start>[ \t]*<!-- (?P<key>[^/\s][^>]*?) -->)[ \t]*\n.*?^(?P<end>[ \t]*<!-- /(?P=key) -->)',
+    re.DOTALL | re.MULTILINE,
+)
+"""Match an entire marker section, such as `<!-- COVERAGE -->` ... `<!-- /COVERAGE -->`."""
 
-    states: List[str] = ['readme', 'new']
 
-    transitions: List[Dict[str, str]] = [
-        {'trigger': 'start_new', 'source': 'readme', 'dest': 'new'},
-        {'trigger': 'end', 'source': 'new', 'dest': 'readme'},
-    ]
+def _read_code_section(key: str) -> Optional[List[str]]:
+    """Read the source code for a `CODE:<relative path>` marker.
+
+    Args:
+        key: marker key
+
+    Returns:
+        Optional[List[str]]: lines of the fenced code block or None if the file could not be found
+
+    """
+    script_path = DIG.meta.path_project / key.split(':', 1)[1]
+    if not script_path.is_file():
+        logger.warning(f'Could not locate: {script_path}')
+        return None
+    return [line.rstrip() for line in ['```py', *script_path.read_text().rstrip().split('\n'), '```']]
+
+
+def _inject_sections(text: str, new_text: Dict[str, List[str]], keys: Optional[Set[str]] = None) -> str:
+    """Replace the contents of every known marker section in a single pass.
+
+    Args:
+        text: Markdown text
+        new_text: dictionary of section lines with the marker key. `CODE:` sections are read from the linked file
+        keys: optional set of the only section keys to update. Default is all sections
+
+    Returns:
+        str: updated text. Sections without new text are left unchanged
+
+    """
+    def replace(match: Match[str]) -> str:
+        key = match.group('key')
+        if keys is not None and key not in keys:
+            return match.group(0)
+        lines = new_text.get(key)
+        if lines is None and key.startswith('CODE:'):
+            lines = _read_code_section(key)
+        if lines is None:
+            return match.group(0)
+        return '\n'.join([match.group('start'), '', *lines, '', match.group('end')])
+
+    return _SECTION_PATTERN.sub(replace, text)
 
-    readme_lines: Optional[List[str]] = None
 
-    def __init__(self) -> None:
-        """Initialize state machine."""
-        self.machine = Machine(model=self, states=self.states, initial='readme', transitions=self.transitions)
+def _get_markdown_paths() -> List[Path]:
+    """List the README and the Markdown files in `docs/`.
+
+    Returns:
+        List[Path]: Paths to the Markdown files that exist
+
+    """
+    paths_md = [DIG.meta.path_project / 'README.md', *sorted((DIG.meta.path_project / 'docs').rglob('*.md'))]
+    return [pth for pth in paths_md if pth.is_file()]
+
+
+def _write_to_markdown(new_text: Dict[str, List[str]], keys: Optional[Set[str]] = None) -> List[Path]:
+    """Replace the marker sections in the README and the Markdown files in `docs/`.
+
+    Each file is read once and is only written if the content changed
+
+    Args:
+        new_text: dictionary of section lines with the marker key
+        keys: optional set of the only section keys to update. Default is all sections
+
+    Returns:
+        List[Path]: Paths to the files that were written
+
+    """
+    written = []
+    for path_md in _get_markdown_paths():
+        text = path_md.read_text()
+        if '<!-- ' not in text:
+            continue
+        updated = _inject_sections(text, new_text, keys)
+        if updated != text:
+            logger.info(f'Updating marker sections in {path_md}')
+            path_md.write_text(updated)
+            written.append(path_md)
+    return written
+
+
+def _hash_file(path_file: Path, chunk_size: int = 2 ** 20) -> str:
+    """Hash the contents of a file in chunks.
+
+    Args:
+        path_file: Path to the file
+        chunk_size: bytes to read at a time. Default is 1 MiB
+
+    Returns:
+        str: hex digest
+
+    """
+    digest = hashlib.sha256()
+    with path_file.open('rb') as data_file:
+        for chunk in iter(partial(data_file.read, chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_coverage_table(
+    cov: Any, timestamp: str, skipped_errors: Tuple[Type[Exception], ...] = (),
+) -> Iterator[str]:
+    """Yield the lines of the Markdown coverage table one file at a time.
+
+    Args:
+        cov: loaded `coverage.Coverage` instance
+        timestamp: time that the data file was last written
+        skipped_errors: exceptions from `analysis2` that skip the file, such as `NoSource` for a deleted file
+
+    Yields:
+        str: Markdown table lines
+
+    """
+    legend = ['File', 'Statements', 'Missing', 'Excluded', 'Coverage']
+    yield f"| {' | '.join(legend)} |"
+    yield f"| {' | '.join(['--:'] * len(legend))} |"
+    for file_path in sorted(cov.get_data().measured_files()):
+        try:
+            _name, statements, excluded, missing, _missing_text = cov.analysis2(file_path)
+        except skipped_errors as exc:
+            logger.warning(f'Skipping {file_path} in the coverage table: {exc}')
+            continue
+        try:
+            rel_path = Path(file_path).resolve().relative_to(DIG.meta.path_project).as_posix()
+        except ValueError:
+            rel_path = Path(file_path).as_posix()
+        per = round((len(statements) - len(missing)) / len(statements) * 100, 1) if statements else 100.0
+        yield f'| `{rel_path}` | {len(statements)} | {len(missing)} | {len(excluded)} | {per}% |'
+    yield ''
+    yield f'Generated on: {timestamp}'
+
+
+def _get_coverage_section() -> Tuple[Dict[str, List[str]], Optional[str]]:
+    """Read the `.coverage` data file and create a Markdown table for the `COVERAGE` section.
+
+    The table is skipped when the hash of the data file matches the last update. Record the returned hash with
+    `_save_coverage_hash` only after the section was written
+
+    Returns:
+        Tuple[Dict[str, List[str]], Optional[str]]: the `COVERAGE` section lines or an empty dictionary if unchanged
+            or unavailable, and the hash of the data file or None
+
+    """
+    path_data = DIG.meta.path_project / '.coverage'
+    if not path_data.is_file():
+        logger.warning(f'Could not locate: {path_data}')
+        return {}, None
+    try:
+        from coverage import Coverage, CoverageException
+    except ImportError:
+        logger.warning('Install coverage to update the README coverage table')
+        return {}, None
+
+    path_cache = DIG.test.path_out / 'readme_coverage.json'
+    data_hash = _hash_file(path_data)
+    if path_cache.is_file() and json.loads(path_cache.read_text()).get('hash') == data_hash:
+        logger.debug('Coverage data has not changed', path_data=path_data)
+        return {}, None
+
+    cov = Coverage(data_file=str(path_data))
+    cov.load()
+    timestamp = datetime.fromtimestamp(path_data.stat().st_mtime).isoformat(timespec='seconds')
+    return {'COVERAGE': list(_iter_coverage_table(cov, timestamp, (CoverageException,)))}, data_hash
+
+
+def _save_coverage_hash(data_hash: Optional[str]) -> None:
+    """Record the hash of the coverage data file after the `COVERAGE` section was written.
+
+    Args:
+        data_hash: hash from `_get_coverage_section` or None if the section was not generated
+
+    """
+    if data_hash:
+        path_cache = DIG.test.path_out / 'readme_coverage.json'
+        path_cache.parent.mkdir(exist_ok=True, parents=True)
+        path_cache.write_text(json.dumps({'hash': data_hash}))
+
+
+def _write_markdown_sections() -> None:
+    """Fill the `CODE:` and `COVERAGE` marker sections in the README and docs with one read per file."""
+    new_text, data_hash = _get_coverage_section()
+    _write_to_markdown(new_text)
+    _save_coverage_hash(data_hash)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Live Section Updates
+
+
+def _get_section_sources() -> Dict[Path, Set[str]]:
+    """Map each source file to the keys of the marker sections that are generated from it.
+
+    Returns:
+        Dict[Path, Set[str]]: section keys by source file
+
+    """
+    sources: Dict[Path, Set[str]] = {}
+    for path_md in _get_markdown_paths():
+        for match in _SECTION_PATTERN.finditer(path_md.read_text()):
+            key = match.group('key')
+            if key.startswith('CODE:'):
+                path_src = DIG.meta.path_project / key.split(':', 1)[1]
+            elif key == 'COVERAGE':
+                path_src = DIG.meta.path_project / '.coverage'
+            else:
+                continue
+            sources.setdefault(path_src, set()).add(key)
+    return sources
+
+
+def _touch_including_pages(paths_written: List[Path]) -> None:
+    """Touch the docs pages that include a written file with `markdown_include` so that mkdocs reloads them.
+
+    Args:
+        paths_written: Paths to the Markdown files that were updated
+
+    """
+    path_docs = DIG.meta.path_project / 'docs'
+    includes = {
+        pth.relative_to(DIG.meta.path_project).as_posix() for pth in paths_written if path_docs not in pth.parents
+    }
+    if includes:
+        for path_md in path_docs.rglob('*.md'):
+            text = path_md.read_text()
+            if any(f'{{!{rel_path}!}}' in text for rel_path in includes):
+                path_md.touch()
+
 
-    def parse(  # noqa: CCR001
-        self, lines: List[str], comment_pattern: Pattern[str],
-        new_text: Dict[str, str],
-    ) -> List[str]:
-        """Parse lines and insert new_text.
+class _SectionWatcher(threading.Thread):  # noqa: H601
+    """Poll the source files of the marker sections and regenerate only the affected sections."""
+
+    def __init__(self, interval: float = 1.0) -> None:
+        """Initialize the daemon thread.
+
+        Args:
+            interval: seconds between polls. Default is 1
+
+        """
+        super().__init__(daemon=True)
+        self.interval = interval
+        self._md_mtimes: Dict[Path, float] = {}
+        self._sources: Dict[Path, Set[str]] = {}
+        self._src_mtimes: Dict[Path, float] = {}
+
+    @staticmethod
+    def _get_mtimes(paths: Iterable[Path]) -> Dict[Path, float]:
+        """Read the modified times of the files.
 
         Args:
-            lines: list of text files
-            comment_pattern: comment pattern to match (ex: ``)
-            new_text: dictionary with comment string as key
+            paths: Paths to the files, which are skipped if missing
+
+        Returns:
+            Dict[Path, float]: modified time by Path
+
+        """
+        return {pth: pth.stat().st_mtime for pth in paths if pth.is_file()}
+
+    def poll(self) -> Set[str]:
+        """Check for changed source files and refresh the map of sources if any Markdown file changed.
 
         Returns:
-            list: list of strings for README
+            Set[str]: keys of the sections that need to be regenerated
+
+        """
+        md_mtimes = self._get_mtimes(_get_markdown_paths())
+        if md_mtimes != self._md_mtimes:
+            self._sources = _get_section_sources()
+            self._md_mtimes = md_mtimes  # Only stored once the sources were read, so that a failure is retried
+        src_mtimes = self._get_mtimes(self._sources)
+        changed = {pth for pth, mtime in src_mtimes.items() if self._src_mtimes.get(pth, mtime) != mtime}
+        self._src_mtimes = src_mtimes
+        return {key for pth in changed for key in self._sources.get(pth, set())}
+
+    def update(self, keys: Set[str]) -> None:
+        """Regenerate only the specified sections.
+
+        Args:
+            keys: section keys to regenerate
 
         """
-        self.readme_lines = []
-        for line in lines:
-            if comment_pattern.match(line):
-                self.readme_lines.append(line)
-                if line.strip().startswith('<!-- /'):
-                    self.end()
-                else:
-                    key = comment_pattern.match(line).group(1)
-                    self.readme_lines.extend(['', *new_text[key], ''])
-                    self.start_new()
-            elif self.state == 'readme':
-                self.readme_lines.append(line)
-
-            new_line = self.readme_lines[-1]
-            made_change = (line != new_line)
-            logger.debug(
-                'Parsed README Line', self_state=self.state, line=line,
-                made_change=made_change, new_line=new_line if made_change else None,
-            )
-
-        return self.readme_lines
-
-
-# FIXME: This was for a very specific implementation. See #36 for variable defintion
-def _write_to_readme(comment_pattern: Pattern[str], new_text: Dict[str, str]) -> None:
-    """Wrap _ReadMeMachine. Handle reading then writing changes to the README.
+        logger.info(f'Regenerating sections: {sorted(keys)}')
+        new_text, data_hash = _get_coverage_section() if 'COVERAGE' in keys else ({}, None)
+        paths_written = _write_to_markdown(new_text, keys)
+        _save_coverage_hash(data_hash)
+        _touch_including_pages(paths_written)
+        self._md_mtimes = self._get_mtimes(_get_markdown_paths())  # Ignore the files that were just written
+
+    def run(self) -> None:
+        """Poll until the process exits. Errors are logged so that one bad file does not stop the watcher."""
+        is_first = True  # The first poll only records the modified times
+        while True:
+            try:
+                keys = self.poll()
+                if keys and not is_first:
+                    self.update(keys)
+            except Exception:  # noqa: B902
+                logger.exception('Failed to regenerate the marker sections')
+            is_first = False
+            time.sleep(self.interval)
+
+
+def _start_section_watcher() -> None:
+    """Start the background thread that keeps the marker sections up to date."""
+    _SectionWatcher().start()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# API Reference Stubs
+
+
+_STUB_PATTERN = re.compile(r'::: [\w.]+\n?')
+"""Match the content of a generated reference stub. Other pages in `docs/reference` are never removed."""
+
+
+def _get_reference_stubs(path_ref: Path) -> Dict[Path, str]:
+    """Map each public module in the package to a mkdocstrings reference stub.
 
     Args:
-        comment_pattern: comment pattern to match (ex: ``)
-        new_text: dictionary with comment string as key
+        path_ref: Path to the `docs/reference` directory
+
+    Returns:
+        Dict[Path, str]: stub text keyed by the Path to the stub, sorted by module
 
     """
-    readme_path = DIG.meta.path_project / 'README.md'
-    readme_lines = _ReadMeMachine().parse(read_lines(readme_path), comment_pattern, new_text)
-    readme_path.write_text('\n'.join(readme_lines))
-
-
-def _write_code_to_readme() -> None:
-    """Replace commented sections in README with linked file contents."""
-    comment_pattern = re.compile(r'\s*<!-- /?(CODE:.*) -->')
-    fn = 'tests/examples/readme.py'
-    script_path = DIG.meta.path_project / fn
-    if script_path.is_file():
-        source_code = ['```py', *read_lines(script_path), '```']
-        new_text = {f'CODE:{fn}': [f'{line}'.rstrip() for line in source_code]}
-        _write_to_readme(comment_pattern, new_text)
-    else:
-        logger.warning(f'Could not locate: {script_path}')
+    stubs = {}
+    for path_py in sorted((DIG.meta.path_project / DIG.meta.pkg_name).rglob('*.py')):
+        rel_path = path_py.relative_to(DIG.meta.path_project).with_suffix('')
+        if not any(part.startswith('_') for part in rel_path.parts):
+            stubs[path_ref / rel_path.with_suffix('.md')] = f'::: {".".join(rel_path.parts)}\n'
+    return stubs
 
 
-def _write_coverage_to_readme() -> None:
-    """Read the coverage.json file and write a Markdown table to the README file."""
-    try:
-        from subprocess_tee import run  # noqa: S404
-    except ImportError:
-        from subprocess import run  # noqa: S404
-    # Attempt to create the coverage file
-    run('poetry run python -m coverage json')  # noqa: S603, S607
-
-    coverage_path = (DIG.meta.path_project / 'coverage.json')
-    if coverage_path.is_file():
-        # Read coverage information from json file
-        coverage = json.loads(coverage_path.read_text())
-        # Collect raw data
-        legend = ['File', 'Statements', 'Missing', 'Excluded', 'Coverage']
-        int_keys = ['num_statements', 'missing_lines', 'excluded_lines']
-        rows = [legend, ['--:'] * len(legend)]
-        for file_path, file_obj in coverage['files'].items():
-            rel_path = Path(file_path).resolve().relative_to(DIG.meta.path_project).as_posix()
-            per = round(file_obj['summary']['percent_covered'], 1)
-            rows.append([f'`{rel_path}`'] + [file_obj['summary'][key] for key in int_keys] + [f'{per}%'])
-        # Format table for Github Markdown
-        table_lines = [f"| {' | '.join([str(value) for value in row])} |" for row in rows]
-        table_lines.extend(['', f"Generated on: {coverage['meta']['timestamp']}"])
-        # Replace coverage section in README
-        comment_pattern = re.compile(r'<!-- /?(COVERAGE) -->')
-        _write_to_readme(comment_pattern, {'COVERAGE': table_lines})
+def _update_reference_nav(path_ref: Path, stub_paths: List[Path]) -> None:
+    """Replace the entries of the `- Reference:` block in the mkdocs nav, if present.
+
+    Args:
+        path_ref: Path to the `docs/reference` directory
+        stub_paths: Paths to the reference stubs
+
+    """
+    path_config = DIG.meta.path_project / 'mkdocs.yml'
+    if not path_config.is_file():
+        return
+    text = path_config.read_text()
+    match = re.search(r'^(?P<indent>[ \t]*)- Reference:[ \t]*\n(?:(?P=indent)[ \t]+\S.*\n?)*', text, re.MULTILINE)
+    if not match:
+        return
+    indent = match.group('indent')
+    docs_dir = path_ref.parent
+    entries = [
+        f'{indent}    - {".".join(pth.relative_to(path_ref).with_suffix("").parts)}: '
+        f'{pth.relative_to(docs_dir).as_posix()}\n'
+        for pth in stub_paths
+    ]
+    updated = text[:match.start()] + f'{indent}- Reference:\n' + ''.join(entries) + text[match.end():]
+    if updated != text:
+        path_config.write_text(updated)
+
+
+def _write_reference_stubs() -> None:
+    """Create, update, or remove the `docs/reference` stubs so that there is one per public module in the package.
+
+    Only stubs with changed content are written, so that mkdocs does not see unnecessary changes. Only generated
+    stubs for removed modules are deleted, so hand-written pages are kept
+
+    """
+    path_ref = DIG.meta.path_project / 'docs/reference'
+    stubs = _get_reference_stubs(path_ref)
+    for path_stub, text in stubs.items():
+        if not path_stub.is_file() or path_stub.read_text() != text:
+            logger.info(f'Writing reference stub: {path_stub}')
+            path_stub.parent.mkdir(exist_ok=True, parents=True)
+            path_stub.write_text(text)
+
+    path_pkg_ref = path_ref / DIG.meta.pkg_name
+    for path_stub in sorted(path_pkg_ref.rglob('*.md'), reverse=True):
+        if path_stub not in stubs and _STUB_PATTERN.fullmatch(path_stub.read_text()):
+            logger.info(f'Removing reference stub: {path_stub}')
+            path_stub.unlink()
+    for path_dir in sorted((pth for pth in path_pkg_ref.rglob('*') if pth.is_dir()), reverse=True):
+        if not any(path_dir.iterdir()):
+            path_dir.rmdir()
+
+    _update_reference_nav(path_ref, [*stubs])
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -236,6 +531,9 @@ def _write_coverage_to_readme() -> None:
 def task_serve_fast() -> DoItTask:
     """Serve the site with `--dirtyreload` and open in a web browser.
 
+    A background thread regenerates only the marker sections (`CODE:`, `COVERAGE`) whose source files change, so that
+    mkdocs only reloads the affected pages
+
     Note: use only for large projects. `poetry run mkdocs serve` is preferred for smaller projects
 
     Returns:
@@ -243,19 +541,28 @@ def task_serve_fast() -> DoItTask:
 
     """
     return debug_task([
+        (_write_markdown_sections, ()),
+        (_start_section_watcher, ()),
         (webbrowser.open, ('http://localhost:8000',)),
-        LongRunning('poetry run mkdocs serve --dirtyreload'),
+        long_running(defer_cmd('mkdocs', 'serve --dirtyreload')),
     ])
 
 
 def task_deploy() -> DoItTask:
-    """Deploy to Github `gh-pages` branch.
+    """Deploy the optimized site to Github `gh-pages` branch.
+
+    `mkdocs gh-deploy` would rebuild the site and discard the optimized output, so the site is built and optimized by
+    `task_optimize_site` and then published with `ghp-import`
 
     Returns:
         DoItTask: doit task
 
     """
-    return debug_task([LongRunning('poetry run mkdocs gh-deploy')])
+    task = debug_task([
+        long_running(defer_cmd('ghp-import', f'--no-jekyll --push --force "{DIG.doc.path_out}"')),
+    ])
+    task['task_dep'] = ['optimize_site']
+    return task
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Main Documentation Tasks
@@ -269,13 +576,87 @@ def task_document() -> DoItTask:
 
     """
     return debug_task([
-        (_write_code_to_readme, ()),
-        (_write_coverage_to_readme, ()),
+        (_write_reference_stubs, ()),
+        (_write_markdown_sections, ()),
+        (_write_pkg_init, ()),
+        cmd_action(defer_cmd('mkdocs', 'build')),  # --site-dir DIG.doc.path_out
+    ])
+
+
+def _build_site() -> None:
+    """Incrementally build the site, which imports the build cache only when the task runs."""
+    from .site_cache import build_site
+
+    build_site(DIG.meta.path_project, DIG.meta.path_project / 'docs', DIG.doc.path_out, DIG.doc.path_build_cache)
+
+
+def task_document_fast() -> DoItTask:
+    """Build the HTML documentation, but only re-render pages with changed Markdown, API modules, or includes.
+
+    Changes to `mkdocs.yml` or the list of pages trigger a full build
+
+    Returns:
+        DoItTask: doit task
+
+    """
+    return debug_task([
+        (_write_reference_stubs, ()),
+        (_write_markdown_sections, ()),
         (_write_pkg_init, ()),
-        'poetry run mkdocs build',  # --site-dir DIG.doc.path_out
+        (_build_site, ()),
     ])
 
 
+def _optimize_site() -> None:
+    """Optimize the built site, which imports the optimizer only when the task runs."""
+    from .site_optimize import optimize_site
+
+    optimize_site(DIG.doc.path_out, DIG.doc.path_optimize_cache)
+
+
+def task_optimize_site() -> DoItTask:
+    """Build the site with `task_document`, then optimize the output for `task_deploy`.
+
+    Minifies HTML, CSS, and JS (with the optional `rjsmin`), losslessly optimizes images (with `optipng` and
+    `jpegtran`, if installed), and writes precompressed `.gz` siblings. Unchanged files are skipped
+
+    Returns:
+        DoItTask: doit task
+
+    """
+    task = debug_task([(_optimize_site, ())])
+    task['task_dep'] = ['document']
+    return task
+
+
+def _check_site_links() -> None:
+    """Check the links in the built site.
+
+    Raises:
+        RuntimeError: if any internal links, anchors, or asset references are broken
+
+    """
+    from .link_check import check_links
+
+    broken = check_links(DIG.doc.path_out, DIG.doc.path_link_cache)
+    if broken:
+        raise RuntimeError('Found broken links:\n' + '\n'.join(broken))
+
+
+def task_check_links() -> DoItTask:
+    """Check the internal links, anchors, and asset references of the site built by `task_document`.
+
+    External URLs are not checked, so no network access is required
+
+    Returns:
+        DoItTask: doit task
+
+    """
+    task = debug_task([(_check_site_links, ())])
+    task['task_dep'] = ['document']
+    return task
+
+
 def task_open_docs() -> DoItTask:
     """Open the documentation files in the default browser.
 
@@ -1,8 +1,10 @@
 """Global Variables for doit."""
 
-import inspect
+import hashlib
+import json
+import os
 import warnings
-from functools import partial
+from contextlib import suppress
 from pathlib import Path
 from typing import Any, Callable, Dict, List, NewType, Optional, Sequence, Tuple, Union
 
@@ -11,11 +13,6 @@ from loguru import logger
 
 from ..log_helpers import log_fun
 
-try:
-    import toml
-except ImportError:
-    toml = None
-
 _DOIT_TASK_IMPORT_ERROR = 'User must install the optional calcipy extra "development" to utilize "doit_tasks"'
 """Standard error message when an optional import is not available. Raise with RuntimeError."""
 
@@ -26,74 +23,165 @@ DoItTask = NewType('DoItTask', Dict[str, Union[str, Tuple[Callable, Sequence]]])
 """doit task type for annotations."""
 
 
-def _member_filter(member: Any, instance_type: Any) -> bool:
-    """Return True if the member matches the filters.
+def _verify_initialized_paths(cls: object) -> None:
+    """Verify that all paths are not None.
+
+    WARN: will not raise on error the class attribute
 
     Args:
-        member: class data- or method-member
-        instance_type: optional instance type
+        cls: class
 
-    Returns:
-        bool: True if the member matches the applied filter
+    Raises:
+        RuntimeError: if any paths are None
 
     """
-    return (instance_type is None or isinstance(member, instance_type))
+    logger.info(f'Class: {cls}')
+    missing = [
+        field.name for field in attr.fields(type(cls))
+        if field.name.startswith('path_') and getattr(cls, field.name, '') is None
+    ]
+    if missing:
+        kwargs = ', '.join(missing)
+        raise RuntimeError(f'Missing keyword arguments for: {kwargs}')
 
 
-def _get_members(cls: object, prefix: Optional[str], **kwargs: Any) -> List[Tuple[str, Callable]]:
-    """Return the members that match the parameters.
+def _resolve_class_paths(cls: object, base_path: Path) -> None:
+    """Resolve all partial paths with the specified base path.
+
+    The Path fields are found from the attrs field definitions rather than by inspecting every class member
 
-    Example to return all methods that start with `do_`: `_get_members(cls, instance_type=Callable, prefix='do_')`
+    WARN: will mutate the class attribute
 
     Args:
         cls: class
-        prefix: optional string prefix to check starts with
-        **kwargs: keyword arguments passed to `_member_filter`
+        base_path: base path to apply to all found relative paths
+
+    """
+    logger.info(f'Class: {cls}')
+    for field in attr.fields(type(cls)):
+        path_raw = getattr(cls, field.name, None)
+        if isinstance(path_raw, Path) and not path_raw.is_absolute():
+            setattr(cls, field.name, base_path / path_raw)
+            logger.debug(f'Mutated: self.{field.name}={path_raw} (now: {getattr(cls, field.name)})')
+
+
+def _get_user_cache_dir() -> Path:
+    """Return the calcipy directory in the user cache directory.
 
     Returns:
-        List[Tuple[str, Callable]]: filtered members from the class
+        Path: `calcipy` directory in `XDG_CACHE_HOME` or `~/.cache`
 
     """
-    members = inspect.getmembers(cls, predicate=partial(_member_filter, **kwargs))
-    if prefix:
-        members = [(name, member) for (name, member) in members if name.startswith(prefix)]
-    return members  # noqa: R504
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'calcipy'
 
 
-def _verify_initialized_paths(cls: object) -> None:
-    """Verify that all paths are not None.
+def get_user_cache_path(path_source: Path, prefix: str) -> Path:
+    """Return the path to a JSON cache file in the user cache directory that is unique to the source path.
 
-    WARN: will not raise on error the class attribute
+    Args:
+        path_source: Path to the file or directory that the cache describes
+        prefix: file name prefix for the type of cache
+
+    Returns:
+        Path: JSON file in the user cache directory (`XDG_CACHE_HOME` or `~/.cache`)
+
+    """
+    key = hashlib.sha256(path_source.resolve().as_posix().encode()).hexdigest()[:16]
+    return _get_user_cache_dir() / f'{prefix}-{key}.json'
+
+
+def prune_user_cache(prefix: str, key: str) -> None:
+    """Remove the JSON cache files of one type whose source path no longer exists, such as for deleted projects.
+
+    Call only when a cache file is written, so that reading a valid cache never lists the cache directory
 
     Args:
-        cls: class
+        prefix: file name prefix for the type of cache
+        key: JSON key with the posix path to the source file or directory
 
-    Raises:
-        RuntimeError: if any paths are None
+    """
+    for path_cache in _get_user_cache_dir().glob(f'{prefix}-*.json'):
+        try:
+            source = json.loads(path_cache.read_text())[key]
+        except (KeyError, OSError, TypeError, ValueError):
+            source = ''
+        if not source or not Path(source).exists():
+            logger.debug(f'Removing the stale cache file: {path_cache}')
+            with suppress(OSError):
+                path_cache.unlink()
+
+
+def _get_snapshot_path(path_toml: Path) -> Path:
+    """Return the path to the configuration snapshot for the `pyproject.toml` file.
+
+    Args:
+        path_toml: Path to the `pyproject.toml` file
+
+    Returns:
+        Path: JSON file in the user cache directory
 
     """
-    logger.info(f'Class: {cls}')
-    missing = [name for name, _m in _get_members(cls, instance_type=type(None), prefix='path_')]
-    if missing:
-        kwargs = ', '.join(missing)
-        raise RuntimeError(f'Missing keyword arguments for: {kwargs}')
+    return get_user_cache_path(path_toml, 'config')
 
 
-def _resolve_class_paths(cls: object, base_path: Path) -> None:
-    """Resolve all partial paths with the specified base path.
+def _read_snapshot(path_snapshot: Path) -> Dict[str, Any]:
+    """Read the configuration snapshot.
 
-    WARN: will mutate the class attribute
+    Args:
+        path_snapshot: Path to the JSON snapshot
+
+    Returns:
+        Dict[str, Any]: snapshot or an empty dictionary if the file is missing or malformed
+
+    """
+    try:
+        snapshot = json.loads(path_snapshot.read_text())
+        snapshot['poetry'] = {'name': snapshot['poetry']['name'], 'version': snapshot['poetry']['version']}
+    except (KeyError, OSError, TypeError, ValueError):
+        return {}
+    return snapshot
+
+
+def _load_poetry_config(path_toml: Path) -> Dict[str, str]:
+    """Read the package name and version from the `pyproject.toml` file or from a snapshot if the file is unchanged.
+
+    The snapshot is keyed by the modified time and the content hash of the file, so the file is only parsed when both
+    changed. Malformed snapshots are ignored and snapshots of removed files are pruned
 
     Args:
-        cls: class
-        base_path: base path to apply to all found relative paths
+        path_toml: Path to the `pyproject.toml` file
+
+    Returns:
+        Dict[str, str]: `name` and `version` of the package
+
+    Raises:
+        RuntimeError: if the toml package is not available and there is no valid snapshot
 
     """
-    logger.info(f'Class: {cls}')
-    for name, path_raw in _get_members(cls, instance_type=type(Path()), prefix=None):
-        if not path_raw.is_absolute():
-            setattr(cls, name, base_path / path_raw)
-            logger.debug(f'Mutated: self.{name}={path_raw} (now: {getattr(cls, name)})')
+    path_snapshot = _get_snapshot_path(path_toml)
+    mtime_ns = path_toml.stat().st_mtime_ns
+    snapshot = _read_snapshot(path_snapshot)
+    if snapshot.get('mtime_ns') == mtime_ns:
+        return snapshot['poetry']
+
+    content = path_toml.read_bytes()
+    toml_hash = hashlib.sha256(content).hexdigest()
+    if snapshot.get('hash') != toml_hash:
+        # Note: toml is an optional dependency required only when using the `doit_tasks` in development. The import
+        #   is deferred to the first snapshot miss because the snapshot usually makes it unnecessary
+        try:
+            import toml
+        except ImportError as err:
+            raise RuntimeError(_DOIT_TASK_IMPORT_ERROR) from err
+        poetry_config = toml.loads(content.decode())['tool']['poetry']
+        snapshot = {'hash': toml_hash, 'poetry': {'name': poetry_config['name'], 'version': poetry_config['version']}}
+    snapshot['mtime_ns'] = mtime_ns
+    snapshot['path_toml'] = path_toml.resolve().as_posix()
+    prune_user_cache('config', 'path_toml')
+    with suppress(OSError):
+        path_snapshot.parent.mkdir(exist_ok=True, parents=True)
+        path_snapshot.write_text(json.dumps(snapshot))
+    return snapshot['poetry']
 
 
 _DEF_EXCLUDE = [*map(Path, ['__init__.py'])]
@@ -136,18 +224,13 @@ class PackageMeta(_PathAttrBase):  # noqa: H601
         """Finish initializing class attributes.
 
         Raises:
-            RuntimeError: if the toml package is not available
             FileNotFoundError: if the toml could not be located
 
         """
         super().__attrs_post_init__()
 
-        # Note: toml is an optional dependency required only when using the `doit_tasks` in development
-        if toml is None:
-            raise RuntimeError(_DOIT_TASK_IMPORT_ERROR)
-
         try:
-            poetry_config = toml.load(self.path_toml)['tool']['poetry']
+            poetry_config = _load_poetry_config(self.path_toml)
         except FileNotFoundError:
             raise FileNotFoundError(f'Check that "{self.path_project}" is correct. Could not find: {self.path_toml}')
 
@@ -165,7 +248,7 @@ class LintConfig(_PathAttrBase):  # noqa: H601
     path_flake8: Path = Path('.flake8')
     """Path to the flake8 configuration file."""
 
-    paths: List[Path] = []
+    paths: List[Path] = attr.ib(factory=list)
     """List of file and directory Paths to lint."""
 
     paths_excluded: List[Path] = _DEF_EXCLUDE
@@ -182,6 +265,9 @@ class TestingConfig(_PathAttrBase):  # noqa: H601
     path_tests: Path = Path('tests')
     """Path to the tests directory."""
 
+    pytest_args: str = ''
+    """Additional arguments for the `test`, `test_all`, and `coverage` tasks, such as `--test-budget=default=120`."""
+
     path_report_index: Path = attr.ib(init=False)
     """Path to the report HTML file."""
 
@@ -191,7 +277,6 @@ class TestingConfig(_PathAttrBase):  # noqa: H601
     def __attrs_post_init__(self) -> None:
         """Finish initializing class attributes."""
         super().__attrs_post_init__()
-        self.path_out.mkdir(exist_ok=True, parents=True)
         self.path_report_index = self.path_out / 'test_report.html'
         self.path_coverage_index = self.path_out / 'cov_html/index.html'
 
@@ -203,14 +288,21 @@ class DocConfig(_PathAttrBase):  # noqa: H601
     path_out: Path = Path('releases/site')
     """Path to the documentation output directory."""
 
+    path_build_cache: Path = Path('releases/site_cache.json')
+    """Path to the incremental build cache, which is outside of `path_out` because full builds remove the directory."""
+
+    path_link_cache: Path = Path('releases/link_cache.json')
+    """Path to the cache of parsed pages for the link checker."""
+
+    path_changelog_cache: Path = Path('releases/changelog_cache.json')
+    """Path to the cache of rendered Changelog release sections."""
+
+    path_optimize_cache: Path = Path('releases/site_optimize_cache.json')
+    """Path to the cache of the optimized site file hashes."""
+
     paths_excluded: List[Path] = _DEF_EXCLUDE
     """List of excluded relative Paths."""
 
-    def __attrs_post_init__(self) -> None:
-        """Finish initializing class attributes."""
-        super().__attrs_post_init__()
-        self.path_out.mkdir(exist_ok=True, parents=True)
-
 
 @attr.s(auto_attribs=True, kw_only=True)
 class DoItGlobals:
@@ -0,0 +1,206 @@
+"""Persistent index of the project files that is shared by the lint, format, and tag tasks."""
+
+import json
+import os
+from contextlib import suppress
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import attr
+from loguru import logger
+
+from .doit_globals import DIG, get_user_cache_path, prune_user_cache
+
+_PRUNED_NAMES = {'__pycache__', 'node_modules'}
+"""Directory names that are never indexed, in addition to hidden directories."""
+
+
+def _is_pruned(name: str) -> bool:
+    """Check if the directory should not be indexed.
+
+    Args:
+        name: directory name
+
+    Returns:
+        bool: True for hidden directories and `_PRUNED_NAMES`
+
+    """
+    return name.startswith('.') or name in _PRUNED_NAMES
+
+
+@attr.s(auto_attribs=True)
+class FileIndex:  # noqa: H601
+    """Index of the files below a root directory that only re-lists directories with a changed modified time.
+
+    Adding, removing, or renaming an entry updates the modified time of the parent directory, so the file and
+    sub-directory names of unchanged directories are read from the cache without calling `os.scandir`
+
+    """
+
+    path_root: Path
+    """Path to the indexed directory."""
+
+    path_cache: Optional[Path] = None
+    """Optional Path to the JSON file that persists the index between runs."""
+
+    pruned_dirs: FrozenSet[Path] = frozenset()
+    """Absolute directory paths that are never indexed, such as the generated output."""
+
+    _dirs: Dict[str, Tuple[int, List[str], List[str]]] = attr.ib(init=False, factory=dict)
+    """Modified time, file names, and sub-directory names of each indexed directory keyed by relative posix path."""
+
+    _changed: bool = attr.ib(init=False, default=False)
+    """True if the index must be saved."""
+
+    def __attrs_post_init__(self) -> None:
+        """Load the persisted index."""
+        if self.path_cache and self.path_cache.is_file():
+            with suppress(OSError, ValueError):
+                cache: Dict[str, Any] = json.loads(self.path_cache.read_text())
+                if cache.get('path_root') == self.path_root.as_posix():
+                    self._dirs = {rel: tuple(entry) for rel, entry in cache['dirs'].items()}
+
+    def _list_dir(self, path_dir: Path, rel_dir: str) -> Tuple[List[str], List[str]]:
+        """Return the file and sub-directory names of the directory, which are cached by the modified time.
+
+        Args:
+            path_dir: Path to the directory
+            rel_dir: posix path relative to the root directory
+
+        Returns:
+            Tuple[List[str], List[str]]: file names and sub-directory names
+
+        """
+        mtime_ns = path_dir.stat().st_mtime_ns
+        cached = self._dirs.get(rel_dir)
+        if cached and cached[0] == mtime_ns:
+            return cached[1], cached[2]
+
+        file_names, dir_names = [], []
+        with os.scandir(path_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dir_names.append(entry.name)
+                elif entry.is_file():
+                    file_names.append(entry.name)
+        self._dirs[rel_dir] = (mtime_ns, sorted(file_names), sorted(dir_names))
+        self._changed = True
+        return self._dirs[rel_dir][1], self._dirs[rel_dir][2]
+
+    def _walk(self, path_start: Path, recursive: bool, excluded_dirs: Iterable[Path]) -> Iterable[Path]:
+        """Yield the indexed files below the start directory and skip the pruned directories.
+
+        Args:
+            path_start: Path to a directory within the root directory
+            recursive: if False, only yield the files in the start directory
+            excluded_dirs: additional absolute directory paths to skip
+
+        Yields:
+            Path: file paths
+
+        """
+        skipped = {*self.pruned_dirs, *excluded_dirs}
+        stack = [path_start]
+        while stack:
+            path_dir = stack.pop()
+            rel_dir = path_dir.relative_to(self.path_root).as_posix()
+            file_names, dir_names = self._list_dir(path_dir, rel_dir)
+            yield from (path_dir / name for name in file_names)
+            if recursive:
+                stack.extend(
+                    path_dir / name for name in reversed(dir_names)
+                    if not _is_pruned(name) and path_dir / name not in skipped
+                )
+
+    def find(
+        self, suffixes: Sequence[str], sub_dirs: Optional[Sequence[Path]] = None, recursive: bool = True,
+        excluded_names: Sequence[str] = (), excluded_dirs: Sequence[Path] = (),
+    ) -> List[Path]:
+        """Find the files with the specified suffixes.
+
+        Args:
+            suffixes: file suffixes, such as `['.md', '.py']`
+            sub_dirs: optional directories within the root directory to search. Default is the root directory
+            recursive: if False, only return the files directly within each directory. Default is True
+            excluded_names: file names to exclude
+            excluded_dirs: absolute directory paths to exclude
+
+        Returns:
+            List[Path]: unique, sorted file paths
+
+        """
+        paths_file = set()
+        for path_dir in sub_dirs or [self.path_root]:
+            if path_dir.is_dir():
+                paths_file.update(
+                    pth for pth in self._walk(path_dir, recursive, excluded_dirs)
+                    if pth.suffix in suffixes and pth.name not in excluded_names
+                )
+        self.save()
+        return sorted(paths_file)
+
+    def save(self) -> None:
+        """Persist the index if any directory was re-listed."""
+        if self.path_cache and self._changed:
+            with suppress(OSError):
+                self.path_cache.parent.mkdir(exist_ok=True, parents=True)
+                self.path_cache.write_text(json.dumps({'path_root': self.path_root.as_posix(), 'dirs': self._dirs}))
+            self._changed = False
+
+
+@lru_cache(maxsize=None)
+def _get_index(path_root: Path, persist: bool, pruned_dirs: FrozenSet[Path]) -> FileIndex:
+    """Return the file index for the root directory, which is shared for the lifetime of the process.
+
+    When a new root directory is persisted, the indexes of root directories that no longer exist are pruned
+
+    Args:
+        path_root: Path to the indexed directory
+        persist: if True, persist the index in the user cache directory
+        pruned_dirs: absolute directory paths that are never indexed
+
+    Returns:
+        FileIndex: shared file index
+
+    """
+    path_cache = None
+    if persist:
+        path_cache = get_user_cache_path(path_root, 'file-index')
+        if not path_cache.is_file():
+            prune_user_cache('file-index', 'path_root')
+    return FileIndex(path_root, path_cache=path_cache, pruned_dirs=pruned_dirs)
+
+
+def find_project_files(
+    suffixes: Sequence[str], sub_dirs: Optional[Sequence[Path]] = None, recursive: bool = True,
+    excluded_names: Sequence[str] = (), excluded_dirs: Sequence[Path] = (),
+) -> List[Path]:
+    """Find files in the project directory from DIG with the shared, persistent file index.
+
+    Directories outside of the project are searched with a separate index that is not persisted
+
+    Args:
+        suffixes: file suffixes, such as `['.md', '.py']`
+        sub_dirs: optional directories to search. Default is the project directory
+        recursive: if False, only return the files directly within each directory. Default is True
+        excluded_names: file names to exclude
+        excluded_dirs: absolute directory paths to exclude
+
+    Returns:
+        List[Path]: unique, sorted file paths
+
+    """
+    path_project = DIG.meta.path_project
+    pruned_dirs = frozenset([DIG.test.path_out, DIG.doc.path_out])
+    kwargs = {'recursive': recursive, 'excluded_names': excluded_names, 'excluded_dirs': excluded_dirs}
+    sub_dirs = sub_dirs or [path_project]
+    paths_file = []
+    for path_dir in sub_dirs:
+        if path_dir == path_project or path_project in path_dir.parents:
+            file_index = _get_index(path_project, True, pruned_dirs)
+            paths_file.extend(file_index.find(suffixes, sub_dirs=[path_dir], **kwargs))
+        else:
+            paths_file.extend(_get_index(path_dir, False, frozenset()).find(suffixes, **kwargs))
+    logger.debug(f'Found {len(paths_file)} files', sub_dirs=sub_dirs, suffixes=suffixes)
+    return sorted(set(paths_file))
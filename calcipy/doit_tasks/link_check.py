@@ -0,0 +1,132 @@
+"""Check the internal links, anchors, and asset references of the built site without network access."""
+
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from loguru import logger
+
+_REF_ATTRS = {
+    'a': 'href', 'link': 'href', 'area': 'href',
+    'img': 'src', 'script': 'src', 'source': 'src', 'iframe': 'src', 'audio': 'src', 'video': 'src',
+}
+"""Tag and attribute names that reference other files."""
+
+_EXTERNAL_PATTERN = re.compile(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)')
+"""Match URLs with a scheme (`https:`, `mailto:`, `data:`, etc.) or a network location, which are not checked."""
+
+
+class _PageParser(HTMLParser):  # noqa: H601
+    """Collect the anchor IDs and references of an HTML page."""
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__()
+        self.ids: Set[str] = set()
+        self.refs: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """Record the IDs and references of each tag.
+
+        Args:
+            tag: tag name
+            attrs: list of attribute names and values
+
+        """
+        attributes = dict(attrs)
+        for name in ['id', 'name'] if tag == 'a' else ['id']:
+            if attributes.get(name):
+                self.ids.add(attributes[name])
+        ref = attributes.get(_REF_ATTRS.get(tag, ''))
+        if ref and not _EXTERNAL_PATTERN.match(ref):
+            self.refs.append(ref)
+
+
+def _parse_page(path_html: Path, cache: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse an HTML page or return the cached result if the file has not changed.
+
+    Args:
+        path_html: Path to the HTML file
+        cache: previously parsed pages keyed by the file hash
+
+    Returns:
+        Dict[str, Any]: file `hash`, anchor `ids`, and internal `refs`
+
+    """
+    content = path_html.read_bytes()
+    file_hash = hashlib.sha256(content).hexdigest()
+    if file_hash in cache:
+        return cache[file_hash]
+    parser = _PageParser()
+    parser.feed(content.decode(errors='replace'))
+    return {'hash': file_hash, 'ids': sorted(parser.ids), 'refs': parser.refs}
+
+
+def _resolve_ref(path_site: Path, path_html: Path, ref: str) -> Tuple[Path, str]:
+    """Resolve a relative or site-absolute reference to a local file and anchor.
+
+    Args:
+        path_site: Path to the site directory
+        path_html: Path to the page with the reference
+        ref: reference URL
+
+    Returns:
+        Tuple[Path, str]: the target file (`index.html` for directories) and the anchor, which may be empty
+
+    """
+    parts = urlsplit(ref)
+    rel_path = unquote(parts.path)
+    if not rel_path:
+        path_target = path_html
+    elif rel_path.startswith('/'):
+        path_target = path_site / rel_path.lstrip('/')
+    else:
+        path_target = path_html.parent / rel_path
+    if rel_path.endswith('/') or path_target.is_dir():
+        path_target = path_target / 'index.html'
+    return path_target, unquote(parts.fragment)
+
+
+def check_links(path_site: Path, path_cache: Optional[Path] = None, max_workers: Optional[int] = None) -> List[str]:
+    """Check the internal links, anchors, and asset references of every HTML page in the site.
+
+    External URLs are skipped, so no network access is required
+
+    Args:
+        path_site: Path to the built site directory
+        path_cache: optional Path to a JSON cache of the parsed pages keyed by file hash
+        max_workers: optional number of threads to parse the pages
+
+    Returns:
+        List[str]: description of each broken reference
+
+    """
+    cache = {}
+    if path_cache and path_cache.is_file():
+        cache = json.loads(path_cache.read_text())
+    paths_html = sorted(path_site.rglob('*.html'))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pages = dict(zip(paths_html, pool.map(partial(_parse_page, cache=cache), paths_html)))
+    if path_cache:
+        path_cache.parent.mkdir(exist_ok=True, parents=True)
+        path_cache.write_text(json.dumps({page['hash']: page for page in pages.values()}))
+
+    path_root = path_site.resolve()
+    page_ids = {pth.resolve(): set(page['ids']) for pth, page in pages.items()}
+    broken = []
+    for path_html, page in pages.items():
+        for ref in page['refs']:
+            path_target, anchor = _resolve_ref(path_site, path_html, ref)
+            path_target = path_target.resolve()
+            if path_root not in path_target.parents or not path_target.is_file():
+                broken.append(f'{path_html.relative_to(path_site)}: {ref} (missing file)')
+            elif anchor and path_target in page_ids and anchor not in page_ids[path_target]:
+                broken.append(f'{path_html.relative_to(path_site)}: {ref} (missing anchor)')
+    logger.info(f'Checked {len(pages)} pages and found {len(broken)} broken references')
+    return broken
@@ -6,8 +6,10 @@ from typing import List, Optional, Sequence
 from loguru import logger
 
 from ..log_helpers import log_fun
-from .base import debug_task, echo, if_found_unlink
+from .base import cmd_action, debug_task, defer_task, echo, if_found_unlink
 from .doit_globals import DIG, DoItTask
+from .file_index import find_project_files
+from .runner import defer_cmd
 
 # ----------------------------------------------------------------------------------------------------------------------
 # General
@@ -31,13 +33,16 @@ def _collect_py_files(add_paths: Sequence[Path] = (), sub_directories: Optional[
     """
     if not isinstance(add_paths, (list, tuple)):
         raise TypeError(f'Expected add_paths to be a list of Paths, but received: {add_paths}')
-    if sub_directories is None:
-        sub_directories = []
-    sub_directories.extend([DIG.meta.path_project / DIG.meta.pkg_name, DIG.test.path_tests] + DIG.lint.paths)
-    package_files = [*add_paths] + [*DIG.meta.path_project.glob('*.py')]
-    for subdir in sub_directories:  # Capture files in package and in tests directory
-        package_files.extend([*subdir.rglob('*.py')])
-    return [str(file_path) for file_path in package_files if file_path.name not in DIG.lint.paths_excluded]
+    sub_directories = [
+        *(sub_directories or []), DIG.meta.path_project / DIG.meta.pkg_name, DIG.test.path_tests, *DIG.lint.paths,
+    ]
+    package_files = [
+        *add_paths, *find_project_files(['.py'], sub_dirs=[DIG.meta.path_project], recursive=False),
+        *find_project_files(['.py'], sub_dirs=sub_directories),
+    ]
+    # Use a dictionary to remove duplicates, such as the package directory from DIG.lint.paths, while keeping order
+    file_names = [str(file_path) for file_path in package_files if file_path.name not in DIG.lint.paths_excluded]
+    return [*dict.fromkeys(file_names)]
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -56,7 +61,7 @@ def _list_lint_file_paths(path_list: List[Path]) -> List[Path]:
     """
     file_paths = []
     for path_item in path_list:
-        file_paths.extend([*path_item.rglob('*.py')] if path_item.is_dir() else [path_item])
+        file_paths.extend(find_project_files(['.py'], sub_dirs=[path_item]) if path_item.is_dir() else [path_item])
     logger.debug(f'Found {len(file_paths)} files', file_paths=file_paths)
     return [pth for pth in file_paths if pth.name not in DIG.lint.paths_excluded]
 
@@ -116,14 +121,14 @@ def _lint_project(
     # Flake8 appends to the log file. Ensure that an existing file is deleted so that Flake8 creates a fresh file
     flake8_log_path = DIG.meta.path_project / 'flake8.log'
     actions = [(if_found_unlink, (flake8_log_path,))]
-    run = 'poetry run python -m'
     flags = f'--config={path_flake8}  --output-file={flake8_log_path} --exit-zero'
     for lint_path in _list_lint_file_paths(lint_paths):
-        actions.append(f'{run} flake8 "{lint_path}" {flags}')
+        actions.append(cmd_action(defer_cmd('python', f'-m flake8 "{lint_path}" {flags}')))
     actions.append((_check_linting_errors, (flake8_log_path, ignore_errors)))
     return actions
 
 
+@defer_task
 def task_lint_project() -> DoItTask:
     """Lint files from DIG creating summary log file of errors.
 
@@ -134,6 +139,7 @@ def task_lint_project() -> DoItTask:
     return debug_task(_lint_project(DIG.lint.paths, path_flake8=DIG.lint.path_flake8, ignore_errors=None))
 
 
+@defer_task
 def task_lint_critical_only() -> DoItTask:
     """Lint files from DIG creating summary log file of errors, but ignore non-critical errors.
 
@@ -159,6 +165,7 @@ def task_lint_critical_only() -> DoItTask:
     return debug_task(_lint_project(DIG.lint.paths, path_flake8=DIG.lint.path_flake8, ignore_errors=ignore_errors))
 
 
+@defer_task
 def task_radon_lint() -> DoItTask:
     """See documentation: https://radon.readthedocs.io/en/latest/intro.html. Lint project with Radon.
 
@@ -170,7 +177,10 @@ def task_radon_lint() -> DoItTask:
     for args in ['mi', 'cc --total-average -nb', 'hal']:
         actions.extend(
             [(echo, (f'# Radon with args: {args}',))]
-            + [f'poetry run radon {args} "{lint_path}"' for lint_path in _list_lint_file_paths(DIG.lint.paths)],
+            + [
+                cmd_action(defer_cmd('radon', f'{args} "{lint_path}"'))
+                for lint_path in _list_lint_file_paths(DIG.lint.paths)
+            ],
         )
     return debug_task(actions)
 
@@ -179,6 +189,7 @@ def task_radon_lint() -> DoItTask:
 # Formatting
 
 
+@defer_task
 def task_auto_format() -> DoItTask:
     """Format code with isort and autopep8.
 
@@ -186,12 +197,12 @@ def task_auto_format() -> DoItTask:
         DoItTask: doit task
 
     """
-    run = 'poetry run python -m'
     actions = []
     for lint_path in DIG.lint.paths:
-        actions.append(f'{run} isort "{lint_path}" --settings-path "{DIG.meta.path_toml}"')
+        isort_args = f'-m isort "{lint_path}" --settings-path "{DIG.meta.path_toml}"'
+        actions.append(cmd_action(defer_cmd('python', isort_args)))
         for fn in _list_lint_file_paths([lint_path]):
-            actions.append(f'{run} autopep8 "{fn}" --in-place --aggressive')
+            actions.append(cmd_action(defer_cmd('python', f'-m autopep8 "{fn}" --in-place --aggressive')))
     return debug_task(actions)
 
 
@@ -205,10 +216,10 @@ def task_pre_commit_hooks() -> DoItTask:
 
     """
     return debug_task([
-        'poetry run pre-commit autoupdate',
+        cmd_action(defer_cmd('pre-commit', 'autoupdate')),
 
-        'poetry run pre-commit install --install-hooks --hook-type commit-msg --hook-type pre-push',
+        cmd_action(defer_cmd('pre-commit', 'install --install-hooks --hook-type commit-msg --hook-type pre-push')),
 
-        'poetry run pre-commit run --hook-stage commit --all-files',
-        'poetry run pre-commit run --hook-stage push --all-files',
+        cmd_action(defer_cmd('pre-commit', 'run --hook-stage commit --all-files')),
+        cmd_action(defer_cmd('pre-commit', 'run --hook-stage push --all-files')),
     ])
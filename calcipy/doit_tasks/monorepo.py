@@ -0,0 +1,211 @@
+"""Generate per-package and aggregate doit tasks for a monorepo of poetry projects from a single `dodo.py`.
+
+Register the tasks in the root `dodo.py` with the below snippet, then run `doit lint_project:pkg_a` for one package or
+`doit lint_project` for all packages:
+
+`globals().update(create_monorepo_tasks(Path(__file__).resolve().parent))`
+
+"""
+
+import os
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import attr
+from loguru import logger
+
+from . import doc, lint, tag_collector, test
+from .base import defer_task
+from .doit_globals import DIG, DoItGlobals, DoItTask, _load_poetry_config
+
+_SKIP_DIRS = {'__pycache__', 'build', 'dist', 'node_modules', 'releases', 'site'}
+"""Directory names that are never searched for sub-projects, in addition to hidden directories."""
+
+_DEF_TASK_CREATORS = [
+    doc.task_cl_write,
+    doc.task_document,
+    lint.task_auto_format,
+    lint.task_lint_critical_only,
+    lint.task_lint_project,
+    lint.task_radon_lint,
+    tag_collector.task_create_tag_file,
+    test.task_coverage,
+    test.task_test,
+    test.task_test_all,
+]
+"""Task creators that apply to each package. Interactive and repository-wide tasks are excluded."""
+
+_UNSET = object()
+"""Sentinel for DoItGlobals attributes that have not been set."""
+
+
+def find_projects(path_root: Path) -> List[Path]:
+    """Find the poetry projects below the root directory with a single, pruned directory walk.
+
+    Hidden directories and `_SKIP_DIRS` are not searched and the walk does not descend into a found project. A
+    `pyproject.toml` that cannot be read or parsed is skipped with a warning
+
+    Args:
+        path_root: Path to the monorepo root. A `pyproject.toml` in the root directory is ignored
+
+    Returns:
+        List[Path]: sorted project directories
+
+    """
+    projects = []
+    for dir_name, sub_dirs, file_names in os.walk(path_root):
+        path_dir = Path(dir_name)
+        if path_dir != path_root and 'pyproject.toml' in file_names:
+            try:
+                _load_poetry_config(path_dir / 'pyproject.toml')
+            except KeyError:
+                logger.debug(f'Skipping a pyproject.toml without [tool.poetry] in {path_dir}')
+            except (OSError, ValueError) as err:  # toml.TomlDecodeError and UnicodeDecodeError are ValueErrors
+                logger.warning(f'Skipping an invalid pyproject.toml in {path_dir}', err=err)
+            else:
+                projects.append(path_dir)
+                sub_dirs.clear()
+                continue
+        sub_dirs[:] = [name for name in sub_dirs if not name.startswith('.') and name not in _SKIP_DIRS]
+    return sorted(projects)
+
+
+@contextmanager
+def _swap_globals(dig: DoItGlobals) -> Iterator[None]:
+    """Temporarily replace the attributes of the global `DIG` with the package-specific globals.
+
+    Args:
+        dig: package-specific DoItGlobals
+
+    Yields:
+        None: while the package globals are active
+
+    """
+    names = [field.name for field in attr.fields(DoItGlobals)]
+    saved = {name: getattr(DIG, name, _UNSET) for name in names}
+    try:
+        for name in names:
+            setattr(DIG, name, getattr(dig, name))
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is _UNSET:
+                delattr(DIG, name)
+            else:
+                setattr(DIG, name, value)
+
+
+def _bind_globals(func: Callable, dig: DoItGlobals) -> Callable:
+    """Wrap a python action so that it runs with the package globals.
+
+    The wrapper keeps the signature of the original function so that doit passes the same task parameters
+
+    Args:
+        func: python action or callable that returns a command string
+        dig: package-specific DoItGlobals
+
+    Returns:
+        Callable: wrapped function
+
+    """
+    @wraps(func)
+    def wrapped(*args: Any, **kwargs: Any) -> Any:
+        with _swap_globals(dig):
+            return func(*args, **kwargs)
+    return wrapped
+
+
+def _bind_action(action: Any, dig: DoItGlobals) -> Any:
+    """Bind a doit action to the package so that commands run from the package directory with the package globals.
+
+    Args:
+        action: doit action (command string, python action tuple, callable, or CmdAction)
+        dig: package-specific DoItGlobals
+
+    Returns:
+        Any: bound doit action
+
+    """
+    from doit.action import CmdAction
+
+    cwd = str(dig.meta.path_project)
+    if isinstance(action, str):
+        return CmdAction(action, cwd=cwd)
+    if isinstance(action, CmdAction):
+        action.pkwargs.setdefault('cwd', cwd)
+        if callable(action._action):  # noqa: SLF001
+            action._action = _bind_globals(action._action, dig)  # noqa: SLF001
+        return action
+    if isinstance(action, tuple):
+        return (_bind_globals(action[0], dig), *action[1:])
+    return _bind_globals(action, dig) if callable(action) else action
+
+
+def _create_package_task(task_creator: Callable[[], DoItTask], dig: DoItGlobals) -> DoItTask:
+    """Create the task for a single package as a doit subtask.
+
+    Args:
+        task_creator: `task_*` function
+        dig: package-specific DoItGlobals
+
+    Returns:
+        DoItTask: doit subtask named after the package
+
+    """
+    with _swap_globals(dig):
+        task = dict(task_creator())
+    task['name'] = dig.meta.pkg_name
+    task['actions'] = [_bind_action(action, dig) for action in task['actions']]
+    return task
+
+
+def _make_task_creator(task_creator: Callable[[], DoItTask], package_globals: Sequence[DoItGlobals]) -> Callable:
+    """Create a deferred task creator that yields one subtask for each package.
+
+    doit adds the aggregate task (such as `lint_project`), which runs all of the subtasks (`lint_project:pkg_a`)
+
+    Args:
+        task_creator: `task_*` function
+        package_globals: DoItGlobals for each package
+
+    Returns:
+        Callable: task creator with the same name and docstring
+
+    """
+    def creator() -> Iterator[DoItTask]:
+        for dig in package_globals:
+            yield _create_package_task(task_creator, dig)
+
+    creator.__name__ = task_creator.__name__
+    creator.__qualname__ = task_creator.__name__
+    creator.__doc__ = task_creator.__doc__
+    return defer_task(creator)
+
+
+def create_monorepo_tasks(
+    path_root: Path, task_creators: Optional[Sequence[Callable[[], DoItTask]]] = None,
+) -> Dict[str, Callable]:
+    """Discover the packages in the monorepo and create the per-package and aggregate tasks.
+
+    The directory walk and the configuration of each package are shared by all tasks in the single doit process
+
+    Args:
+        path_root: Path to the monorepo root
+        task_creators: optional list of `task_*` functions to create for each package. Default is `_DEF_TASK_CREATORS`
+
+    Returns:
+        Dict[str, Callable]: task creators by name to add to the `dodo.py` globals
+
+    """
+    package_globals = []
+    for path_project in find_projects(path_root):
+        dig = DoItGlobals()
+        dig.set_paths(path_project=path_project)
+        package_globals.append(dig)
+    logger.info(f'Found {len(package_globals)} packages', packages=[dig.meta.pkg_name for dig in package_globals])
+    return {
+        task_creator.__name__: _make_task_creator(task_creator, package_globals)
+        for task_creator in (task_creators or _DEF_TASK_CREATORS)
+    }
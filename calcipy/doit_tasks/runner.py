@@ -0,0 +1,188 @@
+"""Resolve commands to the project virtual environment to avoid the startup time of `poetry run` for each action.
+
+The virtual environment is found once per session and cached in the user cache directory by the hash of
+`poetry.lock`. Task actions use `defer_cmd`, so the virtual environment is only located when an action runs and never
+for `doit list`. Set the environment variable `CALCIPY_POETRY_RUN=1` to run every command with `poetry run` instead
+
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess  # noqa: S404
+from contextlib import suppress
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from .doit_globals import DIG, get_user_cache_path
+
+_POETRY_RUN_ENV = 'CALCIPY_POETRY_RUN'
+"""Environment variable that restores `poetry run` for all commands when set to a truthy value."""
+
+_BIN_DIR = 'Scripts' if os.name == 'nt' else 'bin'
+"""Name of the directory in the virtual environment with the interpreter and console scripts."""
+
+_VENVS: Dict[Path, Path] = {}
+"""Virtual environments found in this session by project directory. Failed lookups are not stored."""
+
+
+def _use_poetry_run() -> bool:
+    """Check if the escape hatch to `poetry run` is active.
+
+    Returns:
+        bool: True if `CALCIPY_POETRY_RUN` is set to a value other than `0`, `false`, or an empty string
+
+    """
+    return os.environ.get(_POETRY_RUN_ENV, '').lower() not in {'', '0', 'false'}
+
+
+def _hash_lock(path_project: Path) -> str:
+    """Hash the `poetry.lock` file, which changes when the virtual environment is updated.
+
+    Args:
+        path_project: Path to the project directory
+
+    Returns:
+        str: hex digest or an empty string if there is no lock file
+
+    """
+    path_lock = path_project / 'poetry.lock'
+    return hashlib.sha256(path_lock.read_bytes()).hexdigest() if path_lock.is_file() else ''
+
+
+def _is_venv(path_venv: Path) -> bool:
+    """Check if the directory is a virtual environment with a Python interpreter.
+
+    Args:
+        path_venv: Path to the virtual environment
+
+    Returns:
+        bool: True if the interpreter exists
+
+    """
+    return shutil.which('python', path=str(path_venv / _BIN_DIR)) is not None
+
+
+def _locate_venv(path_project: Path) -> Optional[Path]:
+    """Find the virtual environment from the in-project `.venv` directory or with `poetry env info`.
+
+    Args:
+        path_project: Path to the project directory
+
+    Returns:
+        Optional[Path]: Path to the virtual environment or None if not found
+
+    """
+    path_venv = path_project / '.venv'
+    if _is_venv(path_venv):
+        return path_venv
+    with suppress(OSError, subprocess.SubprocessError):
+        result = subprocess.run(  # noqa: S603, S607
+            ['poetry', 'env', 'info', '--path'], cwd=path_project, capture_output=True, text=True, check=True,
+        )
+        path_venv = Path(result.stdout.strip())
+        if result.stdout.strip() and _is_venv(path_venv):
+            return path_venv
+    return None
+
+
+def get_venv(path_project: Path) -> Optional[Path]:
+    """Return the virtual environment of the project, which is cached by the hash of `poetry.lock`.
+
+    Only a found virtual environment is cached (in memory and on disk), so that a later `poetry install` is detected
+
+    Args:
+        path_project: Path to the project directory
+
+    Returns:
+        Optional[Path]: Path to the virtual environment or None if not found
+
+    """
+    if path_project in _VENVS:
+        return _VENVS[path_project]
+
+    path_cache = get_user_cache_path(path_project, 'venv')
+    lock_hash = _hash_lock(path_project)
+    cache: Dict[str, Any] = {}
+    with suppress(OSError, ValueError):
+        cache = json.loads(path_cache.read_text())
+    if cache.get('lock_hash') == lock_hash and _is_venv(Path(cache['venv'])):
+        _VENVS[path_project] = Path(cache['venv'])
+        return _VENVS[path_project]
+
+    path_venv = _locate_venv(path_project)
+    logger.info(f'Resolved the virtual environment for {path_project}: {path_venv}')
+    if path_venv:
+        _VENVS[path_project] = path_venv
+        with suppress(OSError):
+            path_cache.parent.mkdir(exist_ok=True, parents=True)
+            path_cache.write_text(json.dumps({'lock_hash': lock_hash, 'venv': path_venv.as_posix()}))
+    return path_venv
+
+
+def resolve_argv(executable: str, path_project: Optional[Path] = None) -> List[str]:
+    """Resolve the interpreter or console script to the absolute path in the project virtual environment.
+
+    Args:
+        executable: name of the interpreter or console script, such as `python` or `pytest`
+        path_project: optional Path to the project directory. Default is the project from DIG
+
+    Returns:
+        List[str]: the absolute path or `['poetry', 'run', executable]` if not resolved or the escape hatch is set
+
+    """
+    if not _use_poetry_run():
+        path_venv = get_venv(path_project or DIG.meta.path_project)
+        path_exe = shutil.which(executable, path=str(path_venv / _BIN_DIR)) if path_venv else None
+        if path_exe:
+            return [path_exe]
+    return ['poetry', 'run', executable]
+
+
+def resolve_cmd(executable: str, path_project: Optional[Path] = None) -> str:
+    """Resolve the interpreter or console script for a shell command string.
+
+    Args:
+        executable: name of the interpreter or console script, such as `python` or `pytest`
+        path_project: optional Path to the project directory. Default is the project from DIG
+
+    Returns:
+        str: quoted absolute path or `poetry run {executable}`
+
+    """
+    argv = resolve_argv(executable, path_project)
+    return f'"{argv[0]}"' if len(argv) == 1 else ' '.join(argv)
+
+
+def _join_cmd(executable: str, args: str, path_project: Path) -> str:
+    """Resolve the executable and append the arguments.
+
+    Args:
+        executable: name of the interpreter or console script
+        args: command line arguments
+        path_project: Path to the project directory
+
+    Returns:
+        str: shell command string
+
+    """
+    return f'{resolve_cmd(executable, path_project)} {args}'
+
+
+def defer_cmd(executable: str, args: str, path_project: Optional[Path] = None) -> Callable[[], str]:
+    """Create a callable for a doit `CmdAction` that only resolves the executable when the action runs.
+
+    Args:
+        executable: name of the interpreter or console script, such as `python` or `pytest`
+        args: command line arguments, which may contain doit task parameters, such as `%(args)s`
+        path_project: optional Path to the project directory. Default is the project from DIG
+
+    Returns:
+        Callable[[], str]: callable that returns the shell command string
+
+    """
+    return partial(_join_cmd, executable, args, path_project or DIG.meta.path_project)
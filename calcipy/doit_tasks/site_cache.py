@@ -0,0 +1,194 @@
+"""Incrementally build the mkdocs site by only re-rendering the pages with changed inputs."""
+
+import hashlib
+import json
+import re
+import subprocess  # noqa: S404
+from pathlib import Path
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from .runner import resolve_argv
+
+_AUTODOC_PATTERN = re.compile(r'^:::[ \t]+(?P<module>[\w.]+)', re.MULTILINE)
+"""Match the mkdocstrings autodoc identifiers, such as `::: calcipy.doit_tasks.lint`."""
+
+_INCLUDE_PATTERN = re.compile(r'\{!\s*(?P<path>.+?)\s*!\}')
+"""Match the `markdown_include` statements, such as `{!README.md!}`."""
+
+
+def _hash_bytes(*chunks: bytes) -> str:
+    """Hash the byte strings.
+
+    Args:
+        chunks: byte strings to hash in order
+
+    Returns:
+        str: hex digest
+
+    """
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _find_module_files(path_project: Path, module: str) -> List[Path]:
+    """Locate the source file for a module or package.
+
+    Args:
+        path_project: Path to the project directory
+        module: dotted module name. Trailing object names, such as `pkg.module.Class`, are dropped
+
+    Returns:
+        List[Path]: the source file or an empty list if not found in the project
+
+    """
+    parts = module.split('.')
+    while parts:
+        path_base = path_project.joinpath(*parts)
+        for path_src in [path_base.with_suffix('.py'), path_base / '__init__.py']:
+            if path_src.is_file():
+                return [path_src]
+        parts.pop()
+    return []
+
+
+def _hash_page(path_project: Path, path_md: Path) -> str:
+    """Hash the Markdown source along with the referenced Python modules and included files.
+
+    Args:
+        path_project: Path to the project directory
+        path_md: Path to the Markdown file
+
+    Returns:
+        str: hex digest
+
+    """
+    text = path_md.read_text()
+    dependencies = [path_project / match['path'] for match in _INCLUDE_PATTERN.finditer(text)]
+    for match in _AUTODOC_PATTERN.finditer(text):
+        dependencies.extend(_find_module_files(path_project, match['module']))
+    chunks = [text.encode()]
+    for path_dep in dependencies:
+        chunks.extend([path_dep.as_posix().encode(), path_dep.read_bytes() if path_dep.is_file() else b''])
+    return _hash_bytes(*chunks)
+
+
+def _page_url(rel_md: str, directory_urls: bool) -> str:
+    """Determine the URL of the page relative to the site root like mkdocs.
+
+    Args:
+        rel_md: posix path to the Markdown file relative to the docs directory
+        directory_urls: value of `use_directory_urls` in the mkdocs configuration
+
+    Returns:
+        str: relative page URL, such as `reference/calcipy/doit_tasks/lint/`
+
+    """
+    stem = rel_md[:-len('.md')]
+    is_index = stem == 'index' or stem.endswith('/index')
+    if not directory_urls:
+        return f'{stem}.html'
+    if is_index:
+        return stem[:-len('index')]
+    return f'{stem}/'
+
+
+def _page_output(path_site: Path, url: str) -> Path:
+    """Determine the path to the HTML output for the page URL.
+
+    Args:
+        path_site: Path to the site directory
+        url: relative page URL
+
+    Returns:
+        Path: path to the HTML file
+
+    """
+    return path_site / url / 'index.html' if not url or url.endswith('/') else path_site / url
+
+
+def _merge_search_index(path_site: Path, old_index: Dict[str, Any], rebuilt_urls: List[str]) -> None:
+    """Combine the search entries of the rebuilt pages with the previous entries of all other pages.
+
+    In dirty mode, the mkdocs search plugin only indexes the rebuilt pages
+
+    Args:
+        path_site: Path to the site directory
+        old_index: search index from the previous build
+        rebuilt_urls: URLs of the pages that were rebuilt
+
+    """
+    path_index = path_site / 'search/search_index.json'
+    if not (old_index and path_index.is_file()):
+        return
+    new_index = json.loads(path_index.read_text())
+    rebuilt = set(rebuilt_urls)
+    kept = [doc for doc in old_index.get('docs', []) if doc['location'].split('#')[0] not in rebuilt]
+    new_index['docs'] = kept + [doc for doc in new_index.get('docs', []) if doc['location'].split('#')[0] in rebuilt]
+    path_index.write_text(json.dumps(new_index, separators=(',', ':')))
+
+
+def _mkdocs_cmd(path_project: Path) -> List[str]:
+    """Return the command to build the site.
+
+    Args:
+        path_project: Path to the project directory
+
+    Returns:
+        List[str]: mkdocs build command
+
+    """
+    return [*resolve_argv('mkdocs', path_project), 'build']
+
+
+def build_site(path_project: Path, path_docs: Path, path_site: Path, path_cache: Path) -> None:
+    """Build the mkdocs site and only re-render the pages with changed inputs.
+
+    Each page is keyed by the Markdown source, the Python modules referenced with `:::`, and included files. Changes
+    to the mkdocs configuration or the list of pages trigger a full build. Otherwise, the output of the invalidated
+    pages is removed so that `mkdocs build --dirty` re-renders only those pages and the search index is then merged
+
+    Args:
+        path_project: Path to the project directory with `mkdocs.yml`
+        path_docs: Path to the Markdown documentation directory
+        path_site: Path to the built site directory
+        path_cache: Path to the JSON cache file
+
+    """
+    config_text = (path_project / 'mkdocs.yml').read_text()
+    directory_urls = not re.search(r'^use_directory_urls:\s*false', config_text, re.MULTILINE | re.IGNORECASE)
+    config_hash = _hash_bytes(config_text.encode())
+    pages = {
+        pth.relative_to(path_docs).as_posix(): _hash_page(path_project, pth) for pth in sorted(path_docs.rglob('*.md'))
+    }
+    cache = json.loads(path_cache.read_text()) if path_cache.is_file() else {}
+
+    cached_pages = cache.get('pages', {})
+    full_build = (
+        cache.get('config_hash') != config_hash or set(cached_pages) != set(pages)
+        or not (path_site / 'index.html').is_file()
+    )
+    if full_build:
+        logger.info('Building the full site')
+        subprocess.run(_mkdocs_cmd(path_project), cwd=path_project, check=True)  # noqa: S603
+    else:
+        changed = [rel for rel, page_hash in pages.items() if cached_pages[rel] != page_hash]
+        if not changed:
+            logger.info('Skipping the site build because no pages changed')
+            return
+        logger.info(f'Rebuilding {len(changed)} of {len(pages)} pages', changed=changed)
+        rebuilt_urls = [_page_url(rel, directory_urls) for rel in changed]
+        for url in rebuilt_urls:
+            path_html = _page_output(path_site, url)
+            if path_html.is_file():
+                path_html.unlink()
+        path_index = path_site / 'search/search_index.json'
+        old_index = json.loads(path_index.read_text()) if path_index.is_file() else {}
+        subprocess.run([*_mkdocs_cmd(path_project), '--dirty'], cwd=path_project, check=True)  # noqa: S603
+        _merge_search_index(path_site, old_index, rebuilt_urls)
+
+    path_cache.parent.mkdir(exist_ok=True, parents=True)
+    path_cache.write_text(json.dumps({'config_hash': config_hash, 'pages': pages}))
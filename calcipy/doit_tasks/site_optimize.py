@@ -0,0 +1,230 @@
+"""Optimize the built documentation site by minifying text assets, compressing images, and precompressing files."""
+
+import gzip
+import hashlib
+import json
+import re
+import shutil
+import subprocess  # noqa: S404
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Pattern
+
+from loguru import logger
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+_PROTECTED_HTML = re.compile(
+    r'<!--.*?-->|<(pre|textarea|script|style|code)\b.*?</\1\s*>'
+    r'|<[a-z][^\s/<>]*(?:\s+[^\s=/<>]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]+))?)*\s*/?>',
+    re.DOTALL | re.IGNORECASE,
+)
+"""Match comments, the HTML blocks where whitespace is significant or is not HTML, and tags with attribute values."""
+
+_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+"""Match HTML comments, except for conditional comments."""
+
+_PROTECTED_CSS = re.compile(
+    r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+    r'|url\(\s*(?:"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[^)]*)\s*\)',
+    re.DOTALL | re.IGNORECASE,
+)
+"""Match CSS comments, string literals, and `url()` values."""
+
+_CSS_COMMENT = re.compile(r'/\*(?!!).*?\*/', re.DOTALL)
+"""Match CSS comments, except for `/*! ... */` license comments."""
+
+_GZIP_SUFFIXES = {'.css', '.html', '.js', '.json', '.svg', '.txt', '.xml'}
+"""File types that benefit from precompression."""
+
+_IMAGE_CMDS: Dict[str, List[str]] = {
+    '.png': ['optipng', '-quiet', '-o2'],
+    '.jpg': ['jpegtran', '-copy', 'none', '-optimize', '-progressive', '-outfile'],
+    '.jpeg': ['jpegtran', '-copy', 'none', '-optimize', '-progressive', '-outfile'],
+}
+"""Lossless image optimization commands, which are used only if installed. The path is appended to the command."""
+
+
+def _minify_outside(text: str, protected: Pattern[str], dropped: Pattern[str], minify: Callable[[str], str]) -> str:
+    """Minify only the text between the protected spans, which are kept verbatim unless they should be dropped.
+
+    Args:
+        text: text to minify
+        protected: pattern for the spans that must not be modified
+        dropped: pattern for the protected spans to remove, such as comments
+        minify: function to minify the text between the protected spans
+
+    Returns:
+        str: minified text
+
+    """
+    minified: List[str] = []
+    pending: List[str] = []
+    pos = 0
+    for match in protected.finditer(text):
+        pending.append(text[pos:match.start()])
+        pos = match.end()
+        # Text around a dropped span is joined so that the whitespace on both sides is collapsed together
+        if not dropped.fullmatch(match.group()):
+            minified.extend([minify(''.join(pending)), match.group()])
+            pending = []
+    minified.append(minify(''.join(pending) + text[pos:]))
+    return ''.join(minified)
+
+
+def _collapse_html_whitespace(text: str) -> str:
+    """Collapse the whitespace in HTML text that is not protected.
+
+    Args:
+        text: HTML text
+
+    Returns:
+        str: text with collapsed whitespace
+
+    """
+    text = re.sub(r'[ \t]*\n\s*', '\n', text)
+    return re.sub(r'[ \t]{2,}', ' ', text)
+
+
+def _minify_html(text: str) -> str:
+    """Remove comments and collapse whitespace, except in tags and `pre`, `textarea`, `script`, `style`, or `code`.
+
+    Args:
+        text: HTML text
+
+    Returns:
+        str: minified HTML
+
+    """
+    return _minify_outside(text, _PROTECTED_HTML, _HTML_COMMENT, _collapse_html_whitespace).strip() + '\n'
+
+
+def _collapse_css_whitespace(text: str) -> str:
+    """Remove unnecessary whitespace from CSS that is not a string literal or `url()`.
+
+    Args:
+        text: CSS text
+
+    Returns:
+        str: CSS with collapsed whitespace
+
+    """
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return text.replace(';}', '}')
+
+
+def _minify_css(text: str) -> str:
+    """Remove comments and unnecessary whitespace from CSS without modifying string literals or `url()` values.
+
+    Args:
+        text: CSS text
+
+    Returns:
+        str: minified CSS
+
+    """
+    return _minify_outside(text, _PROTECTED_CSS, _CSS_COMMENT, _collapse_css_whitespace).strip() + '\n'
+
+
+def _minify_js(text: str) -> str:
+    """Minify JavaScript with the optional `rjsmin` package.
+
+    Args:
+        text: JavaScript text
+
+    Returns:
+        str: minified JavaScript or the original text if `rjsmin` is not installed
+
+    """
+    return rjsmin.jsmin(text) if rjsmin else text
+
+
+_MINIFIERS: Dict[str, Callable[[str], str]] = {'.html': _minify_html, '.css': _minify_css, '.js': _minify_js}
+"""Minify functions by file suffix."""
+
+
+def _optimize_image(path_image: Path) -> None:
+    """Losslessly optimize an image in place if the optimizer is installed.
+
+    Args:
+        path_image: Path to the image
+
+    """
+    cmd = _IMAGE_CMDS.get(path_image.suffix.lower())
+    if cmd and shutil.which(cmd[0]):
+        # jpegtran requires both the output (after `-outfile`) and the input path
+        paths = [str(path_image)] * (2 if cmd[0] == 'jpegtran' else 1)
+        subprocess.run([*cmd, *paths], check=False)  # noqa: S603
+
+
+def _hash_bytes(content: bytes) -> str:
+    """Hash the file content.
+
+    Args:
+        content: bytes
+
+    Returns:
+        str: hex digest
+
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def _optimize_file(path_file: Path, cache: Dict[str, str], path_site: Path) -> Optional[str]:
+    """Minify or optimize the file and write a gzip sibling, unless the file is unchanged since the last run.
+
+    Args:
+        path_file: Path to the file
+        cache: hashes of the optimized files from the last run keyed by relative path
+        path_site: Path to the site directory
+
+    Returns:
+        Optional[str]: hash of the optimized file or None if the file was skipped
+
+    """
+    rel_path = path_file.relative_to(path_site).as_posix()
+    content = path_file.read_bytes()
+    file_hash = _hash_bytes(content)
+    path_gz = path_file.with_name(f'{path_file.name}.gz')
+    suffix = path_file.suffix.lower()
+    if cache.get(rel_path) == file_hash and (suffix not in _GZIP_SUFFIXES or path_gz.is_file()):
+        return None
+
+    if suffix in _MINIFIERS:
+        minified = _MINIFIERS[suffix](content.decode(errors='surrogateescape')).encode(errors='surrogateescape')
+        if len(minified) < len(content):
+            content = minified
+            path_file.write_bytes(content)
+    elif suffix in _IMAGE_CMDS:
+        _optimize_image(path_file)
+        content = path_file.read_bytes()
+    if suffix in _GZIP_SUFFIXES:
+        path_gz.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    return _hash_bytes(content)
+
+
+def optimize_site(path_site: Path, path_cache: Path, max_workers: Optional[int] = None) -> None:
+    """Minify HTML, CSS, and JS, losslessly optimize images, and write precompressed `.gz` siblings.
+
+    Files are skipped when their content matches the optimized output from the last run
+
+    Args:
+        path_site: Path to the built site directory
+        path_cache: Path to the JSON cache of the optimized file hashes
+        max_workers: optional number of threads
+
+    """
+    cache = json.loads(path_cache.read_text()) if path_cache.is_file() else {}
+    paths = sorted(pth for pth in path_site.rglob('*') if pth.is_file() and pth.suffix != '.gz')
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hashes = list(pool.map(partial(_optimize_file, cache=cache, path_site=path_site), paths))
+    rel_paths = [pth.relative_to(path_site).as_posix() for pth in paths]
+    updated = {rel: file_hash or cache[rel] for rel, file_hash in zip(rel_paths, hashes)}
+    logger.info(f'Optimized {sum(1 for file_hash in hashes if file_hash)} of {len(paths)} files')
+    path_cache.parent.mkdir(exist_ok=True, parents=True)
+    path_cache.write_text(json.dumps(updated))
@@ -13,6 +13,7 @@ from loguru import logger
 from ..log_helpers import log_fun
 from .base import debug_task, read_lines
 from .doit_globals import DIG, DoItTask
+from .file_index import find_project_files
 
 _TAG_SUMMARY_FILENAME = 'TAG_SUMMARY.md'
 """Name of the tag summary file."""  # PLANNED: Maybe make this configurable?
@@ -144,25 +145,10 @@ def _find_files() -> List[Path]:
 
     """
     # TODO: Move all of these configuration items into DIG
-    dot_directories = [pth for pth in DIG.meta.path_project.glob('.*') if pth.is_dir()]
-    ignored_sub_dirs = [DIG.test.path_out.parent.name] + dot_directories
-    ignored_filenames = [_TAG_SUMMARY_FILENAME]
-    supported_suffixes = ['.md', '.py']
-
-    paths_file = []
-    # NOTE: THE TOP LEVEL path_project MUST USE GLOB (NOT RGLOB!)
-    for suffix in supported_suffixes:
-        paths = [*DIG.meta.path_project.glob(f'*{suffix}')]
-        paths_file.extend([pth for pth in paths if pth.name not in ignored_filenames])
-
-    paths_sub_dir = [pth for pth in DIG.meta.path_project.glob('*') if pth.is_dir() and pth not in ignored_sub_dirs]
-    for path_dir in paths_sub_dir:
-        for suffix in supported_suffixes:
-            paths_file.extend([pth for pth in path_dir.rglob(f'*{suffix}') if pth.name not in ignored_filenames])
-    logger.info(
-        f'Found {len(paths_file)} files in {len(paths_sub_dir)} dir', paths_file=paths_file,
-        paths_sub_dir=paths_sub_dir,
+    paths_file = find_project_files(
+        ['.md', '.py'], excluded_names=[_TAG_SUMMARY_FILENAME], excluded_dirs=[DIG.test.path_out.parent],
     )
+    logger.info(f'Found {len(paths_file)} files', paths_file=paths_file)
     return paths_file
 
 
@@ -1,9 +1,16 @@
 """doit Test Utilities."""
 
-from doit.tools import LongRunning
-
-from .base import debug_task, open_in_browser
+import json
+import os
+import subprocess  # noqa: S404
+import sys
+import time
+from functools import partial
+from typing import Dict, List, Tuple
+
+from .base import cmd_action, debug_task, echo, ensure_dir, long_running, open_in_browser
 from .doit_globals import DIG, DoItTask
+from .runner import defer_cmd, resolve_argv, resolve_cmd
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Manage Testing
@@ -17,7 +24,7 @@ def task_test() -> DoItTask:
 
     """
     return debug_task([
-        LongRunning(f'poetry run pytest "{DIG.test.path_tests}" -x -l --ff -vv'),
+        long_running(defer_cmd('pytest', f'"{DIG.test.path_tests}" -x -l --ff -vv {DIG.test.pytest_args}')),
     ])
 
 
@@ -29,10 +36,36 @@ def task_test_all() -> DoItTask:
 
     """
     return debug_task([
-        LongRunning(f'poetry run pytest "{DIG.test.path_tests}" --ff -vv'),
+        long_running(defer_cmd('pytest', f'"{DIG.test.path_tests}" --ff -vv {DIG.test.pytest_args}')),
     ])
 
 
+def _pytest_selection_cmd(flags: str, keyword: str = '', marker: str = '') -> str:
+    """Build the pytest command for only the test files that contain tests matching the keyword or marker.
+
+    Note: doit passes the task parameters (`keyword` and `marker`) by name, then applies old-style formatting
+
+    Args:
+        flags: pytest flags, which may contain `%(keyword)s` or `%(marker)s`
+        keyword: pytest `-k` expression. Default is empty
+        marker: pytest `-m` expression. Default is empty
+
+    Returns:
+        str: pytest command
+
+    """
+    from .collection_cache import select_test_paths
+
+    path_cache = DIG.test.path_out / 'collection_cache.json'
+    paths = select_test_paths(
+        DIG.test.path_tests, path_cache, keyword=keyword, marker=marker, python_argv=resolve_argv('python'),
+    )
+    # When no file matches, pytest still receives the expression and reports that no tests ran
+    paths = paths or [DIG.test.path_tests]
+    path_args = ' '.join(f'"{pth}"' for pth in paths).replace('%', '%%')
+    return f'{resolve_cmd("pytest")} {path_args} {flags}'
+
+
 def task_test_marker() -> DoItTask:
     r"""Specify a marker to run a subset of tests.
 
@@ -42,7 +75,7 @@ def task_test_marker() -> DoItTask:
         DoItTask: doit task
 
     """
-    task = debug_task([LongRunning(f'poetry run pytest "{DIG.test.path_tests}" -x -l --ff -v -m "%(marker)s"')])
+    task = debug_task([long_running(partial(_pytest_selection_cmd, '-x -l --ff -v -m "%(marker)s"'))])
     task['params'] = [{
         'name': 'marker', 'short': 'm', 'long': 'marker', 'default': '',
         'help': (
@@ -64,7 +97,7 @@ def task_test_keyword() -> DoItTask:
     """
     return {
         'actions': [
-            LongRunning(f'poetry run pytest "{DIG.test.path_tests}" -x -l --ff -v -k "%(keyword)s"'),
+            long_running(partial(_pytest_selection_cmd, '-x -l --ff -v -k "%(keyword)s"')),
         ],
         'params': [{
             'name': 'keyword', 'short': 'k', 'long': 'keyword', 'default': '',
@@ -77,6 +110,46 @@ def task_test_keyword() -> DoItTask:
     }
 
 
+def task_profile_tests() -> DoItTask:
+    r"""Profile each test that matches the keyword with cProfile.
+
+    Each profile is exported as a speedscope JSON and collapsed-stack file to `DIG.test.path_out / 'profiles'` along
+    with a table of the hot functions across all selected tests
+
+    Example: `doit run profile_tests -k \"KEYWORD\"`
+
+    Returns:
+        DoItTask: doit task
+
+    """
+    flags = f'-v --profile-tests --report-dir="{DIG.test.path_out}" -k "%(keyword)s"'
+    return {
+        'actions': [long_running(partial(_pytest_selection_cmd, flags))],
+        'params': [{
+            'name': 'keyword', 'short': 'k', 'long': 'keyword', 'default': '',
+            'help': 'Profiles only tests that match the string pattern. Default is to profile all tests',
+        }],
+        'verbosity': 2,
+    }
+
+
+def task_test_benchmark() -> DoItTask:
+    """Run only the tests marked with BENCHMARK and compare against the stored baselines.
+
+    Example: `doit run test_benchmark` or `doit run test_benchmark -a \"--benchmark-update\"` to reset the baselines
+
+    Returns:
+        DoItTask: doit task
+
+    """
+    task = debug_task([long_running(defer_cmd('pytest', f'"{DIG.test.path_tests}" -l -v -m BENCHMARK %(args)s'))])
+    task['params'] = [{
+        'name': 'args', 'short': 'a', 'long': 'args', 'default': '',
+        'help': 'Additional pytest arguments, such as "--benchmark-rounds=20" or "--benchmark-update"',
+    }]
+    return task
+
+
 def task_coverage() -> DoItTask:
     """Run pytest and create coverage and test reports.
 
@@ -86,14 +159,136 @@ def task_coverage() -> DoItTask:
     """
     kwargs = (
         f'--cov-report=html:"{DIG.test.path_coverage_index.parent}"  --html="{DIG.test.path_report_index}"'
-        '  --self-contained-html'
+        f'  --self-contained-html {DIG.test.pytest_args}'
     )
     # Note: removed LongRunning so that doit would catch test failures, but the output will not have colors
     return debug_task([
-        f'poetry run pytest "{DIG.test.path_tests}" -x -l --ff -v --cov={DIG.meta.pkg_name} {kwargs}',
+        (ensure_dir, (DIG.test.path_out,)),
+        cmd_action(defer_cmd('pytest', f'"{DIG.test.path_tests}" -x -l --ff -v --cov={DIG.meta.pkg_name} {kwargs}')),
     ])
 
 
+def _select_coverage_core() -> str:
+    """Select the cheapest coverage tracer that the interpreter supports.
+
+    Returns:
+        str: `sysmon` (`sys.monitoring`) on Python 3.12+ and otherwise the C tracer, `ctrace`
+
+    """
+    return 'sysmon' if sys.version_info >= (3, 12) else 'ctrace'
+
+
+def _changed_source_files(base: str) -> List[str]:
+    """List the Python files in the package that differ from the git reference or are untracked.
+
+    Args:
+        base: git reference to compare against, such as `HEAD` or `main`
+
+    Returns:
+        List[str]: sorted relative paths
+
+    """
+    pkg_dir = DIG.meta.pkg_name
+    cmds = [
+        ['git', 'diff', '--name-only', base, '--', pkg_dir],
+        ['git', 'ls-files', '--others', '--exclude-standard', pkg_dir],
+    ]
+    paths = set()
+    for cmd in cmds:
+        result = subprocess.run(  # noqa: S603
+            cmd, cwd=DIG.meta.path_project, capture_output=True, text=True, check=True,
+        )
+        paths.update(line for line in result.stdout.splitlines() if line.endswith('.py'))
+    return sorted(pth for pth in paths if (DIG.meta.path_project / pth).is_file())
+
+
+def _timed_run(cmd: List[str], env: Dict[str, str]) -> Tuple[float, int]:
+    """Run a command in the project directory and measure the wall time.
+
+    Args:
+        cmd: command arguments
+        env: environment variables
+
+    Returns:
+        Tuple[float, int]: the elapsed seconds and the return code
+
+    """
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=DIG.meta.path_project, env=env)  # noqa: S603
+    return time.perf_counter() - start, result.returncode
+
+
+def _coverage_fast(changed: bool, base: str, remeasure: bool) -> bool:
+    """Run the tests with the cheapest coverage tracer and report the overhead against a plain run.
+
+    The duration of the plain run is cached in `DIG.test.path_out` and only measured when missing or requested
+
+    Args:
+        changed: if True, only measure the source files that changed compared to `base`
+        base: git reference for `changed`
+        remeasure: if True, measure the plain run again
+
+    Returns:
+        bool: False if the tests failed, which fails the doit task
+
+    """
+    python_cmd = resolve_argv('python')
+    pytest_args = ['-m', 'pytest', str(DIG.test.path_tests), '-q', '-p', 'no:cacheprovider']
+    env = {**os.environ, 'COVERAGE_CORE': _select_coverage_core()}
+    if changed:
+        changed_files = _changed_source_files(base)
+        if not changed_files:
+            echo(f'No changed source files compared to {base}')
+            return True
+        cov_args = [f'--include={",".join(changed_files)}']
+    else:
+        cov_args = [f'--source={DIG.meta.pkg_name}']
+
+    path_baseline = DIG.test.path_out / 'coverage_baseline.json'
+    if remeasure or not path_baseline.is_file():
+        baseline, returncode = _timed_run([*python_cmd, *pytest_args], env)
+        if returncode:
+            return False
+        path_baseline.parent.mkdir(exist_ok=True, parents=True)
+        path_baseline.write_text(json.dumps({'seconds': baseline}))
+    baseline = json.loads(path_baseline.read_text())['seconds']
+
+    duration, returncode = _timed_run([*python_cmd, '-m', 'coverage', 'run', *cov_args, *pytest_args], env)
+    if returncode:
+        return False
+    subprocess.run([*python_cmd, '-m', 'coverage', 'report'], cwd=DIG.meta.path_project, env=env)  # noqa: S603
+    overhead = (duration - baseline) / baseline * 100 if baseline else 0
+    echo(f'Coverage ({env["COVERAGE_CORE"]}): {duration:.2f}s vs. {baseline:.2f}s without coverage ({overhead:+.0f}%)')
+    return True
+
+
+def task_coverage_fast() -> DoItTask:
+    r"""Run pytest with the lowest-overhead coverage tracer and report the overhead compared to a plain run.
+
+    Example: `doit run coverage_fast --changed` or `doit run coverage_fast -c -b main -r`
+
+    Returns:
+        DoItTask: doit task
+
+    """
+    task = debug_task([_coverage_fast])
+    task['params'] = [
+        {
+            'name': 'changed', 'short': 'c', 'long': 'changed', 'type': bool, 'default': False,
+            'help': 'Only measure coverage of the source files that changed compared to the base reference',
+        },
+        {
+            'name': 'base', 'short': 'b', 'long': 'base', 'default': 'HEAD',
+            'help': 'git reference to compare against when using --changed. Default is HEAD',
+        },
+        {
+            'name': 'remeasure', 'short': 'r', 'long': 'remeasure', 'type': bool, 'default': False,
+            'help': 'Measure the baseline duration of the tests without coverage again',
+        },
+    ]
+    return task
+
+
 def task_open_test_docs() -> DoItTask:
     """Open the test and coverage files in default browser.
 
@@ -122,7 +317,7 @@ def ptw_task(cli_args: str) -> DoItTask:
 
     """
     return {
-        'actions': [LongRunning(f'poetry run ptw -- "{DIG.test.path_tests}" {cli_args}')],
+        'actions': [long_running(defer_cmd('ptw', f'-- "{DIG.test.path_tests}" {cli_args}'))],
         'verbosity': 2,
     }
 
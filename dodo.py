@@ -44,6 +44,8 @@ logger.info('Starting doit tasks in dodo.py')
 
 # Configure source code root path
 DIG.set_paths(path_project=path_parent)
+# Dump the stacks and fail tests that hang rather than stalling the CI runner (see calcipy/conftest.py)
+DIG.test.pytest_args = '--test-budget=default=120 --test-budget=SLOW=900'
 
 # Create list of all tasks run with `poetry run doit`
 DOIT_CONFIG = DOIT_CONFIG_RECOMMENDED
@@ -1,6 +1,20 @@
 """PyTest configuration."""
 
+import pytest
+
+from calcipy.conftest import benchmark_timer  # noqa: F401
+from calcipy.conftest import clone_project  # noqa: F401
+from calcipy.conftest import pytest_addoption  # noqa: F401
 from calcipy.conftest import pytest_configure  # noqa: F401
 from calcipy.conftest import pytest_html_results_table_header  # noqa: F401
 from calcipy.conftest import pytest_html_results_table_row  # noqa: F401
 from calcipy.conftest import pytest_runtest_makereport  # noqa: F401
+
+pytest_plugins = ['pytester']
+"""Use the pytester fixture to test the calcipy plugins."""
+
+
+@pytest.fixture(autouse=True)
+def _isolate_user_cache(monkeypatch, tmp_path_factory):
+    """Point the calcipy user cache at a temporary directory so that the tests never write to `~/.cache`."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path_factory.mktemp('cache')))
@@ -0,0 +1,342 @@
+"""Test conftest.py."""
+
+import json
+import signal
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+import calcipy
+from calcipy.conftest import _REFLINK_SUPPORT, _DiskCache, _clone_tree, _is_xdist_controller, _reflink
+
+from .configuration import PATH_TEST_PROJECT
+
+_CONFTEST = """
+from calcipy.conftest import pytest_addoption  # noqa: F401
+from calcipy.conftest import pytest_configure  # noqa: F401
+"""
+"""Conftest for the pytester sub-projects."""
+
+
+def test_profile_resources(pytester):
+    """Test the --profile-resources plugin."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        def test_alloc():
+            data = bytearray(50 * 1024 * 1024)
+            assert data
+
+        def test_noop():
+            assert True
+    """)
+
+    result = pytester.runpytest('--profile-resources')  # act
+
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(['*resource usage (peak RSS delta)*'])
+    report = json.loads((pytester.path / 'releases/tests/test_resources.json').read_text())
+    nodeids = [usage['nodeid'] for usage in report['tests']]
+    assert nodeids == ['test_profile_resources.py::test_alloc', 'test_profile_resources.py::test_noop']
+    assert report['tests'][0]['peak_rss_delta'] > 0
+
+
+def test_profile_resources_xdist(monkeypatch, pytester):
+    """Test that each xdist worker writes a separate report and the controller does not register the plugins."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        def test_noop():
+            assert True
+    """)
+    monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw1')
+
+    pytester.runpytest('--profile-resources').assert_outcomes(passed=1)  # act
+
+    assert (pytester.path / 'releases/tests/test_resources-gw1.json').is_file()
+    assert not (pytester.path / 'releases/tests/test_resources.json').is_file()
+    pytester.runpytest('--profile-tests').assert_outcomes(passed=1)
+    assert (pytester.path / 'releases/tests/profiles/hot_functions-gw1.txt').is_file()
+    assert not (pytester.path / 'releases/tests/profiles/hot_functions.txt').is_file()
+    controller = SimpleNamespace(getoption=lambda name, default=None: 'load')
+    assert _is_xdist_controller(controller)
+    assert not _is_xdist_controller(SimpleNamespace(workerinput={}, getoption=controller.getoption))
+
+
+def test_leak_check(pytester):
+    """Test the --leak-check plugin."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        _CACHE = []
+
+        def test_leak():
+            _CACHE.append(bytearray(4 * 1024 * 1024))
+
+        def test_noop():
+            assert True
+    """)
+
+    result = pytester.runpytest('--leak-check=1', '--leak-threshold=512')  # act
+
+    result.assert_outcomes(passed=2)
+    report = json.loads((pytester.path / 'releases/tests/test_leaks.json').read_text())
+    assert [growth['nodeids'] for growth in report['growths']] == [['test_leak_check.py::test_leak']]
+    assert report['growths'][0]['sites'][0]['file'].endswith('test_leak_check.py')
+
+
+def test_profile_fixtures(pytester):
+    """Test the --profile-fixtures plugin."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        import time
+
+        import pytest
+
+        @pytest.fixture()
+        def slow_data():
+            time.sleep(0.02)
+            yield 1
+            time.sleep(0.01)
+
+        @pytest.fixture()
+        def wrapper(slow_data):
+            return slow_data + 1
+
+        @pytest.mark.parametrize('idx', range(3))
+        def test_data(idx, wrapper):
+            assert wrapper == 2
+    """)
+
+    result = pytester.runpytest('--profile-fixtures', '--fixture-threshold=0.05')  # act
+
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(['*Consider widening the scope of "slow_data"*'])
+    report = json.loads((pytester.path / 'releases/tests/fixture_costs.json').read_text())
+    costs = {cost['name']: cost for cost in report['fixtures']}
+    assert costs['slow_data']['setup_count'] == 3
+    assert costs['slow_data']['setup_time'] >= 0.06
+    assert costs['slow_data']['teardown_time'] >= 0.03
+    assert costs['wrapper']['setup_time'] < 0.01
+    assert not costs['wrapper']['widen_scope']
+
+
+def test_benchmark_timer(pytester):
+    """Test the benchmark_timer fixture and the baseline comparison."""
+    pytester.makeconftest(_CONFTEST + 'from calcipy.conftest import benchmark_timer  # noqa: F401\n')
+    pytester.makepyfile("""
+        import pytest
+
+        @pytest.mark.BENCHMARK()
+        def test_sum(benchmark_timer):
+            stats = benchmark_timer(sum, range(1000))
+            assert stats.rounds == 3
+    """)
+    args = ['-m', 'BENCHMARK', '--benchmark-rounds=3', '--benchmark-warmup=1']
+
+    pytester.runpytest(*args).assert_outcomes(passed=1)  # Creates the baseline
+    path_baseline = next((pytester.path / 'releases/tests/benchmarks').rglob('*.json'))
+    baseline = json.loads(path_baseline.read_text())
+    path_baseline.write_text(json.dumps({**baseline, 'median': baseline['median'] / 100}))
+    result = pytester.runpytest(*args)  # act
+
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(['*Benchmark median regressed*'])
+    pytester.runpytest(*args, '--benchmark-update').assert_outcomes(passed=1)
+
+
+def test_disk_cache(pytester):
+    """Test that the disk_cache fixture only calls the factory when the source or inputs change."""
+    pytester.makeconftest(_CONFTEST + 'from calcipy.conftest import disk_cache  # noqa: F401\n')
+    path_data = pytester.path / 'data.txt'
+    path_data.write_text('a,b,c')
+    pytester.makepyfile("""
+        from pathlib import Path
+
+        def _parse():
+            with Path('calls.txt').open('a') as calls:
+                calls.write('.')
+            return Path('data.txt').read_text().split(',')
+
+        def test_cached(disk_cache):
+            assert disk_cache.get(_parse, input_paths=[Path('data.txt')]) == Path('data.txt').read_text().split(',')
+    """)
+
+    pytester.runpytest().assert_outcomes(passed=1)
+    pytester.runpytest().assert_outcomes(passed=1)  # act
+    path_data.write_text('d,e')
+    pytester.runpytest().assert_outcomes(passed=1)
+
+    assert (pytester.path / 'calls.txt').read_text() == '..'
+    assert len(list((pytester.path / '.pytest_cache/d/calcipy_fixtures').glob('*.pkl'))) == 2
+
+
+def test_disk_cache_eviction(tmp_path):
+    """Test that the least recently used entries are evicted beyond the size limit."""
+    cache = _DiskCache(tmp_path, max_bytes=1000)
+
+    for key in ['first', 'second', 'third']:
+        assert cache.get(partial(bytes, 400), key=key) == bytes(400)  # act
+
+    assert len(list(tmp_path.glob('*.pkl'))) == 2
+    next(tmp_path.glob('*.pkl')).unlink()  # Simulate an entry removed by another worker
+    assert all(cache.get(partial(bytes, 400), key=key) == bytes(400) for key in ['second', 'third'])
+
+
+def test_clone_project(clone_project):
+    """Test that the template is cloned and that writable files are independent copies."""
+    path_clone = clone_project(PATH_TEST_PROJECT, writable=['*.toml'])  # act
+
+    assert (path_clone / 'tests').is_dir()
+    assert (path_clone / 'test_file.py').read_text() == (PATH_TEST_PROJECT / 'test_file.py').read_text()
+    (path_clone / 'pyproject.toml').write_text('[tool.modified]\n')
+    assert 'modified' not in (PATH_TEST_PROJECT / 'pyproject.toml').read_text()
+
+
+def test_clone_project_hardlinks(tmp_path):
+    """Test that read-only files are hardlinked when reflinks are not supported on the same device."""
+    path_template = tmp_path / 'template'
+    (path_template / 'nested').mkdir(parents=True)
+    for rel_path in ['data.csv', 'nested/config.toml']:
+        (path_template / rel_path).write_text(rel_path)
+    _REFLINK_SUPPORT.clear()
+
+    path_clone = _clone_tree(path_template, tmp_path / 'clone', writable=['nested/*'])  # act
+
+    reflinked = any(_REFLINK_SUPPORT.values())
+    assert (path_clone / 'data.csv').samefile(path_template / 'data.csv') != reflinked
+    assert not (path_clone / 'nested/config.toml').samefile(path_template / 'nested/config.toml')
+    assert (path_clone / 'nested/config.toml').read_text() == 'nested/config.toml'
+
+
+def test_reflink_missing_source(tmp_path):
+    """Test that a failed reflink does not raise when the destination was never created."""
+    result = _reflink(tmp_path / 'missing.txt', tmp_path / 'clone.txt')
+
+    assert result is False
+    assert not (tmp_path / 'clone.txt').exists()
+
+
+def test_shared_data(pytester):
+    """Test that the shared data is only created once and is read-only."""
+    pytester.makeconftest(_CONFTEST + 'from calcipy.conftest import shared_data  # noqa: F401\n')
+    pytester.makepyfile("""
+        import pytest
+
+        CALLS = []
+
+        def _create():
+            CALLS.append(1)
+            return bytes(range(256))
+
+        def test_view(shared_data):
+            view = shared_data.get('reference/bytes', _create)
+            assert view[255] == 255
+            assert shared_data.get('reference/bytes', _create).tobytes() == bytes(range(256))
+            assert len(CALLS) == 1
+            with pytest.raises(TypeError):
+                view[0] = 1
+
+        def test_empty(shared_data):
+            assert shared_data.get('empty', bytes).tobytes() == b''
+    """)
+
+    result = pytester.runpytest()  # act
+
+    result.assert_outcomes(passed=2)
+    shared_files = sorted(pth.name for pth in pytester.path.parent.rglob('calcipy_shared/*.bin'))
+    assert shared_files == ['empty.bin', 'reference_bytes.bin']
+
+
+def test_test_budget(pytester):
+    """Test the --test-budget watchdog."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        import time
+
+        import pytest
+
+        def test_hang():
+            time.sleep(10)
+
+        @pytest.mark.SLOW()
+        def test_slow():
+            time.sleep(0.3)
+    """)
+
+    result = pytester.runpytest('--test-budget=default=0.2', '--test-budget=SLOW=5')  # act
+
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(['*exceeded the time budget of 0.2s*', '*in test_hang*'])
+    assert (pytester.path / 'releases/tests/hang_dumps/test_test_budget.py_test_hang.txt').is_file()
+
+
+def test_test_budget_restores_outer_timer(pytester):
+    """Test that a nested in-process run restores the timer of the outer test."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        def test_fast():
+            assert True
+    """)
+    handler = signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    outer_timer = signal.setitimer(signal.ITIMER_REAL, 60)
+    try:
+        pytester.runpytest('--test-budget=default=5').assert_outcomes(passed=1)  # act
+
+        remaining = signal.getitimer(signal.ITIMER_REAL)[0]
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, *outer_timer)
+        signal.signal(signal.SIGALRM, handler)
+
+    assert 50 < remaining <= 60
+
+
+def test_test_budget_usage_error(pytester):
+    """Test that malformed budgets are rejected."""
+    pytester.makeconftest(_CONFTEST)
+
+    result = pytester.runpytest('--test-budget=SLOW')  # act
+
+    result.stderr.fnmatch_lines(['*Expected --test-budget=MARKER=SECONDS*'])
+
+
+def test_test_budget_abort(pytester, monkeypatch):
+    """Test that the watchdog can abort the session."""
+    monkeypatch.setenv('PYTHONPATH', str(Path(calcipy.__file__).parents[1]))
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        import time
+
+        def test_hang():
+            time.sleep(10)
+    """)
+
+    result = pytester.runpytest_subprocess('--test-budget=default=0.5', '--test-budget-action=abort')  # act
+
+    assert result.ret != 0
+    result.stderr.fnmatch_lines(['*Aborting the test session*', '*exceeded the time budget of 0.5s*', '*in test_hang*'])
+
+
+def test_profile_tests(pytester):
+    """Test the --profile-tests plugin."""
+    pytester.makeconftest(_CONFTEST)
+    pytester.makepyfile("""
+        def _inner(count):
+            return sum(idx ** 2 for idx in range(count))
+
+        def _outer():
+            return [_inner(2000) for _idx in range(20)]
+
+        def test_work():
+            assert _outer()
+    """)
+
+    result = pytester.runpytest('--profile-tests')  # act
+
+    result.assert_outcomes(passed=1)
+    path_profiles = pytester.path / 'releases/tests/profiles'
+    speedscope = json.loads((path_profiles / 'test_profile_tests.py_test_work.speedscope.json').read_text())
+    frame_names = [frame['name'] for frame in speedscope['shared']['frames']]
+    assert any(name.startswith('_inner (test_profile_tests.py') for name in frame_names)
+    profile = speedscope['profiles'][0]
+    assert len(profile['samples']) == len(profile['weights'])
+    collapsed = (path_profiles / 'test_profile_tests.py_test_work.collapsed.txt').read_text()
+    assert any('test_work' in line and '_outer' in line and '_inner' in line for line in collapsed.splitlines())
+    assert '_inner' in (path_profiles / 'hot_functions.txt').read_text()
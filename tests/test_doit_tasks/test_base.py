@@ -1,8 +1,9 @@
 """Test doit_tasks/base.py."""
 
 import attr
+from doit.loader import load_tasks
 
-from calcipy.doit_tasks.base import _show_cmd, debug_task, if_found_unlink
+from calcipy.doit_tasks.base import _show_cmd, debug_task, defer_task, if_found_unlink
 
 from ..configuration import TEST_DATA_DIR
 
@@ -40,3 +41,21 @@ def test_if_found_unlink():
     assert file_path.is_file()
     if_found_unlink(file_path)
     assert not file_path.is_file()
+
+
+def test_defer_task():
+    """Test that the deferred task is listed by doit without calling the task creator."""
+    calls = []
+
+    def task_deferred():
+        """Deferred task."""
+        calls.append(1)
+        return debug_task(['echo deferred'])
+
+    deferred = defer_task(task_deferred)
+
+    tasks = load_tasks({'task_deferred': deferred})  # act
+
+    assert [(task.name, task.doc) for task in tasks] == [('deferred', 'Deferred task.')]
+    assert not calls
+    assert deferred() == debug_task(['echo deferred'])
@@ -0,0 +1,78 @@
+"""Test doit_tasks/changelog.py."""
+
+import json
+import subprocess  # noqa: S404
+
+import pytest
+
+from calcipy.doit_tasks.changelog import write_changelog
+
+
+def _git(path_repo, *args):
+    subprocess.run(['git', *args], cwd=path_repo, check=True, capture_output=True)  # noqa: S603, S607
+
+
+def _commit(path_repo, message, tag=''):
+    _git(path_repo, 'commit', '--allow-empty', '-m', message)
+    if tag:
+        _git(path_repo, 'tag', tag)
+
+
+def _init(path_repo):
+    _git(path_repo, 'init', '-q')
+    _git(path_repo, 'config', 'user.email', 'test@example.com')
+    _git(path_repo, 'config', 'user.name', 'Test')
+
+
+def test_write_changelog(tmp_path):
+    """Test that released sections are cached and only new commits are parsed."""
+    _init(tmp_path)
+    (tmp_path / 'pyproject.toml').write_text('[tool.commitizen.cz_legacy_map]\nChg = "Change (Old)"\n')
+    _commit(tmp_path, 'Chg: legacy change')
+    _commit(tmp_path, 'feat(lint): add a task', tag='0.1.0')
+    _commit(tmp_path, 'docs: not included')
+    _commit(tmp_path, 'fix: patch a bug')
+    path_cache = tmp_path / 'cache.json'
+    path_changelog = tmp_path / 'CHANGELOG.md'
+
+    write_changelog(tmp_path, path_cache)
+    _commit(tmp_path, 'feat!: break the API', tag='1.0.0')
+    _commit(tmp_path, 'refactor: clean up')
+    write_changelog(tmp_path, path_cache)  # act
+
+    text = path_changelog.read_text()
+    assert text.startswith('## Unreleased\n\n### Refactor\n\n- clean up\n\n## 1.0.0 (')
+    assert '### BREAKING CHANGE\n\n- break the API\n\n### Fix\n\n- patch a bug\n\n## 0.1.0 (' in text
+    assert text.endswith('### Feat\n\n- **lint**: add a task\n\n### Change (Old)\n\n- legacy change\n')
+    assert 'not included' not in text
+    assert [sec['tag'] for sec in json.loads(path_cache.read_text())['sections']] == ['1.0.0', '0.1.0']
+
+
+def test_write_changelog_git_error(tmp_path):
+    """Test that a failed git log raises instead of replacing the Changelog with an empty file."""
+    path_changelog = tmp_path / 'CHANGELOG.md'
+    path_changelog.write_text('## 0.1.0\n')
+
+    with pytest.raises(subprocess.CalledProcessError):
+        write_changelog(tmp_path, tmp_path / 'cache.json')  # act
+
+    assert path_changelog.read_text() == '## 0.1.0\n'
+
+
+def test_write_changelog_corrupt_cache(tmp_path):
+    """Test that a corrupt cache is ignored and that a history without sections is not written."""
+    _init(tmp_path)
+    _commit(tmp_path, 'feat: add a task', tag='0.1.0')
+    path_cache = tmp_path / 'cache.json'
+    path_cache.write_text('{"sections": [')
+
+    write_changelog(tmp_path, path_cache)  # act
+
+    assert (tmp_path / 'CHANGELOG.md').read_text().startswith('## 0.1.0 (')
+    path_empty = tmp_path / 'empty'
+    path_empty.mkdir()
+    _init(path_empty)
+    _commit(path_empty, 'docs: not included')
+    with pytest.raises(RuntimeError, match='No Changelog sections'):
+        write_changelog(path_empty, path_empty / 'cache.json')
+    assert not (path_empty / 'CHANGELOG.md').exists()
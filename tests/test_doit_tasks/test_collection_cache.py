@@ -0,0 +1,52 @@
+"""Test doit_tasks/collection_cache.py."""
+
+import json
+import sys
+
+from calcipy.doit_tasks.collection_cache import select_test_paths
+
+_TEST_ALPHA = """
+import pytest
+
+@pytest.mark.SLOW()
+def test_alpha_slow():
+    pass
+"""
+
+_TEST_BETA = """
+def test_beta_parse():
+    pass
+"""
+
+
+def test_select_test_paths(tmp_path):
+    """Test select_test_paths with a cache miss then a cache hit."""
+    path_tests = tmp_path / 'tests'
+    path_tests.mkdir()
+    (path_tests / 'test_cc_alpha.py').write_text(_TEST_ALPHA)
+    (path_tests / 'test_cc_beta.py').write_text(_TEST_BETA)
+    path_cache = tmp_path / 'collection_cache.json'
+
+    result = select_test_paths(path_tests, path_cache, marker='SLOW')  # act
+
+    assert result == [(path_tests / 'test_cc_alpha.py').resolve()]
+    assert select_test_paths(path_tests, path_cache, keyword='parse') == [(path_tests / 'test_cc_beta.py').resolve()]
+    assert select_test_paths(path_tests, path_cache, keyword='alpha', marker='not SLOW') == []
+    assert select_test_paths(path_tests, path_cache) == [path_tests]
+    # Unchanged files are read from the cache instead of being collected again
+    cache = json.loads(path_cache.read_text())
+    cache['files']['test_cc_beta.py']['items'][0]['markers'] = ['SLOW']
+    path_cache.write_text(json.dumps(cache))
+    assert len(select_test_paths(path_tests, path_cache, marker='SLOW')) == 2
+
+
+def test_select_test_paths_without_pytest(tmp_path):
+    """Test that the full test directory is used when the collection process cannot import pytest."""
+    path_tests = tmp_path / 'tests'
+    path_tests.mkdir()
+    (path_tests / 'test_cc_beta.py').write_text(_TEST_BETA)
+    python_argv = [sys.executable, '-S']  # Without site-packages, pytest is not importable
+
+    result = select_test_paths(path_tests, tmp_path / 'collection_cache.json', keyword='parse', python_argv=python_argv)
+
+    assert result == [path_tests]
@@ -1,6 +1,16 @@
 """Test doit_tasks/doc.py."""
 
-from calcipy.doit_tasks.doc import task_tag_create, task_tag_remove, task_cl_write
+import json
+import os
+
+import pytest
+
+from calcipy.doit_tasks import doc
+from calcipy.doit_tasks.doc import (
+    _check_site_links, _inject_sections, _iter_coverage_table, _optimize_site, _SectionWatcher, _write_changelog,
+    _write_markdown_sections, _write_reference_stubs, _write_to_markdown, task_check_links, task_cl_write,
+    task_deploy, task_optimize_site, task_tag_create, task_tag_remove,
+)
 from calcipy.doit_tasks.doit_globals import DIG
 
 from ..configuration import PATH_TEST_PROJECT
@@ -8,10 +18,12 @@ from ..configuration import PATH_TEST_PROJECT
 
 def test_task_cl_write():
     """Test task_cl_write."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
     result = task_cl_write()
 
     assert len(result['actions']) == 1
-    assert result['actions'][0] == 'poetry run cz changelog'
+    assert result['actions'][0][0] is _write_changelog
 
 
 def test_task_tag_create():
@@ -36,3 +48,223 @@ def test_task_tag_remove():
     assert result['actions'][0].startswith('git tag -d')
     assert result['actions'][1] == 'git tag -n10 --list'
     assert result['actions'][2].startswith('git push origin :refs/tags/')
+
+
+def test_task_deploy():
+    """Test that task_deploy publishes the optimized site instead of rebuilding it."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = task_deploy()
+    optimize = task_optimize_site()
+
+    assert result['task_dep'] == ['optimize_site']
+    assert result['actions'][0]._action.args[:2] == ('ghp-import', f'--no-jekyll --push --force "{DIG.doc.path_out}"')
+    assert optimize['task_dep'] == ['document']
+    assert optimize['actions'][0][0] is _optimize_site
+
+
+def test_task_check_links():
+    """Test that task_check_links builds the site first."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = task_check_links()
+
+    assert result['task_dep'] == ['document']
+    assert result['actions'][0][0] is _check_site_links
+
+
+class _NoSource(Exception):  # noqa: N818
+    """Stand-in for `coverage.exceptions.NoSource`."""
+
+
+class _FakeCoverage:
+    """Minimal stand-in for the `coverage.Coverage` API."""
+
+    def get_data(self):
+        return self
+
+    def measured_files(self):
+        return [
+            str(PATH_TEST_PROJECT / 'test_file.py'), str(PATH_TEST_PROJECT / 'empty.py'),
+            str(PATH_TEST_PROJECT / 'deleted.py'),
+        ]
+
+    def analysis2(self, file_path):
+        if file_path.endswith('deleted.py'):
+            raise _NoSource(f'No source for code: {file_path}')
+        if file_path.endswith('empty.py'):
+            return file_path, [], [], [], ''
+        return file_path, [1, 2, 3, 4], [9], [4], '4'
+
+
+def test_iter_coverage_table():
+    """Test _iter_coverage_table."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = list(_iter_coverage_table(_FakeCoverage(), '2021-01-01T00:00:00', (_NoSource,)))
+
+    assert result == [
+        '| File | Statements | Missing | Excluded | Coverage |',
+        '| --: | --: | --: | --: | --: |',
+        '| `empty.py` | 0 | 0 | 0 | 100.0% |',
+        '| `test_file.py` | 4 | 1 | 1 | 75.0% |',
+        '',
+        'Generated on: 2021-01-01T00:00:00',
+    ]
+
+
+def test_write_markdown_sections_cache(monkeypatch, tmp_path):
+    """Test that the coverage hash is only recorded after the sections were written."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.test, 'path_out', tmp_path)
+    monkeypatch.setattr(doc, '_get_coverage_section', lambda: ({'COVERAGE': ['| new |']}, 'data-hash'))
+
+    def _fail_write(new_text):
+        raise OSError('read-only')
+
+    monkeypatch.setattr(doc, '_write_to_markdown', _fail_write)
+
+    with pytest.raises(OSError, match='read-only'):
+        _write_markdown_sections()  # act
+
+    assert not (tmp_path / 'readme_coverage.json').exists()
+    monkeypatch.setattr(doc, '_write_to_markdown', lambda new_text: [])
+    _write_markdown_sections()
+    assert json.loads((tmp_path / 'readme_coverage.json').read_text()) == {'hash': 'data-hash'}
+
+
+_MARKDOWN = """# Title
+
+<!-- COVERAGE -->
+
+old table
+
+<!-- /COVERAGE -->
+
+<!-- CODE:test_file.py -->
+<!-- /CODE:test_file.py -->
+
+<!-- UNKNOWN -->
+unchanged
+<!-- /UNKNOWN -->
+"""
+
+
+def test_inject_sections():
+    """Test _inject_sections."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = _inject_sections(_MARKDOWN, {'COVERAGE': ['| new |']})
+
+    assert '<!-- COVERAGE -->\n\n| new |\n\n<!-- /COVERAGE -->' in result
+    assert 'old table' not in result
+    assert '<!-- CODE:test_file.py -->\n\n```py\n' in result
+    assert '<!-- UNKNOWN -->\nunchanged\n<!-- /UNKNOWN -->' in result
+    assert _inject_sections(result, {'COVERAGE': ['| new |']}) == result
+
+
+def test_write_to_markdown(monkeypatch, tmp_path):
+    """Test that _write_to_markdown only writes files that changed."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.meta, 'path_project', tmp_path)
+    path_readme = tmp_path / 'README.md'
+    path_readme.write_text(_MARKDOWN)
+    (tmp_path / 'test_file.py').write_text('print(1)\n')
+    (tmp_path / 'docs').mkdir()
+    path_doc = tmp_path / 'docs/index.md'
+    path_doc.write_text('<!-- COVERAGE -->\n<!-- /COVERAGE -->\n')
+
+    _write_to_markdown({'COVERAGE': ['| new |']})
+    mtime = path_readme.stat().st_mtime_ns
+    _write_to_markdown({'COVERAGE': ['| new |']})  # act
+
+    assert path_readme.stat().st_mtime_ns == mtime
+    assert '```py\nprint(1)\n```' in path_readme.read_text()
+    assert path_doc.read_text() == '<!-- COVERAGE -->\n\n| new |\n\n<!-- /COVERAGE -->\n'
+
+
+def test_write_reference_stubs(monkeypatch, tmp_path):
+    """Test that the reference stubs and mkdocs nav match the package modules."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.meta, 'path_project', tmp_path)
+    monkeypatch.setattr(DIG.meta, 'pkg_name', 'pkg')
+    for rel_path in ['pkg/__init__.py', 'pkg/core.py', 'pkg/_private.py', 'pkg/sub/__init__.py', 'pkg/sub/tools.py']:
+        (tmp_path / rel_path).parent.mkdir(exist_ok=True, parents=True)
+        (tmp_path / rel_path).write_text('')
+    path_ref = tmp_path / 'docs/reference'
+    (path_ref / 'pkg/removed').mkdir(parents=True)
+    (path_ref / 'pkg/removed/old.md').write_text('::: pkg.removed.old\n')
+    (path_ref / 'pkg/core.md').write_text('::: pkg.core\n')
+    (path_ref / 'pkg/overview.md').write_text('# Overview\n\n::: pkg.core\n')
+    mtime = (path_ref / 'pkg/core.md').stat().st_mtime_ns
+    (tmp_path / 'mkdocs.yml').write_text('nav:\n  - Home: index.md\n  - Reference:\n      - old: old.md\ntheme: {}\n')
+
+    _write_reference_stubs()  # act
+
+    assert sorted(pth.relative_to(path_ref).as_posix() for pth in path_ref.rglob('*.md')) == [
+        'pkg/core.md', 'pkg/overview.md', 'pkg/sub/tools.md',
+    ]
+    assert (path_ref / 'pkg/sub/tools.md').read_text() == '::: pkg.sub.tools\n'
+    assert (path_ref / 'pkg/core.md').stat().st_mtime_ns == mtime
+    assert not (path_ref / 'pkg/removed').exists()
+    assert (tmp_path / 'mkdocs.yml').read_text() == (
+        'nav:\n  - Home: index.md\n  - Reference:\n'
+        '      - pkg.core: reference/pkg/core.md\n      - pkg.sub.tools: reference/pkg/sub/tools.md\ntheme: {}\n'
+    )
+
+
+def test_section_watcher(monkeypatch, tmp_path):
+    """Test that only the sections generated from a changed source file are regenerated."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.meta, 'path_project', tmp_path)
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs/index.md').write_text('{!README.md!}\n')
+    (tmp_path / 'a.py').write_text('A = 1\n')
+    (tmp_path / 'b.py').write_text('B = 1\n')
+    path_readme = tmp_path / 'README.md'
+    path_readme.write_text('<!-- CODE:a.py -->\n<!-- /CODE:a.py -->\n<!-- CODE:b.py -->\n<!-- /CODE:b.py -->\n')
+    os.utime(tmp_path / 'docs/index.md', (0, 0))
+    watcher = _SectionWatcher()
+    assert watcher.poll() == set()
+    b_stat = (tmp_path / 'b.py').stat()
+    (tmp_path / 'a.py').write_text('A = 2\n')
+    os.utime(tmp_path / 'a.py', (b_stat.st_atime + 10, b_stat.st_mtime + 10))
+    (tmp_path / 'b.py').write_text('B = 2\n')
+    os.utime(tmp_path / 'b.py', (b_stat.st_atime, b_stat.st_mtime))  # Unchanged
+
+    keys = watcher.poll()
+    watcher.update(keys)  # act
+
+    assert keys == {'CODE:a.py'}
+    assert 'A = 2' in path_readme.read_text()
+    assert 'B = 2' not in path_readme.read_text()
+    assert (tmp_path / 'docs/index.md').stat().st_mtime > 0
+    assert watcher.poll() == set()
+
+
+def test_section_watcher_errors(monkeypatch, tmp_path):
+    """Test that the watcher logs errors from an unreadable file and keeps polling."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.meta, 'path_project', tmp_path)
+    path_readme = tmp_path / 'README.md'
+    path_readme.write_bytes(b'\xff\xfe invalid UTF-8\n')
+    (tmp_path / 'a.py').write_text('A = 1\n')
+    errors = []
+    monkeypatch.setattr(doc.logger, 'exception', errors.append)
+
+    class _Stop(Exception):  # noqa: N818
+        """Stop the polling loop."""
+
+    def fake_sleep(_interval):
+        if path_readme.read_bytes().startswith(b'<!--'):
+            raise _Stop()
+        path_readme.write_text('<!-- CODE:a.py -->\n<!-- /CODE:a.py -->\n')
+
+    monkeypatch.setattr(doc.time, 'sleep', fake_sleep)
+
+    watcher = _SectionWatcher(interval=0)
+    with pytest.raises(_Stop):
+        watcher.run()  # act
+
+    assert errors == ['Failed to regenerate the marker sections']
+    assert watcher._sources == {tmp_path / 'a.py': {'CODE:a.py'}}
@@ -1,9 +1,13 @@
 """Test doit_tasks/doit_globals.py."""
 
+import json
+import os
 from pathlib import Path
 from typing import Any, List
 
-from calcipy.doit_tasks.doit_globals import DocConfig, DoItGlobals
+from calcipy.doit_tasks.doit_globals import (
+    DocConfig, DoItGlobals, PackageMeta, _get_snapshot_path, get_user_cache_path, prune_user_cache,
+)
 
 from ..configuration import PATH_TEST_PROJECT
 
@@ -53,6 +57,65 @@ def test_path_attr_base_path_resolver():
     assert doc.path_out.is_absolute()
 
 
+def test_output_dirs_are_deferred(tmp_path):
+    """Test that the output directories are only created by the tasks that write to them."""
+    doc = DocConfig(path_project=tmp_path)  # act
+
+    assert doc.path_out == tmp_path / 'releases/site'
+    assert not doc.path_out.exists()
+
+
+def test_package_meta_snapshot(monkeypatch, tmp_path):
+    """Test that the pyproject.toml is only parsed again when the content changes."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    path_toml = tmp_path / 'pyproject.toml'
+    path_toml.write_text('[tool.poetry]\nname = "pkg"\nversion = "1.0.0"\n')
+    PackageMeta(path_project=tmp_path)
+    path_snapshot = _get_snapshot_path(path_toml)
+    snapshot = json.loads(path_snapshot.read_text())
+    path_snapshot.write_text(json.dumps({**snapshot, 'poetry': {'name': 'pkg', 'version': 'snapshot'}}))
+
+    meta = PackageMeta(path_project=tmp_path)  # act
+
+    assert meta.pkg_version == 'snapshot'
+    path_toml.write_text('[tool.poetry]\nname = "pkg"\nversion = "2.0.0"\n')
+    os.utime(path_toml, ns=(snapshot['mtime_ns'] + 1, snapshot['mtime_ns'] + 1))
+    assert PackageMeta(path_project=tmp_path).pkg_version == '2.0.0'
+
+
+def test_package_meta_malformed_snapshot(monkeypatch, tmp_path):
+    """Test that a malformed snapshot falls back to reading the pyproject.toml."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    path_toml = tmp_path / 'pyproject.toml'
+    path_toml.write_text('[tool.poetry]\nname = "pkg"\nversion = "1.0.0"\n')
+    path_snapshot = _get_snapshot_path(path_toml)
+    path_snapshot.parent.mkdir(parents=True)
+    path_snapshot.write_text(json.dumps({'mtime_ns': path_toml.stat().st_mtime_ns, 'poetry': {'name': 'pkg'}}))
+
+    meta = PackageMeta(path_project=tmp_path)  # act
+
+    assert meta.pkg_version == '1.0.0'
+    assert json.loads(path_snapshot.read_text())['poetry'] == {'name': 'pkg', 'version': '1.0.0'}
+
+
+def test_prune_user_cache(monkeypatch, tmp_path):
+    """Test that only the cache files for removed source paths are pruned."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    path_kept = get_user_cache_path(tmp_path, 'config')
+    path_removed = get_user_cache_path(tmp_path / 'removed', 'config')
+    path_other = get_user_cache_path(tmp_path / 'removed', 'venv')
+    path_kept.parent.mkdir(parents=True)
+    path_kept.write_text(json.dumps({'path_toml': tmp_path.as_posix()}))
+    path_removed.write_text(json.dumps({'path_toml': (tmp_path / 'removed').as_posix()}))
+    path_other.write_text('{}')
+
+    prune_user_cache('config', 'path_toml')  # act
+
+    assert path_kept.is_file()
+    assert not path_removed.exists()
+    assert path_other.is_file()
+
+
 # import pytest
 # from calcipy.doit_tasks.doit_globals import TestingConfig
 # Parametrize for path_project to be none or a path and show that both raise an error for different missing paths...
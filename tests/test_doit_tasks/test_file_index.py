@@ -0,0 +1,72 @@
+"""Test doit_tasks/file_index.py."""
+
+import json
+import os
+
+from calcipy.doit_tasks import file_index
+from calcipy.doit_tasks.doit_globals import get_user_cache_path
+from calcipy.doit_tasks.file_index import FileIndex, _get_index
+
+
+def _create_tree(path_root):
+    """Create a project tree with files in directories that should be pruned."""
+    for rel_path in [
+        'README.md', 'pkg/__init__.py', 'pkg/module.py', 'pkg/sub/nested.py', 'pkg/__pycache__/module.py',
+        '.venv/lib/site.py', 'releases/site/index.md',
+    ]:
+        (path_root / rel_path).parent.mkdir(exist_ok=True, parents=True)
+        (path_root / rel_path).write_text('')
+
+
+def test_file_index(tmp_path):
+    """Test FileIndex.find."""
+    _create_tree(tmp_path)
+    index = FileIndex(tmp_path, pruned_dirs=frozenset([tmp_path / 'releases']))
+
+    result = index.find(['.md', '.py'], excluded_names=['__init__.py'])  # act
+
+    assert result == [tmp_path / 'README.md', tmp_path / 'pkg/module.py', tmp_path / 'pkg/sub/nested.py']
+    assert index.find(['.py'], sub_dirs=[tmp_path / 'pkg'], recursive=False) == [
+        tmp_path / 'pkg/__init__.py', tmp_path / 'pkg/module.py',
+    ]
+    assert index.find(['.py'], excluded_dirs=[tmp_path / 'pkg/sub']) == [
+        tmp_path / 'pkg/__init__.py', tmp_path / 'pkg/module.py',
+    ]
+
+
+def test_file_index_persistence(monkeypatch, tmp_path):
+    """Test that only the directories with a changed modified time are listed again."""
+    path_root = tmp_path / 'project'
+    path_root.mkdir()
+    _create_tree(path_root)
+    path_cache = tmp_path / 'file_index.json'
+    FileIndex(path_root, path_cache=path_cache).find(['.py'])
+    scanned = []
+    original_scandir = file_index.os.scandir
+
+    def _scandir(path_dir):
+        scanned.append(path_dir)
+        return original_scandir(path_dir)
+
+    monkeypatch.setattr(file_index.os, 'scandir', _scandir)
+    (path_root / 'pkg/sub/added.py').write_text('')
+    mtime_ns = (path_root / 'pkg/sub').stat().st_mtime_ns + 1_000_000_000
+    os.utime(path_root / 'pkg/sub', ns=(mtime_ns, mtime_ns))
+
+    result = FileIndex(path_root, path_cache=path_cache).find(['.py'])  # act
+
+    assert scanned == [path_root / 'pkg/sub']
+    assert path_root / 'pkg/sub/added.py' in result
+
+
+def test_get_index_prunes_removed_roots(tmp_path):
+    """Test that persisting a new index removes the indexes of root directories that no longer exist."""
+    path_removed = get_user_cache_path(tmp_path / 'removed', 'file-index')
+    path_removed.parent.mkdir(parents=True)
+    path_removed.write_text(json.dumps({'path_root': (tmp_path / 'removed').as_posix(), 'dirs': {}}))
+    _create_tree(tmp_path)
+
+    _get_index(tmp_path, True, frozenset()).find(['.py'])  # act
+
+    assert not path_removed.exists()
+    assert json.loads(get_user_cache_path(tmp_path, 'file-index').read_text())['path_root'] == tmp_path.as_posix()
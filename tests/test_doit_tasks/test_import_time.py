@@ -0,0 +1,43 @@
+"""Test the import time of calcipy.doit_tasks."""
+
+import os
+import subprocess  # noqa: S404
+import sys
+
+from ..configuration import TEST_DIR
+
+_IMPORT_BUDGET_MS = int(os.getenv('CALCIPY_IMPORT_BUDGET_MS', '300'))
+"""Maximum cumulative import time in milliseconds (about 150 ms measured). Override with `CALCIPY_IMPORT_BUDGET_MS`."""
+
+_IMPORT_RUNS = 5
+"""Number of fresh interpreters to measure. The fastest run is compared to the budget to ignore noisy runners."""
+
+_DEFERRED_MODULES = ['doit.tools', 'gzip', 'html.parser', 'toml']
+"""Modules that should only be imported when a task runs. `concurrent.futures` is excluded because loguru imports it."""
+
+
+def _measure_import():
+    """Return the cumulative import time in microseconds and the deferred modules imported by a fresh interpreter."""
+    script = (
+        'import sys; import calcipy.doit_tasks; '
+        f'print(",".join(mod for mod in {_DEFERRED_MODULES!r} if mod in sys.modules))'
+    )
+    env = {**os.environ, 'PYTHONPATH': str(TEST_DIR.parent)}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', script], capture_output=True, text=True, env=env, check=True,
+    )
+    # Each stderr line is formatted as: 'import time: {self_us} | {cumulative_us} | {name}'
+    cumulative = [
+        int(line.split('|')[1]) for line in result.stderr.splitlines()
+        if line.startswith('import time:') and line.split('|')[-1].strip() == 'calcipy.doit_tasks'
+    ]
+    assert len(cumulative) == 1
+    return cumulative[0], result.stdout.strip()
+
+
+def test_doit_tasks_import_time():
+    """Test that importing the doit tasks stays within the budget and defers the heavy modules."""
+    results = [_measure_import() for _ in range(_IMPORT_RUNS)]  # act
+
+    assert {imported for _, imported in results} == {''}
+    assert min(cumulative for cumulative, _ in results) / 1000 < _IMPORT_BUDGET_MS
@@ -0,0 +1,28 @@
+"""Test doit_tasks/link_check.py."""
+
+from calcipy.doit_tasks.link_check import check_links
+
+
+def test_check_links(tmp_path):
+    """Test that broken internal links and anchors are reported and external links are skipped."""
+    path_site = tmp_path / 'site'
+    (path_site / 'guide').mkdir(parents=True)
+    (path_site / 'style.css').write_text('')
+    (path_site / 'index.html').write_text(
+        '<link href="style.css"><h1 id="top">Home</h1>'
+        '<a href="guide/#usage">ok</a><a href="#top">ok</a><a href="/style.css">ok</a>'
+        '<a href="https://example.com/missing">skipped</a><a href="mailto:a@b.c">skipped</a>'
+        '<a href="guide/#missing">anchor</a><a href="removed/">file</a><img src="logo.png">',
+    )
+    (path_site / 'guide/index.html').write_text('<h2 id="usage">Usage</h2><a href="../../outside.html">file</a>')
+    path_cache = tmp_path / 'link_cache.json'
+
+    result = check_links(path_site, path_cache)
+    cached_result = check_links(path_site, path_cache)  # act
+
+    assert result == cached_result == [
+        'guide/index.html: ../../outside.html (missing file)',
+        'index.html: guide/#missing (missing anchor)',
+        'index.html: removed/ (missing file)',
+        'index.html: logo.png (missing file)',
+    ]
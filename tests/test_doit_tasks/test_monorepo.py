@@ -0,0 +1,90 @@
+"""Test doit_tasks/monorepo.py."""
+
+import pytest
+from doit.action import CmdAction
+
+from calcipy.doit_tasks.base import debug_task
+from calcipy.doit_tasks.doit_globals import DIG
+from calcipy.doit_tasks.monorepo import create_monorepo_tasks, find_projects
+
+from ..configuration import PATH_TEST_PROJECT
+
+_PYPROJECT = '[tool.poetry]\nname = "{name}"\nversion = "0.0.0"\n'
+
+
+def _create_monorepo(path_root):
+    """Create a monorepo with two packages and directories that should not be searched."""
+    for path_project in [path_root / 'libs/pkg_a', path_root / 'pkg_b', path_root / '.venv/pkg_c']:
+        path_project.mkdir(parents=True)
+        (path_project / 'pyproject.toml').write_text(_PYPROJECT.format(name=path_project.name))
+    (path_root / 'pkg_b/nested').mkdir()
+    (path_root / 'pkg_b/nested/pyproject.toml').write_text(_PYPROJECT.format(name='nested'))
+    (path_root / 'tools').mkdir()
+    (path_root / 'tools/pyproject.toml').write_text('[tool.isort]\nline_length = 120\n')
+
+
+def test_find_projects(tmp_path):
+    """Test find_projects."""
+    _create_monorepo(tmp_path)
+
+    result = find_projects(tmp_path)
+
+    assert result == [tmp_path / 'libs/pkg_a', tmp_path / 'pkg_b']
+
+
+def test_find_projects_invalid(tmp_path):
+    """Test that a project with an invalid pyproject.toml is skipped."""
+    _create_monorepo(tmp_path)
+    (tmp_path / 'broken').mkdir()
+    (tmp_path / 'broken/pyproject.toml').write_text('[tool.poetry\nname = "broken"\n')
+    (tmp_path / 'binary').mkdir()
+    (tmp_path / 'binary/pyproject.toml').write_bytes(b'\xff\xfe')
+
+    result = find_projects(tmp_path)
+
+    assert result == [tmp_path / 'libs/pkg_a', tmp_path / 'pkg_b']
+
+
+def test_swap_globals_restores_on_error(tmp_path):
+    """Test that the global DIG is restored when a task creator raises."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    _create_monorepo(tmp_path)
+
+    def task_fail():
+        """Fail while the package globals are active."""
+        raise RuntimeError(DIG.meta.pkg_name)
+
+    creators = create_monorepo_tasks(tmp_path, task_creators=[task_fail])
+
+    with pytest.raises(RuntimeError, match='pkg_a'):
+        list(creators['task_fail']())  # act
+
+    assert DIG.meta.path_project == PATH_TEST_PROJECT
+
+
+def test_create_monorepo_tasks(tmp_path):
+    """Test that each package subtask is created and runs with the package globals."""
+    _create_monorepo(tmp_path)
+    pkg_names = []
+
+    def record_pkg_name():
+        pkg_names.append(DIG.meta.pkg_name)
+
+    def task_show_pkg():
+        """Show the package name."""
+        return debug_task([(record_pkg_name, ()), f'echo {DIG.meta.pkg_name}'])
+
+    creators = create_monorepo_tasks(tmp_path, task_creators=[task_show_pkg])  # act
+
+    assert list(creators) == ['task_show_pkg']
+    assert creators['task_show_pkg'].__doc__ == 'Show the package name.'
+    tasks = list(creators['task_show_pkg']())
+    assert [task['name'] for task in tasks] == ['pkg_a', 'pkg_b']
+    for task, path_project in zip(tasks, [tmp_path / 'libs/pkg_a', tmp_path / 'pkg_b']):
+        func, args = task['actions'][0]
+        func(*args)
+        cmd_action = task['actions'][1]
+        assert isinstance(cmd_action, CmdAction)
+        assert cmd_action._action == f'echo {path_project.name}'
+        assert cmd_action.pkwargs['cwd'] == str(path_project)
+    assert pkg_names == ['pkg_a', 'pkg_b']
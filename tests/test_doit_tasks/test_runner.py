@@ -0,0 +1,109 @@
+"""Test doit_tasks/runner.py."""
+
+from doit.action import CmdAction
+from doit.task import Task
+
+from calcipy.doit_tasks import runner
+from calcipy.doit_tasks.doit_globals import DIG
+from calcipy.doit_tasks.runner import defer_cmd, get_venv, resolve_argv, resolve_cmd
+from calcipy.doit_tasks.test import task_test_benchmark
+
+from ..configuration import PATH_TEST_PROJECT
+
+
+def _create_venv(path_venv, scripts):
+    """Create a fake virtual environment with executable scripts."""
+    path_bin = path_venv / runner._BIN_DIR
+    path_bin.mkdir(parents=True)
+    for script in scripts:
+        (path_bin / script).write_text('')
+        (path_bin / script).chmod(0o755)
+    return path_bin
+
+
+def test_resolve_argv(monkeypatch, tmp_path):
+    """Test that commands are resolved to the virtual environment with an escape hatch to poetry run."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.delenv(runner._POETRY_RUN_ENV, raising=False)
+    path_project = tmp_path / 'project'
+    path_bin = _create_venv(path_project / '.venv', ['python', 'pytest'])
+    monkeypatch.setattr(runner, '_VENVS', {})
+
+    result = resolve_argv('pytest', path_project)  # act
+
+    assert result == [str(path_bin / 'pytest')]
+    assert resolve_cmd('python', path_project) == f'"{path_bin / "python"}"'
+    assert resolve_argv('radon', path_project) == ['poetry', 'run', 'radon']
+    monkeypatch.setenv(runner._POETRY_RUN_ENV, '1')
+    assert resolve_cmd('pytest', path_project) == 'poetry run pytest'
+
+
+def test_get_venv_cache(monkeypatch, tmp_path):
+    """Test that the virtual environment is cached by the hash of poetry.lock."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    path_project = tmp_path / 'project'
+    path_project.mkdir()
+    (path_project / 'poetry.lock').write_text('lock 1')
+    path_venv = tmp_path / 'venv'
+    _create_venv(path_venv, ['python'])
+    located = []
+
+    def _locate_venv(path):
+        located.append(path)
+        return path_venv
+
+    monkeypatch.setattr(runner, '_locate_venv', _locate_venv)
+    monkeypatch.setattr(runner, '_VENVS', {})
+    get_venv(path_project)
+    runner._VENVS.clear()
+
+    result = get_venv(path_project)  # act
+
+    assert result == path_venv
+    assert located == [path_project]
+    (path_project / 'poetry.lock').write_text('lock 2')
+    runner._VENVS.clear()
+    get_venv(path_project)
+    assert located == [path_project, path_project]
+
+
+def test_get_venv_not_found(monkeypatch, tmp_path):
+    """Test that a failed lookup is not cached, so that a later `poetry install` is found in the same session."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.setattr(runner, '_VENVS', {})
+    path_project = tmp_path / 'project'
+    path_project.mkdir()
+    path_venv = tmp_path / 'venv'
+    found = [None, path_venv]
+    monkeypatch.setattr(runner, '_locate_venv', lambda _path: found.pop(0))
+    _create_venv(path_venv, ['python'])
+
+    result = get_venv(path_project)  # act
+
+    assert result is None
+    assert get_venv(path_project) == path_venv
+    assert get_venv(path_project) == path_venv
+    assert not found
+
+
+def test_defer_cmd(monkeypatch, tmp_path):
+    """Test that the executable is only resolved when doit expands the command."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setenv(runner._POETRY_RUN_ENV, '1')
+    resolved = []
+
+    def _resolve_cmd(executable, path_project):
+        resolved.append(executable)
+        return resolve_cmd(executable, path_project)
+
+    monkeypatch.setattr(runner, 'resolve_cmd', _resolve_cmd)
+    task_test_benchmark()
+    action = CmdAction(defer_cmd('pytest', '-m BENCHMARK %(args)s', tmp_path))
+    task = Task('benchmark', [action], params=[{'name': 'args', 'default': '--benchmark-update'}])
+    task.init_options()
+    assert resolved == []
+
+    result = task.actions[0].expand_action()  # act
+
+    assert result == 'poetry run pytest -m BENCHMARK --benchmark-update'
+    assert set(resolved) == {'pytest'}
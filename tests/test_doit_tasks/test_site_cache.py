@@ -0,0 +1,63 @@
+"""Test doit_tasks/site_cache.py."""
+
+import json
+
+import pytest
+
+from calcipy.doit_tasks import runner, site_cache
+from calcipy.doit_tasks.site_cache import _page_url, build_site
+
+
+@pytest.mark.parametrize(
+    ('rel_md', 'directory_urls', 'expected'), [
+        ('index.md', True, ''),
+        ('reference/index.md', True, 'reference/'),
+        ('reference/calcipy/conftest.md', True, 'reference/calcipy/conftest/'),
+        ('index.md', False, 'index.html'),
+        ('reference/calcipy/conftest.md', False, 'reference/calcipy/conftest.html'),
+    ],
+)
+def test_page_url(rel_md, directory_urls, expected):
+    """Test _page_url."""
+    result = _page_url(rel_md, directory_urls)
+
+    assert result == expected
+
+
+def test_build_site(monkeypatch, tmp_path):
+    """Test that only the pages with changed inputs are rebuilt and the search index is merged."""
+    path_docs = tmp_path / 'docs'
+    path_site = tmp_path / 'site'
+    (path_docs / 'reference').mkdir(parents=True)
+    (tmp_path / 'mkdocs.yml').write_text('site_name: test\n')
+    (tmp_path / 'README.md').write_text('# Readme\n')
+    (tmp_path / 'pkg.py').write_text('"""Package."""\n')
+    (path_docs / 'index.md').write_text('{!README.md!}\n')
+    (path_docs / 'reference/pkg.md').write_text('::: pkg\n')
+    commands = []
+
+    def _fake_mkdocs(cmd, **kwargs):
+        commands.append(cmd)
+        built = []
+        for url in ['', 'reference/pkg/']:
+            path_html = path_site / url / 'index.html'
+            if not path_html.is_file():
+                path_html.parent.mkdir(exist_ok=True, parents=True)
+                path_html.write_text(url)
+                built.append({'location': f'{url}#section', 'text': url})
+        (path_site / 'search').mkdir(exist_ok=True)
+        (path_site / 'search/search_index.json').write_text(json.dumps({'config': {}, 'docs': built}))
+
+    monkeypatch.setenv(runner._POETRY_RUN_ENV, '1')
+    monkeypatch.setattr(site_cache.subprocess, 'run', _fake_mkdocs)
+    path_cache = tmp_path / 'site_cache.json'
+
+    build_site(tmp_path, path_docs, path_site, path_cache)
+    build_site(tmp_path, path_docs, path_site, path_cache)
+    (tmp_path / 'pkg.py').write_text('"""Package."""\n\nVALUE = 1\n')
+    build_site(tmp_path, path_docs, path_site, path_cache)  # act
+
+    mkdocs_cmd = site_cache._mkdocs_cmd(tmp_path)
+    assert commands == [mkdocs_cmd, [*mkdocs_cmd, '--dirty']]
+    search_index = json.loads((path_site / 'search/search_index.json').read_text())
+    assert sorted(doc['location'] for doc in search_index['docs']) == ['#section', 'reference/pkg/#section']
@@ -0,0 +1,69 @@
+"""Test doit_tasks/site_optimize.py."""
+
+import gzip
+import json
+
+from calcipy.doit_tasks.site_optimize import _minify_css, _minify_html, optimize_site
+
+
+def test_minify_html():
+    """Test that whitespace is only collapsed outside of protected blocks."""
+    html = '<html>\n  <!-- comment -->\n  <p>Some    text</p>\n  <pre>keep\n    this</pre>\n</html>\n'
+
+    result = _minify_html(html)
+
+    assert result == '<html>\n<p>Some text</p>\n<pre>keep\n    this</pre>\n</html>\n'
+
+
+def test_minify_css():
+    """Test _minify_css."""
+    css = '/* comment */\n.md-typeset a > code {\n  color: red;\n  margin: 0 auto;\n}\n'
+
+    result = _minify_css(css)
+
+    assert result == '.md-typeset a>code{color: red;margin: 0 auto}\n'
+
+
+def test_minify_html_protected():
+    """Test that pre and code blocks, attribute values, and conditional comments are not modified."""
+    html = (
+        '<div title="a    b" \n  class=\'x\'>\n  <pre><code>def f():\n    return  1</code></pre>\n'
+        '  <p>Use <code>a  b</code>  here</p><!--[if IE]>  <![endif]-->\n  <!-- <p title="x"> -->\n</div>\n'
+    )
+
+    result = _minify_html(html)
+
+    assert result == (
+        '<div title="a    b" \n  class=\'x\'>\n<pre><code>def f():\n    return  1</code></pre>\n'
+        '<p>Use <code>a  b</code> here</p><!--[if IE]>  <![endif]-->\n</div>\n'
+    )
+
+
+def test_minify_css_protected():
+    """Test that CSS string literals and url() values are not modified."""
+    css = '/*! license */\na::before {\n  content: "a  b; }";\n  background: url( "a  b.png" );\n}\n'
+
+    result = _minify_css(css)
+
+    assert result == '/*! license */ a::before{content: "a  b; }";background: url( "a  b.png" )}\n'
+
+
+def test_optimize_site(tmp_path):
+    """Test that files are minified, precompressed, and skipped when unchanged."""
+    path_site = tmp_path / 'site'
+    path_site.mkdir()
+    path_html = path_site / 'index.html'
+    path_html.write_text('<p>\n    Hello    world\n</p>\n')
+    (path_site / 'logo.bin').write_bytes(b'binary')
+    path_cache = tmp_path / 'cache.json'
+
+    optimize_site(path_site, path_cache)
+    path_gz = path_site / 'index.html.gz'
+    gz_mtime = path_gz.stat().st_mtime_ns
+    optimize_site(path_site, path_cache)  # act
+
+    assert path_html.read_text() == '<p>\nHello world\n</p>\n'
+    assert gzip.decompress(path_gz.read_bytes()) == path_html.read_bytes()
+    assert path_gz.stat().st_mtime_ns == gz_mtime
+    assert not (path_site / 'logo.bin.gz').exists()
+    assert sorted(json.loads(path_cache.read_text())) == ['index.html', 'logo.bin']
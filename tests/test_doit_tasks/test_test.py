@@ -1,22 +1,102 @@
 """Test doit_tasks/test.py."""
 
-import pytest
+import json
 
+from calcipy.doit_tasks import collection_cache, runner, test
 from calcipy.doit_tasks.doit_globals import DIG
-from calcipy.doit_tasks.test import task_test_marker
+from calcipy.doit_tasks.test import (
+    _coverage_fast, _pytest_selection_cmd, _select_coverage_core, task_coverage, task_coverage_fast,
+    task_profile_tests, task_test, task_test_all, task_test_benchmark, task_test_marker,
+)
 
 from ..configuration import PATH_TEST_PROJECT
 
 
 def test_task_test_marker():
     """Test task_test_marker."""
-    pytest.skip('Needs to be updated for LongRunning')
     DIG.set_paths(path_project=PATH_TEST_PROJECT)
 
     result = task_test_marker()
 
     assert len(result['actions']) == 1
-    assert result['actions'][0].startswith('poetry run pytest')
+    assert result['actions'][0]._action.func is _pytest_selection_cmd
+    assert '-m "%(marker)s"' in result['actions'][0]._action.args[0]
     assert len(result['params']) == 1
     assert result['params'][0]['name'] == 'marker'
     assert result['params'][0]['short'] == 'm'
+
+
+def test_pytest_selection_cmd_no_match(monkeypatch):
+    """Test that the expression is still passed to pytest when no test file matches."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setenv(runner._POETRY_RUN_ENV, '1')
+    monkeypatch.setattr(collection_cache, 'select_test_paths', lambda *_args, **_kwargs: [])
+
+    result = _pytest_selection_cmd('-m "%(marker)s"', marker='NOTHING')  # act
+
+    assert result == f'poetry run pytest "{DIG.test.path_tests}" -m "%(marker)s"'
+
+
+def test_task_test_pytest_args(monkeypatch):
+    """Test that the opt-in pytest arguments, such as the hang watchdog budgets, are passed by the test tasks."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.test, 'pytest_args', '--test-budget=default=120')
+
+    results = [task_test(), task_test_all(), task_coverage()]  # act
+
+    assert all(result['actions'][-1]._action.args[1].endswith('--test-budget=default=120') for result in results)
+
+
+def test_task_test_benchmark():
+    """Test task_test_benchmark."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = task_test_benchmark()
+
+    assert len(result['actions']) == 1
+    assert '-m BENCHMARK' in result['actions'][0]._action.args[1]
+    assert result['params'][0]['name'] == 'args'
+
+
+def test_task_profile_tests():
+    """Test task_profile_tests."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = task_profile_tests()
+
+    assert len(result['actions']) == 1
+    assert result['params'][0]['name'] == 'keyword'
+
+
+def test_task_coverage_fast():
+    """Test task_coverage_fast."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+
+    result = task_coverage_fast()
+
+    assert result['actions'] == [_coverage_fast]
+    assert [param['name'] for param in result['params']] == ['changed', 'base', 'remeasure']
+    assert _select_coverage_core() in {'sysmon', 'ctrace'}
+
+
+def test_coverage_fast_baseline(monkeypatch, tmp_path, capsys):
+    """Test that the plain-run baseline is cached and the overhead is reported."""
+    DIG.set_paths(path_project=PATH_TEST_PROJECT)
+    monkeypatch.setattr(DIG.test, 'path_out', tmp_path)
+    commands = []
+
+    def _fake_run(cmd, env):
+        commands.append(cmd)
+        assert env['COVERAGE_CORE'] == _select_coverage_core()
+        return (3.0 if 'coverage' in cmd else 2.0), 0
+
+    monkeypatch.setenv(runner._POETRY_RUN_ENV, '1')
+    monkeypatch.setattr(test, '_timed_run', _fake_run)
+    monkeypatch.setattr(test.subprocess, 'run', lambda *args, **kwargs: None)
+
+    assert _coverage_fast(changed=False, base='HEAD', remeasure=False)
+    assert _coverage_fast(changed=False, base='HEAD', remeasure=False)  # act
+
+    assert len(commands) == 3  # The baseline is only measured once
+    assert json.loads((tmp_path / 'coverage_baseline.json').read_text()) == {'seconds': 2.0}
+    assert '(+50%)' in capsys.readouterr().out
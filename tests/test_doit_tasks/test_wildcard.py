@@ -11,4 +11,4 @@ def test_doit_tasks_imports():
     wc_imports = [_g for _g in globals() if not _g.startswith('_') and _g not in suppress]  # act
 
     assert all(imp.startswith('task_') or imp == 'DOIT_CONFIG_RECOMMENDED' for imp in wc_imports)
-    assert len(wc_imports) == 25  # Update if the number of tasks change
+    assert len(wc_imports) == 31  # Update if the number of tasks change